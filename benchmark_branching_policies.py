@@ -0,0 +1,221 @@
+import time
+import typing as t
+
+import click
+import ecole
+import numpy as np
+import pandas as pd
+import pathlib2
+import pyscipopt
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.auxiliary_functions import read_scip_solver_settings_file
+from scip_ecole_model.branching_policies import (
+    BRANCHING_POLICIES,
+    LEARNED_POLICY_NAME,
+    make_branching_policy,
+)
+from scip_ecole_model.envs import SimpleBranchingEnv
+from scip_ecole_model.model_loader import load_problem
+from scip_ecole_model.optimize import scip_ecole_optimize, scip_optimize
+from scip_ecole_model.scip_elems import SCIPAttributes
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+_SCIP_DEFAULT = "scip_default"
+# Сдвиг среднего геометрического времени решения (с)
+_TIME_SHIFT = 1.0
+
+
+def _shifted_geometric_mean(values: pd.Series, shift: float) -> float:
+    return float(
+        np.exp(np.log(values.to_numpy(dtype=np.float64) + shift).mean()) - shift
+    )
+
+
+def _get_run_record(
+    model: pyscipopt.scip.Model, instance: str, policy: str, wall_time: float
+) -> dict:
+    return {
+        "instance": instance,
+        "policy": policy,
+        "status": model.getStatus(),
+        "objective": model.getObjVal() if model.getNSols() > 0 else float("nan"),
+        "gap": model.getGap(),
+        "nodes": model.getNTotalNodes(),
+        "time": model.getSolvingTime(),
+        "wall_time": wall_time,
+    }
+
+
+def _run_scip_default(path_to_lp_file: PosixPath, scip_params: dict) -> dict:
+    """
+    Решает задачу только решателем SCIP (его правилами ветвления)
+    """
+    model = load_problem(path_to_lp_file=path_to_lp_file, logger=logger)
+    model.hideOutput()
+
+    start = time.perf_counter()
+    model = scip_optimize(
+        model_scip=model,
+        scip_params=scip_params,
+        path_to_warm_start_file=None,
+        logger=logger,
+    )
+
+    return _get_run_record(
+        model, path_to_lp_file.stem, _SCIP_DEFAULT, time.perf_counter() - start
+    )
+
+
+def _run_policy(
+    path_to_lp_file: PosixPath,
+    scip_params: dict,
+    policy_name: str,
+    seed: int,
+    path_to_policy_weights: t.Optional[PosixPath],
+) -> dict:
+    """
+    Решает задачу связкой SCIP+Ecole с заданной политикой ветвления
+    """
+    branching_policy = make_branching_policy(
+        name=policy_name, seed=seed, path_to_policy_weights=path_to_policy_weights
+    )
+    env = SimpleBranchingEnv(
+        observation_function=branching_policy.make_observation_function(),
+        reward_function=ecole.reward.NNodes(),
+        information_function={
+            "nb_nodes": ecole.reward.NNodes().cumsum(),
+            "time": ecole.reward.SolvingTime().cumsum(),
+        },
+        scip_params=scip_params,
+    ).create_env()
+
+    model = load_problem(path_to_lp_file=path_to_lp_file, logger=logger)
+    model.hideOutput()
+
+    start = time.perf_counter()
+    model, _ = scip_ecole_optimize(
+        env=env,
+        model_scip=model,
+        path_to_warm_start_file=None,
+        logger=logger,
+        branching_policy=branching_policy,
+    )
+
+    return _get_run_record(
+        model, path_to_lp_file.stem, policy_name, time.perf_counter() - start
+    )
+
+
+@click.command()
+@click.option(
+    "--path-to-lp-file",
+    "paths_to_lp_files",
+    required=True,
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    help="Путь до lp-файла (опцию можно повторять)",
+)
+@click.option(
+    "--path-to-scip-solver-configs",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    default=Path("./settings_for_scip_solver/scip_base.set"),
+    help="Путь до set-файла настроек решателя SCIP",
+)
+@click.option(
+    "--policy",
+    "policy_names",
+    multiple=True,
+    type=click.Choice([*BRANCHING_POLICIES, LEARNED_POLICY_NAME]),
+    default=tuple(BRANCHING_POLICIES),
+    help="Политика ветвления (опцию можно повторять; по умолчанию -- все встроенные)",
+)
+@click.option(
+    "--path-to-policy-weights",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    default=None,
+    help="Путь до npz-файла весов обученной политики (для политики learned)",
+)
+@click.option(
+    "--time-limit",
+    type=float,
+    default=None,
+    help="Ограничение по времени на один запуск (с)",
+)
+@click.option(
+    "--seed",
+    type=int,
+    default=42,
+    help="Начальное значение генератора случайных чисел (для политики random)",
+)
+@click.option(
+    "--path-to-results-file",
+    type=click.Path(dir_okay=False, path_type=pathlib2.Path),
+    default=Path("./output_from_model/branching_policies_benchmark.csv"),
+    help="Путь до csv-файла с результатами замеров",
+)
+def main(
+    paths_to_lp_files: t.Tuple[PosixPath, ...],
+    path_to_scip_solver_configs: PosixPath,
+    policy_names: t.Tuple[str, ...],
+    path_to_policy_weights: t.Optional[PosixPath],
+    time_limit: t.Optional[float],
+    seed: int,
+    path_to_results_file: PosixPath,
+) -> t.NoReturn:
+    """
+    Сравнивает политики ветвления SCIP+Ecole с решателем SCIP
+    (без Ecole) по числу узлов и времени решения; для оценки обученной
+    политики задачи не должны входить в обучающий набор
+    """
+    if (LEARNED_POLICY_NAME in policy_names) and (path_to_policy_weights is None):
+        raise click.UsageError(
+            f"Policy `{LEARNED_POLICY_NAME}` requires --path-to-policy-weights"
+        )
+
+    scip_params: dict = read_scip_solver_settings_file(path_to_scip_solver_configs)
+    if time_limit is not None:
+        scip_params[SCIPAttributes.LIMITS_TIME] = time_limit
+
+    # Запуски выполняются последовательно, чтобы замеры времени были сопоставимы
+    records: t.List[dict] = []
+    for path_to_lp_file in paths_to_lp_files:
+        records.append(_run_scip_default(path_to_lp_file, scip_params))
+        for policy_name in policy_names:
+            records.append(
+                _run_policy(
+                    path_to_lp_file,
+                    scip_params,
+                    policy_name,
+                    seed,
+                    path_to_policy_weights,
+                )
+            )
+            logger.info(
+                f"`{path_to_lp_file.stem}` with `{policy_name}` policy: "
+                f"{records[-1]['nodes']} nodes, {records[-1]['time']:.2f} s"
+            )
+
+    results = pd.DataFrame.from_records(records)
+    path_to_results_file.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(path_to_results_file, index=False)
+
+    summary = results.groupby("policy", sort=False).agg(
+        nodes=("nodes", lambda nodes: _shifted_geometric_mean(nodes, 1.0)),
+        time=("time", lambda times: _shifted_geometric_mean(times, _TIME_SHIFT)),
+        wall_time=(
+            "wall_time",
+            lambda times: _shifted_geometric_mean(times, _TIME_SHIFT),
+        ),
+        n_optimal=("status", lambda statuses: int((statuses == "optimal").sum())),
+    )
+    logger.info(
+        f"\n\tInstances: {len(paths_to_lp_files)} "
+        f"(shifted geometric means of nodes and time)\n"
+        f"{summary.to_string()}\n"
+        f"\tResults have been written to `{path_to_results_file}`"
+    )
+
+
+if __name__ == "__main__":
+    main()
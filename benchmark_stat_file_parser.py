@@ -0,0 +1,110 @@
+import subprocess
+import time
+import types
+import typing as t
+
+import click
+import pathlib2
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.parser import StatFileParser
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+_PARSER_PATH_IN_REPO = "scip_ecole_model/parser.py"
+
+
+def _load_baseline_parser(rev: str) -> t.Type:
+    """
+    Загружает класс StatFileParser из модуля parser заданной ревизии git
+    (исходная реализация не хранится в пакете)
+    """
+    try:
+        source: str = subprocess.run(
+            ["git", "show", f"{rev}:{_PARSER_PATH_IN_REPO}"],
+            cwd=Path(__file__).resolve().parent,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as err:
+        raise click.ClickException(
+            f"Cannot read `{_PARSER_PATH_IN_REPO}` at revision `{rev}`: {err}"
+        )
+
+    module = types.ModuleType("baseline_parser")
+    exec(compile(source, f"{rev}:{_PARSER_PATH_IN_REPO}", "exec"), module.__dict__)
+
+    return module.StatFileParser
+
+
+def _measure_parsing_time(
+    parser_class: t.Type,
+    paths_to_stat_files: t.List[PosixPath],
+    n_repeats: int,
+) -> float:
+    """
+    Возвращает лучшее время разбора всех stat-файлов (с)
+    """
+    best_time = float("inf")
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        for path_to_stat_file in paths_to_stat_files:
+            parser_class(path_to_stat_file=path_to_stat_file)
+        best_time = min(best_time, time.perf_counter() - start)
+
+    return best_time
+
+
+@click.command()
+@click.option(
+    "--path-to-stats-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=pathlib2.Path),
+    default=Path("./output_from_model"),
+    help="Путь до директории со stats-файлами",
+)
+@click.option(
+    "--n-repeats",
+    type=int,
+    default=50,
+    help="Число повторов замера",
+)
+@click.option(
+    "--baseline-rev",
+    type=str,
+    required=True,
+    help="Ревизия git с исходной (эталонной) реализацией парсера",
+)
+def main(path_to_stats_dir: PosixPath, n_repeats: int, baseline_rev: str) -> t.NoReturn:
+    """
+    Сравнивает StatFileParser с исходной реализацией парсера
+    по результату и по времени разбора stats-файлов
+    """
+    paths_to_stat_files: t.List[PosixPath] = sorted(path_to_stats_dir.glob("*.stats"))
+    if not paths_to_stat_files:
+        raise click.UsageError(f"No stats files in `{path_to_stats_dir}`")
+    baseline_parser_class: t.Type = _load_baseline_parser(baseline_rev)
+
+    for path_to_stat_file in paths_to_stat_files:
+        if (
+            StatFileParser(path_to_stat_file=path_to_stat_file)._structure_of_doc
+            != baseline_parser_class(
+                path_to_stat_file=path_to_stat_file
+            )._structure_of_doc
+        ):
+            raise click.ClickException(f"Parsers disagree on `{path_to_stat_file.name}`")
+
+    baseline_time = _measure_parsing_time(
+        baseline_parser_class, paths_to_stat_files, n_repeats
+    )
+    new_time = _measure_parsing_time(StatFileParser, paths_to_stat_files, n_repeats)
+
+    logger.info(
+        f"\n\tStats files: {len(paths_to_stat_files)} (best of {n_repeats} runs)\n"
+        f"\t- StatFileParser ({baseline_rev[:7]}): {baseline_time * 1e3:.2f} ms\n"
+        f"\t- StatFileParser: {new_time * 1e3:.2f} ms\n"
+        f"\t- Speedup: x{baseline_time / new_time:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import typing as t
+
+import click
+import pathlib2
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.feasibility import DEFAULT_FEASIBILITY_TOL, preflight_warm_start
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+
+@click.command()
+@click.option(
+    "--path-to-lp-file",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    help="Путь до lp-файла",
+)
+@click.option(
+    "--path-to-sol-file",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    help="Путь до sol-файла 'теплого' старта",
+)
+@click.option(
+    "--path-to-arrays-dir",
+    type=click.Path(file_okay=False, path_type=pathlib2.Path),
+    default=Path("./problem_arrays"),
+    help="Путь до директории массивов задач (npy-файлы)",
+)
+@click.option(
+    "--repair/--no-repair",
+    default=False,
+    help="Исправить недопустимое решение",
+)
+@click.option(
+    "--path-to-repaired-file",
+    type=click.Path(dir_okay=False, path_type=pathlib2.Path),
+    default=None,
+    help="Путь до sol-файла исправленного решения (по умолчанию -- рядом с исходным)",
+)
+@click.option(
+    "--tol",
+    type=float,
+    default=DEFAULT_FEASIBILITY_TOL,
+    help="Допуск выполнения ограничений",
+)
+def main(
+    path_to_lp_file: PosixPath,
+    path_to_sol_file: PosixPath,
+    path_to_arrays_dir: PosixPath,
+    repair: bool,
+    path_to_repaired_file: t.Optional[PosixPath],
+    tol: float,
+) -> t.NoReturn:
+    """
+    Проверяет допустимость 'теплого' старта и при необходимости исправляет его
+    """
+    preflight_warm_start(
+        path_to_lp_file,
+        path_to_sol_file,
+        path_to_arrays_dir=path_to_arrays_dir,
+        logger=logger,
+        repair=repair,
+        path_to_repaired_file=path_to_repaired_file,
+        tol=tol,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import typing as t
+
+import click
+import pathlib2
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.auxiliary_functions import read_scip_solver_settings_file
+from scip_ecole_model.data_collection import (
+    build_collection_episodes,
+    collect_imitation_data,
+)
+from scip_ecole_model.scip_elems import SCIPAttributes
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+
+@click.command()
+@click.option(
+    "--path-to-lp-file",
+    "paths_to_lp_files",
+    required=True,
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    help="Путь до lp-файла (опцию можно повторять)",
+)
+@click.option(
+    "--path-to-scip-solver-configs",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    default=Path("./settings_for_scip_solver/scip_base.set"),
+    help="Путь до set-файла настроек решателя SCIP",
+)
+@click.option(
+    "--n-episodes-per-instance",
+    type=int,
+    default=1,
+    help="Число эпизодов на задачу (эпизоды отличаются начальным значением)",
+)
+@click.option(
+    "--expert-probability",
+    type=float,
+    default=0.05,
+    help="Вероятность запроса оценок сильного ветвления в узле",
+)
+@click.option(
+    "--max-samples-per-episode",
+    type=int,
+    default=1000,
+    help="Максимальное число образцов одного эпизода",
+)
+@click.option(
+    "--samples-per-shard",
+    type=int,
+    default=256,
+    help="Число образцов в одном шарде",
+)
+@click.option(
+    "--compress/--no-compress",
+    default=True,
+    help="Сжимать шарды (npz) или хранить их как npy-файлы для чтения через mmap",
+)
+@click.option(
+    "--time-limit",
+    type=float,
+    default=None,
+    help="Ограничение по времени на один эпизод (с)",
+)
+@click.option(
+    "--n-workers",
+    type=int,
+    default=None,
+    help="Число процессов (по умолчанию -- число ядер)",
+)
+@click.option(
+    "--path-to-dataset-dir",
+    type=click.Path(file_okay=False, path_type=pathlib2.Path),
+    default=Path("./imitation_data"),
+    help="Путь до директории набора данных (сбор продолжается, если она не пуста)",
+)
+def main(
+    paths_to_lp_files: t.Tuple[PosixPath, ...],
+    path_to_scip_solver_configs: PosixPath,
+    n_episodes_per_instance: int,
+    expert_probability: float,
+    max_samples_per_episode: int,
+    samples_per_shard: int,
+    compress: bool,
+    time_limit: t.Optional[float],
+    n_workers: t.Optional[int],
+    path_to_dataset_dir: PosixPath,
+) -> t.NoReturn:
+    """
+    Собирает образцы решений эксперта (сильное ветвление)
+    для обучения политики ветвления имитацией
+    """
+    scip_params: dict = read_scip_solver_settings_file(path_to_scip_solver_configs)
+    if time_limit is not None:
+        scip_params[SCIPAttributes.LIMITS_TIME] = time_limit
+
+    episodes = build_collection_episodes(
+        paths_to_lp_files=paths_to_lp_files,
+        seeds=range(n_episodes_per_instance),
+    )
+
+    collect_imitation_data(
+        episodes=episodes,
+        path_to_dataset_dir=path_to_dataset_dir,
+        scip_params=scip_params,
+        logger=logger,
+        expert_probability=expert_probability,
+        max_samples_per_episode=max_samples_per_episode,
+        samples_per_shard=samples_per_shard,
+        compress=compress,
+        n_workers=n_workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import concurrent.futures
+import functools
+import os
+import typing as t
+
+import click
+import pathlib2
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.problem_arrays import load_problem_arrays
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+
+def _export_arrays(
+    path_to_problem_file: PosixPath, path_to_arrays_dir: PosixPath
+) -> t.Tuple[str, int, int, int]:
+    problem = load_problem_arrays(
+        path_to_problem_file, path_to_arrays_dir=path_to_arrays_dir, logger=logger
+    )
+
+    return (
+        path_to_problem_file.name,
+        problem.n_vars,
+        problem.n_conss,
+        int(problem.matrix.nnz),
+    )
+
+
+@click.command()
+@click.option(
+    "--path-to-problem-file",
+    "paths_to_problem_files",
+    required=True,
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    help="Путь до lp- или mps-файла (опцию можно повторять)",
+)
+@click.option(
+    "--path-to-arrays-dir",
+    type=click.Path(file_okay=False, path_type=pathlib2.Path),
+    default=Path("./problem_arrays"),
+    help="Путь до директории массивов задач (npy-файлы)",
+)
+@click.option(
+    "--n-workers",
+    type=int,
+    default=None,
+    help="Число процессов (по умолчанию -- число ядер)",
+)
+def main(
+    paths_to_problem_files: t.Tuple[PosixPath, ...],
+    path_to_arrays_dir: PosixPath,
+    n_workers: t.Optional[int],
+) -> t.NoReturn:
+    """
+    Выгружает матрицы ограничений и векторы задач в npy-файлы
+    (параллельно по файлам задач)
+    """
+    n_workers = min(n_workers or os.cpu_count() or 1, len(paths_to_problem_files))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        for name, n_vars, n_conss, nnz in executor.map(
+            functools.partial(_export_arrays, path_to_arrays_dir=path_to_arrays_dir),
+            paths_to_problem_files,
+        ):
+            logger.info(f"`{name}`: {n_vars} vars, {n_conss} conss, {nnz} nonzeros")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import concurrent.futures
+import functools
+import os
+import typing as t
+
+import click
+import pandas as pd
+import pathlib2
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.instance_features import InstanceFeatures
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+
+def _extract_features(
+    path_to_lp_file: PosixPath, path_to_cache_dir: PosixPath
+) -> t.Dict[str, float]:
+    features = InstanceFeatures(path_to_cache_dir).extract(path_to_lp_file, logger)
+
+    return {"instance": path_to_lp_file.stem, **features}
+
+
+@click.command()
+@click.option(
+    "--path-to-lp-file",
+    "paths_to_lp_files",
+    required=True,
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    help="Путь до lp-файла (опцию можно повторять)",
+)
+@click.option(
+    "--path-to-cache-dir",
+    type=click.Path(file_okay=False, path_type=pathlib2.Path),
+    default=Path("./instance_features_cache"),
+    help="Путь до директории кэша признаков",
+)
+@click.option(
+    "--path-to-features-file",
+    type=click.Path(dir_okay=False, path_type=pathlib2.Path),
+    default=Path("./output_from_model/instance_features.csv"),
+    help="Путь до csv-файла с признаками задач",
+)
+@click.option(
+    "--n-workers",
+    type=int,
+    default=None,
+    help="Число процессов (по умолчанию -- число ядер)",
+)
+def main(
+    paths_to_lp_files: t.Tuple[PosixPath, ...],
+    path_to_cache_dir: PosixPath,
+    path_to_features_file: PosixPath,
+    n_workers: t.Optional[int],
+) -> t.NoReturn:
+    """
+    Извлекает статические признаки задач (параллельно по lp-файлам)
+    """
+    n_workers = min(n_workers or os.cpu_count() or 1, len(paths_to_lp_files))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        records: t.List[dict] = list(
+            executor.map(
+                functools.partial(
+                    _extract_features, path_to_cache_dir=path_to_cache_dir
+                ),
+                paths_to_lp_files,
+            )
+        )
+
+    features = pd.DataFrame.from_records(records).set_index("instance")
+    path_to_features_file.parent.mkdir(parents=True, exist_ok=True)
+    features.to_csv(path_to_features_file)
+    logger.info(
+        f"Features of {len(features)} instances have been written "
+        f"to `{path_to_features_file}`"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import typing as t
+
+import click
+import pathlib2
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.lp_rounding import (
+    DEFAULT_MAX_RESOLVES,
+    DEFAULT_N_RANDOM_ROUNDINGS,
+    generate_lp_rounding_warm_start,
+)
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+
+@click.command()
+@click.option(
+    "--path-to-lp-file",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    help="Путь до lp-файла",
+)
+@click.option(
+    "--path-to-sol-file",
+    type=click.Path(dir_okay=False, path_type=pathlib2.Path),
+    default=None,
+    help="Путь до sol-файла 'теплого' старта (по умолчанию -- рядом с lp-файлом)",
+)
+@click.option(
+    "--path-to-arrays-dir",
+    type=click.Path(file_okay=False, path_type=pathlib2.Path),
+    default=Path("./problem_arrays"),
+    help="Путь до директории массивов задач (npy-файлы)",
+)
+@click.option(
+    "--n-random-roundings",
+    type=int,
+    default=DEFAULT_N_RANDOM_ROUNDINGS,
+    help="Число случайных округлений LP-решения",
+)
+@click.option(
+    "--max-resolves",
+    type=int,
+    default=DEFAULT_MAX_RESOLVES,
+    help="Число лучших округлений для пересчета непрерывных переменных",
+)
+@click.option("--seed", type=int, default=0, help="Начальное значение генератора")
+@click.option(
+    "--time-limit",
+    type=float,
+    default=None,
+    help="Ограничение времени решения LP-релаксации (с)",
+)
+def main(
+    path_to_lp_file: PosixPath,
+    path_to_sol_file: t.Optional[PosixPath],
+    path_to_arrays_dir: PosixPath,
+    n_random_roundings: int,
+    max_resolves: int,
+    seed: int,
+    time_limit: t.Optional[float],
+) -> t.NoReturn:
+    """
+    Строит 'теплый' старт округлением LP-релаксации
+    """
+    generate_lp_rounding_warm_start(
+        path_to_lp_file,
+        (
+            path_to_lp_file.with_name(f"{path_to_lp_file.stem}_lp_rounding.sol")
+            if path_to_sol_file is None
+            else path_to_sol_file
+        ),
+        path_to_arrays_dir=path_to_arrays_dir,
+        logger=logger,
+        n_random_roundings=n_random_roundings,
+        max_resolves=max_resolves,
+        seed=seed,
+        time_limit=time_limit,
+    )
+
+
+if __name__ == "__main__":
+    main()
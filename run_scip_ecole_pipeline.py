@@ -1,19 +1,57 @@
 import os
 
+import click
 import dotenv
 import ecole
 from pathlib2 import Path, PosixPath
 
+from scip_ecole_model.anytime_metrics import DEFAULT_TARGET_GAPS, BoundTrajectory
 from scip_ecole_model.auxiliary_functions import *
+from scip_ecole_model.branching_policies import make_branching_policy
+from scip_ecole_model.decomposition import (
+    DecomposedResult,
+    write_decomposed_results_and_stats,
+)
 from scip_ecole_model.envs import SimpleBranchingEnv
-from scip_ecole_model.optimize import scip_ecole_optimize, scip_optimize
+from scip_ecole_model.feasibility import preflight_warm_start
+from scip_ecole_model.lp_rounding import generate_lp_rounding_warm_start
+from scip_ecole_model.model_loader import load_problem
+from scip_ecole_model.optimize import (
+    GapStallTermination,
+    scip_decomposed_optimize,
+    scip_ecole_optimize,
+    scip_optimize,
+)
+from scip_ecole_model.problem_arrays import load_problem_arrays
+from scip_ecole_model.problem_cache import ProblemCache
+from scip_ecole_model.progress import SolveProgress
+from scip_ecole_model.racing import build_racers, run_race
+from scip_ecole_model.resume import ResumeState
+from scip_ecole_model.scip_elems import SCIPAttributes
+from scip_ecole_model.solution_store import (
+    SolutionStore,
+    add_warm_starts,
+    write_warm_start_file,
+)
+from scip_ecole_model.telemetry import StepTelemetry
 from scip_ecole_model.utils.scip_ecole_logger import logger
 
 
-def main():
+@click.command()
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Продолжить прерванное решение с последнего лучшего решения",
+)
+def main(resume: bool):
     """
     Главная функция, запускающая цепочку вычислений
     на базе связки SCIP+Ecole
+
+    В режиме `--resume` решение продолжается с контрольной точки
+    (или sol-файла прошлого отрезка) на настройках первого отрезка
+    с новым ограничением времени
     """
     logger.info("Procedure for finding solution with `SCIP+Ecole` has been started ...")
     # Загрузить локальные переменные в текущее окружение
@@ -44,19 +82,174 @@ def main():
     path_to_warm_start_file: PosixPath = Path(config_params["path_to_warm_start_file"])
     # Флаг использования теплого старта
     use_warm_start: bool = config_params["use_warm_start"]
+    # Флаг использования кэша прочитанных задач
+    use_problem_cache: bool = config_params.get("use_problem_cache", False)
+    # Флаг использования хранилища решений прошлых запусков
+    use_solution_store: bool = config_params.get("use_solution_store", False)
+    # Флаг параллельного решения независимых блоков задачи (только SCIP)
+    use_decomposition: bool = config_params.get("use_decomposition", False)
+    # Флаг гонки нескольких конфигураций решателя SCIP (только SCIP)
+    use_racing: bool = config_params.get("use_racing", False) and not use_scip_ecole
+    # Флаг сохранения лучших решений в контрольную точку по ходу решения (только SCIP)
+    use_checkpoint: bool = config_params.get("use_checkpoint", False)
+    # Флаг записи образцов хода решения (jsonl-файл и метрики Prometheus; только SCIP)
+    use_progress: bool = config_params.get("use_progress", False)
+    # Флаг досрочной остановки решения при застое зазора (только SCIP)
+    use_gap_stall_termination: bool = config_params.get(
+        "use_gap_stall_termination", False
+    )
 
     # Словарь начальных управляющих параметров решателя SCIP
     scip_params: dict = read_scip_solver_settings_file(path_to_scip_solver_configs)
 
+    # Кэш прочитанных задач (для повторных запусков на том же lp-файле)
+    problem_cache: t.Optional[ProblemCache] = (
+        ProblemCache(
+            path_to_cache_dir=Path(config_params["path_to_problem_cache_dir"]),
+            max_size_mb=config_params["problem_cache_max_size_mb"],
+        )
+        if use_problem_cache
+        else None
+    )
+
+    # Хранилище лучших решений прошлых запусков (для похожих задач)
+    solution_store: t.Optional[SolutionStore] = (
+        SolutionStore(
+            path_to_store_dir=Path(config_params["path_to_solution_store_dir"]),
+            max_size_mb=config_params["solution_store_max_size_mb"],
+        )
+        if use_solution_store
+        else None
+    )
+
+    # Прочитать файл математической постановки один раз за запуск
+    model_scip: pyscipopt.scip.Model = load_problem(
+        path_to_lp_file=path_to_lp_file,
+        logger=logger,
+        problem_cache=problem_cache,
+    )
+
     # Собрать статистику о задаче до запуска решения
     stats_before_solving: t.NamedTuple = get_stats_before_solving(
-        path_to_lp_file=path_to_lp_file,
+        model=model_scip,
         logger=logger,
     )
 
+    # Состояние возобновляемого решения и контрольная точка лучшего решения
+    resume_state = ResumeState(
+        path_to_output_dir.joinpath(f"{problem_name}_resume.json")
+    )
+    path_to_checkpoint_file: PosixPath = path_to_output_dir.joinpath(
+        f"{problem_name}_checkpoint.sol.gz"
+    )
+    if resume and resume_state.obj_sense is not None:
+        # Настройки решателя -- как в первом отрезке, ограничение времени -- новое
+        time_limit: t.Optional[float] = scip_params.get(SCIPAttributes.LIMITS_TIME)
+        scip_params = dict(resume_state.scip_params)
+        if time_limit is not None:
+            scip_params[SCIPAttributes.LIMITS_TIME] = time_limit
+
+        # Лучшее известное решение становится 'теплым' стартом (и отсечением)
+        path_to_incumbent_file: t.Optional[PosixPath] = resume_state.find_incumbent(
+            [path_to_checkpoint_file]
+            + [Path(segment.path_to_sol_file) for segment in resume_state.segments[-1:]]
+        )
+        if path_to_incumbent_file is not None:
+            path_to_warm_start_file, use_warm_start = path_to_incumbent_file, True
+        logger.info(
+            f"Solving is resumed after {len(resume_state)} segments "
+            f"(total time {resume_state.total_solving_time:.2f} s, "
+            f"total nodes {resume_state.total_n_nodes}) "
+            f"from `{path_to_incumbent_file}`"
+        )
+    else:
+        if resume:
+            logger.warning("Nothing to resume, solving is started from scratch")
+        resume_state.reset(scip_params, obj_sense=model_scip.getObjectiveSense())
+
+    # Путь до директории массивов задач (проверка и построение 'теплого' старта)
+    path_to_problem_arrays_dir = Path(
+        config_params.get("path_to_problem_arrays_dir", "problem_arrays")
+    )
+
+    # Построить 'теплый' старт округлением LP-релаксации, если sol-файл не задан
+    warm_start_is_supplied = use_warm_start and path_to_warm_start_file.is_file()
+    if config_params.get("generate_warm_start", False) and not warm_start_is_supplied:
+        path_to_generated_file = generate_lp_rounding_warm_start(
+            path_to_lp_file,
+            path_to_output_dir.joinpath(f"{path_to_lp_file.stem}_lp_rounding.sol"),
+            path_to_arrays_dir=path_to_problem_arrays_dir,
+            logger=logger,
+            **config_params.get("lp_rounding_params", {}),
+        )
+        use_warm_start = path_to_generated_file is not None
+        if use_warm_start:
+            path_to_warm_start_file = path_to_generated_file
+    # Проверить (и при необходимости исправить) 'теплый' старт до запуска решения
+    elif use_warm_start and config_params.get("check_warm_start", False):
+        path_to_warm_start_file = preflight_warm_start(
+            path_to_lp_file,
+            path_to_warm_start_file,
+            path_to_arrays_dir=path_to_problem_arrays_dir,
+            logger=logger,
+            repair=config_params.get("repair_warm_start", False),
+            path_to_repaired_file=path_to_output_dir.joinpath(
+                f"{path_to_warm_start_file.stem}_repaired.sol"
+            ),
+        )
+
+    # Добавить решения ближайших по признакам задач из хранилища
+    if solution_store is not None:
+        instance_features: t.Dict[str, float] = solution_store.extract_features(
+            path_to_lp_file, logger
+        )
+        var_index = VariableIndex.from_model(model_scip)
+        store_warm_starts: t.List[np.ndarray] = solution_store.find_warm_starts(
+            var_index,
+            instance_features,
+            n_warm_starts=config_params.get("n_store_warm_starts", 3),
+            logger=logger,
+        )
+        # Гонка и блочное решение читают lp-файл заново, а Ecole копирует
+        # модель при сбросе окружения (добавленные решения теряются), поэтому
+        # они принимают только один sol-файл 'теплого' старта
+        if use_racing or use_decomposition or use_scip_ecole:
+            if store_warm_starts and not (
+                use_warm_start and path_to_warm_start_file.is_file()
+            ):
+                path_to_warm_start_file = path_to_output_dir.joinpath(
+                    f"{problem_name}_store_warm_start.sol"
+                )
+                write_warm_start_file(
+                    path_to_warm_start_file, var_index, store_warm_starts[0]
+                )
+                use_warm_start = True
+                logger.info(
+                    f"Warm start of the nearest stored problem has been written "
+                    f"to `{path_to_warm_start_file}` (racing, decomposition and "
+                    f"SCIP+Ecole use a single warm start, "
+                    f"{len(store_warm_starts) - 1} ignored)"
+                )
+            elif store_warm_starts:
+                logger.warning(
+                    f"{len(store_warm_starts)} warm starts from the solution store "
+                    f"are ignored: racing, decomposition and SCIP+Ecole use only "
+                    f"`{path_to_warm_start_file.name}`"
+                )
+        else:
+            add_warm_starts(model_scip, var_index, store_warm_starts, logger)
+
+    # Политика ветвления для связки SCIP+Ecole
+    branching_policy = make_branching_policy(
+        name=config_params.get("branching_policy", "pseudocost"),
+        seed=config_params.get("branching_policy_seed"),
+        path_to_policy_weights=config_params.get("path_to_policy_weights"),
+        **config_params.get("learned_policy_params", {}),
+    )
+
     # Создать экземпляр окружения
     env = SimpleBranchingEnv(
-        observation_function=ecole.observation.Pseudocosts(),
+        observation_function=branching_policy.make_observation_function(),
         reward_function=ecole.reward.SolvingTime(),
         information_function={
             "nb_nodes": ecole.reward.NNodes().cumsum(),
@@ -65,35 +258,141 @@ def main():
         scip_params=scip_params,
     ).create_env()
 
+    # Решить независимые блоки задачи параллельно (если задача на них распадается)
+    decomposed_result: t.Optional[DecomposedResult] = None
+    if use_decomposition and not use_scip_ecole:
+        decomposed_result = scip_decomposed_optimize(
+            problem=load_problem_arrays(
+                path_to_lp_file,
+                path_to_arrays_dir=path_to_problem_arrays_dir,
+                logger=logger,
+            ),
+            scip_params=scip_params,
+            path_to_work_dir=path_to_output_dir.joinpath(f"{problem_name}_blocks"),
+            logger=logger,
+            path_to_warm_start_file=path_to_warm_start_file,
+            use_warm_start=use_warm_start,
+            **config_params.get("decomposition_params", {}),
+        )
+
     # Запустить процедуру поиска решения
-    if use_scip_ecole:
+    path_to_best_sol_file: t.Optional[PosixPath] = None
+    # Траектория границ целевой функции (показатели "в любой момент времени")
+    bound_trajectory: t.Optional[BoundTrajectory] = None
+    # Статус досрочной остановки (заменяет статус решателя userinterrupt)
+    stop_status: t.Optional[str] = None
+    if decomposed_result is not None:
+        logger.info("SCIP is used on independent blocks.")
+    elif use_racing:
+        # Результаты победителя записываются самой гонкой
+        logger.info("Race of SCIP configurations is used.")
+        racing_params: dict = dict(config_params.get("racing_params", {}))
+        path_to_best_sol_file = run_race(
+            racers=build_racers(
+                racing_params.pop(
+                    "paths_to_settings_files", [path_to_scip_solver_configs]
+                ),
+                seeds=racing_params.pop("seeds", None),
+            ),
+            path_to_lp_file=path_to_lp_file,
+            problem_name=problem_name,
+            path_to_output_dir=path_to_output_dir,
+            logger=logger,
+            time_limit=scip_params.get(SCIPAttributes.LIMITS_TIME),
+            path_to_warm_start_file=path_to_warm_start_file,
+            use_warm_start=use_warm_start,
+            **racing_params,
+        )
+    elif use_scip_ecole:
         # Использовать связку SCIP+Ecole
         logger.info("SCIP+Ecole bundle is used.")
-        model = scip_ecole_optimize(
+        # Телеметрия шагов цикла ветвления (журнал ведется выборочно)
+        telemetry = StepTelemetry(
+            logger=logger,
+            capacity=config_params.get("telemetry_capacity", 2**16),
+            log_every_n_steps=config_params.get("telemetry_log_every_n_steps", 1000),
+            log_every_seconds=config_params.get("telemetry_log_every_seconds", 30.0),
+        )
+        model, telemetry = scip_ecole_optimize(
             env=env,
-            path_to_lp_file=path_to_lp_file,
+            model_scip=model_scip,
             path_to_warm_start_file=path_to_warm_start_file,
             use_warm_start=use_warm_start,
+            logger=logger,
+            telemetry=telemetry,
+            branching_policy=branching_policy,
         )
+        # Записать трассу шагов для последующего анализа
+        path_to_trace_file = path_to_output_dir.joinpath(f"{problem_name}_trace.npz")
+        telemetry.save(path_to_trace_file)
+        logger.info(f"Step trace has been written to `{path_to_trace_file}`")
     else:
         # Использовать только решатель SCIP
         logger.info("Only SCIP is used.")
+        # Образцы хода решения (границы, зазор, узлы, итерации LP)
+        progress: t.Optional[SolveProgress] = None
+        if use_progress:
+            progress = SolveProgress(
+                problem_name=problem_name,
+                path_to_jsonl_file=path_to_output_dir.joinpath(
+                    f"{problem_name}_progress.jsonl"
+                ),
+                logger=logger,
+                **config_params.get("progress_params", {}),
+            )
+            progress.attach(model_scip)
+        bound_trajectory = BoundTrajectory()
+        bound_trajectory.attach(model_scip)
+        gap_stall_termination: t.Optional[GapStallTermination] = None
+        if use_gap_stall_termination:
+            gap_stall_termination = GapStallTermination(
+                logger=logger, **config_params.get("gap_stall_params", {})
+            )
+            gap_stall_termination.attach(model_scip)
         model = scip_optimize(
-            env=env,
-            path_to_lp_file=path_to_lp_file,
+            model_scip=model_scip,
+            scip_params=scip_params,
             path_to_warm_start_file=path_to_warm_start_file,
             use_warm_start=use_warm_start,
             logger=logger,
+            path_to_checkpoint_file=path_to_checkpoint_file if use_checkpoint else None,
+            checkpoint_min_interval=config_params.get("checkpoint_min_interval", 10.0),
         )
+        if progress is not None:
+            progress.close(model)
+        if gap_stall_termination is not None:
+            stop_status = gap_stall_termination.stop_status
 
     # Записать статистику и резульаты поиска решения
-    write_results_and_stats(
-        problem_name=problem_name,
-        model=model,
-        stats_before_solving=stats_before_solving,
-        path_to_output_dir=path_to_output_dir,
-        logger=logger,
-    )
+    if decomposed_result is not None:
+        path_to_best_sol_file = write_decomposed_results_and_stats(
+            problem_name=problem_name,
+            decomposed_result=decomposed_result,
+            stats_before_solving=stats_before_solving,
+            path_to_output_dir=path_to_output_dir,
+            logger=logger,
+        )
+    elif not use_racing:
+        path_to_best_sol_file = write_results_and_stats(
+            problem_name=problem_name,
+            model=model,
+            stats_before_solving=stats_before_solving,
+            path_to_output_dir=path_to_output_dir,
+            logger=logger,
+            bound_trajectory=bound_trajectory,
+            target_gaps=config_params.get("anytime_target_gaps", DEFAULT_TARGET_GAPS),
+            status=stop_status,
+        )
+        # Итоги отрезка -- для продолжения решения в режиме `--resume`
+        resume_state.add_segment(model, path_to_best_sol_file, status=stop_status)
+        if len(resume_state) > 1:
+            resume_state.log_summary(logger)
+
+    # Сохранить лучшее решение в хранилище
+    if solution_store is not None and path_to_best_sol_file is not None:
+        solution_store.add(
+            path_to_lp_file, path_to_best_sol_file, instance_features, logger
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+import typing as t
+
+import click
+import pathlib2
+import yaml
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.anytime_metrics import DEFAULT_TARGET_GAPS
+from scip_ecole_model.sweep import build_sweep_jobs, run_sweep
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+
+@click.command()
+@click.option(
+    "--path-to-lp-file",
+    "paths_to_lp_files",
+    required=True,
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    help="Путь до lp-файла (опцию можно повторять)",
+)
+@click.option(
+    "--path-to-settings-file",
+    "paths_to_settings_files",
+    required=True,
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    help="Путь до set-файла настроек решателя SCIP (опцию можно повторять)",
+)
+@click.option(
+    "--path-to-param-grid",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib2.Path),
+    default=None,
+    help="Путь до yaml-файла сетки параметров вида `параметр: [значения]`",
+)
+@click.option(
+    "--time-limit",
+    type=float,
+    default=None,
+    help="Ограничение по времени на одно задание (с)",
+)
+@click.option(
+    "--n-workers",
+    type=int,
+    default=None,
+    help="Число процессов (по умолчанию -- число ядер)",
+)
+@click.option(
+    "--path-to-output-dir",
+    type=click.Path(path_type=pathlib2.Path),
+    default=Path("./output_from_model/sweep"),
+    help="Путь до директории с результатами перебора",
+)
+@click.option(
+    "--path-to-problem-cache-dir",
+    type=click.Path(path_type=pathlib2.Path),
+    default=None,
+    help="Путь до директории кэша прочитанных задач",
+)
+@click.option(
+    "--target-gap",
+    "target_gaps",
+    multiple=True,
+    type=float,
+    default=DEFAULT_TARGET_GAPS,
+    help="Целевой относительный зазор для показателя 'время до зазора' "
+    "(опцию можно повторять)",
+)
+def main(
+    paths_to_lp_files: t.Tuple[PosixPath, ...],
+    paths_to_settings_files: t.Tuple[PosixPath, ...],
+    path_to_param_grid: t.Optional[PosixPath],
+    time_limit: t.Optional[float],
+    n_workers: t.Optional[int],
+    path_to_output_dir: PosixPath,
+    path_to_problem_cache_dir: t.Optional[PosixPath],
+    target_gaps: t.Tuple[float, ...],
+) -> t.NoReturn:
+    """
+    Запускает параллельный перебор set-файлов (и сетки параметров)
+    решателя SCIP на списке задач
+    """
+    param_grid: t.Optional[dict] = None
+    if path_to_param_grid is not None:
+        with open(path_to_param_grid) as fo:
+            param_grid = yaml.safe_load(fo)
+
+    jobs = build_sweep_jobs(
+        paths_to_lp_files=paths_to_lp_files,
+        paths_to_settings_files=paths_to_settings_files,
+        path_to_output_dir=path_to_output_dir,
+        param_grid=param_grid,
+        time_limit=time_limit,
+        path_to_problem_cache_dir=path_to_problem_cache_dir,
+        target_gaps=target_gaps,
+    )
+
+    run_sweep(
+        jobs=jobs,
+        path_to_results_file=path_to_output_dir.joinpath("sweep_results.csv"),
+        logger=logger,
+        n_workers=n_workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import json
+import typing as t
+
+import numpy as np
+import pyscipopt
+from pathlib2 import PosixPath
+
+# Целевые относительные зазоры по умолчанию (10%, 5%, 1%)
+DEFAULT_TARGET_GAPS = (0.1, 0.05, 0.01)
+
+
+def get_time_to_gap_key(target_gap: float) -> str:
+    """
+    Имя показателя "время до зазора" (например, `time_to_gap_1%`)
+    """
+    return f"time_to_gap_{target_gap * 100:g}%"
+
+
+def _berthold_gap(values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """
+    Функция зазора в определении Бертольда: 1, если значение неизвестно
+    или знаки различаются, иначе |a - b| / max(|a|, |b|)
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gap = np.abs(values - reference) / np.maximum(np.abs(values), np.abs(reference))
+        gap = np.where(values == reference, 0.0, gap)
+
+        return np.where(
+            ~np.isfinite(values) | ~np.isfinite(reference) | (values * reference < 0.0),
+            1.0,
+            gap,
+        )
+
+
+def _scip_gap(primal_bounds: np.ndarray, dual_bounds: np.ndarray) -> np.ndarray:
+    """
+    Относительный зазор в определении решателя SCIP (векторно)
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gap = np.abs(primal_bounds - dual_bounds) / np.minimum(
+            np.abs(primal_bounds), np.abs(dual_bounds)
+        )
+        gap = np.where(
+            (primal_bounds * dual_bounds <= 0.0)
+            | ~np.isfinite(primal_bounds + dual_bounds),
+            np.inf,
+            gap,
+        )
+
+        return np.where(primal_bounds == dual_bounds, 0.0, gap)
+
+
+def _integrate_step_function(
+    times: np.ndarray, values: np.ndarray, total_time: float
+) -> float:
+    """
+    Интеграл ступенчатой функции на [0, total_time]: значение в точке
+    действует до следующей точки, до первой точки функция равна 1
+    """
+    edges = np.concatenate([[0.0], np.clip(times, 0.0, total_time), [total_time]])
+
+    return float(np.sum(np.concatenate([[1.0], values]) * np.diff(edges)))
+
+
+def compute_primal_integral(
+    times: np.ndarray,
+    primal_bounds: np.ndarray,
+    total_time: float,
+    reference_objective: float,
+) -> float:
+    """
+    Примальный интеграл траектории относительно эталонного значения
+    целевой функции (например, лучшего известного решения задачи)
+    """
+    return _integrate_step_function(
+        times,
+        _berthold_gap(primal_bounds, np.full_like(primal_bounds, reference_objective)),
+        total_time,
+    )
+
+
+class _BoundTrajectoryEventhdlr(pyscipopt.Eventhdlr):
+    """
+    Обработчик событий решателя, записывающий точку траектории
+    при новом лучшем решении и при изменении двойственной границы
+    """
+
+    def __init__(self, trajectory: "BoundTrajectory"):
+        self.trajectory = trajectory
+        self.last_dual_bound: t.Optional[float] = None
+
+    def eventinit(self):
+        self.model.catchEvent(pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND, self)
+        self.model.catchEvent(pyscipopt.SCIP_EVENTTYPE.NODESOLVED, self)
+
+    def eventexit(self):
+        self.model.dropEvent(pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND, self)
+        self.model.dropEvent(pyscipopt.SCIP_EVENTTYPE.NODESOLVED, self)
+
+    def eventexec(self, event):
+        dual_bound: float = self.model.getDualbound()
+        if event.getType() == pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND:
+            # Внутри события граница может быть еще не обновлена
+            primal_bound = self.model.getSolObjVal(self.model.getBestSol())
+        elif dual_bound != self.last_dual_bound:
+            primal_bound = self.model.getPrimalbound()
+        else:
+            return
+
+        self.last_dual_bound = dual_bound
+        self.trajectory.record(
+            self.model.getSolvingTime(), primal_bound, dual_bound, self.model.infinity()
+        )
+
+
+class BoundTrajectory:
+    """
+    Траектория границ целевой функции по ходу решения и показатели
+    "в любой момент времени": примальный интеграл, примально-двойственный
+    интеграл, время до первого решения и время до заданных зазоров
+
+    Эталоном примального интеграла по умолчанию служит лучшее решение
+    запуска; для сравнения запусков между собой нужно передавать общее
+    эталонное значение (лучшее решение задачи по всем запускам)
+    """
+
+    def __init__(self):
+        self.times: t.List[float] = []
+        self.primal_bounds: t.List[float] = []
+        self.dual_bounds: t.List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def attach(self, model: pyscipopt.scip.Model) -> t.NoReturn:
+        """
+        Подключает обработчик событий к модели (до запуска решения)
+        """
+        model.includeEventhdlr(
+            _BoundTrajectoryEventhdlr(self),
+            "bound_trajectory",
+            "Records primal and dual bounds over solving time",
+        )
+
+    def record(
+        self,
+        time_: float,
+        primal_bound: float,
+        dual_bound: float,
+        infinity: float = np.inf,
+    ) -> t.NoReturn:
+        """
+        Добавляет точку траектории (значения решателя, не меньшие
+        по модулю `infinity`, считаются бесконечными)
+        """
+        self.times.append(time_)
+        self.primal_bounds.append(
+            np.copysign(np.inf, primal_bound)
+            if abs(primal_bound) >= infinity
+            else primal_bound
+        )
+        self.dual_bounds.append(
+            np.copysign(np.inf, dual_bound)
+            if abs(dual_bound) >= infinity
+            else dual_bound
+        )
+
+    def get_points(
+        self, model: pyscipopt.scip.Model
+    ) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Возвращает моменты времени, примальные и двойственные границы
+        траектории решенной модели (итоговые границы добавляются
+        последней точкой, бесконечные значения -- np.inf)
+        """
+        times = np.array(self.times + [model.getSolvingTime()], dtype=np.float64)
+        primal_bounds = np.array(
+            self.primal_bounds + [model.getPrimalbound()], dtype=np.float64
+        )
+        dual_bounds = np.array(
+            self.dual_bounds + [model.getDualbound()], dtype=np.float64
+        )
+        infinity: float = model.infinity()
+        primal_bounds[np.abs(primal_bounds) >= infinity] = np.inf
+        dual_bounds[np.abs(dual_bounds) >= infinity] = np.inf
+
+        return times, primal_bounds, dual_bounds
+
+    def to_dict(self, model: pyscipopt.scip.Model) -> dict:
+        """
+        Траектория решенной модели в виде, пригодном для записи в json
+        (бесконечные границы -- None)
+        """
+        times, primal_bounds, dual_bounds = self.get_points(model)
+
+        def _to_list(values: np.ndarray) -> t.List[t.Optional[float]]:
+            return [float(value) if np.isfinite(value) else None for value in values]
+
+        return {
+            "objective_sense": model.getObjectiveSense(),
+            "times": times.tolist(),
+            "primal_bounds": _to_list(primal_bounds),
+            "dual_bounds": _to_list(dual_bounds),
+        }
+
+    def compute_metrics(
+        self,
+        model: pyscipopt.scip.Model,
+        target_gaps: t.Sequence[float] = DEFAULT_TARGET_GAPS,
+        reference_objective: t.Optional[float] = None,
+    ) -> t.Dict[str, t.Optional[float]]:
+        """
+        Вычисляет показатели по траектории решенной модели; примальный
+        интеграл считается относительно `reference_objective`, а если оно
+        не передано -- относительно лучшего решения запуска
+        """
+        solving_time: float = model.getSolvingTime()
+        times, primal_bounds, dual_bounds = self.get_points(model)
+        if reference_objective is None:
+            reference_objective = primal_bounds[-1]
+
+        has_sol = np.isfinite(primal_bounds)
+        scip_gaps = _scip_gap(primal_bounds, dual_bounds)
+
+        def _first_time(mask: np.ndarray) -> t.Optional[float]:
+            return float(times[np.argmax(mask)]) if mask.any() else None
+
+        metrics: t.Dict[str, t.Optional[float]] = {
+            "solving_time": solving_time,
+            "n_points": len(self),
+            "primal_integral": compute_primal_integral(
+                times, primal_bounds, solving_time, reference_objective
+            ),
+            "primal_dual_integral": _integrate_step_function(
+                times, _berthold_gap(primal_bounds, dual_bounds), solving_time
+            ),
+            "time_to_first_sol": _first_time(has_sol),
+        }
+        for target_gap in target_gaps:
+            metrics[get_time_to_gap_key(target_gap)] = _first_time(
+                scip_gaps <= target_gap
+            )
+
+        return metrics
+
+
+def write_anytime_metrics(
+    path_to_metrics_file: PosixPath,
+    metrics: t.Dict[str, t.Optional[float]],
+    trajectory: t.Optional[dict] = None,
+) -> t.NoReturn:
+    """
+    Записывает показатели в json-файл (недостигнутые -- null); траектория
+    границ записывается рядом, чтобы примальный интеграл можно было
+    пересчитать относительно лучшего решения по всем запускам
+    """
+    content = dict(metrics)
+    if trajectory is not None:
+        content["trajectory"] = trajectory
+    with open(path_to_metrics_file, mode="w", encoding="utf-8") as fo:
+        json.dump(content, fo, indent=2)
@@ -1,13 +1,43 @@
+import hashlib
 import logging
 import sys
 import typing as t
 from collections import namedtuple
 
+import numpy as np
+import pathlib2
 import pyscipopt
 import yaml
 from pathlib2 import Path, PosixPath
 
+from scip_ecole_model.anytime_metrics import (
+    DEFAULT_TARGET_GAPS,
+    BoundTrajectory,
+    write_anytime_metrics,
+)
+from scip_ecole_model.sol_io import SolData, read_sol_file, write_sol_file
 from scip_ecole_model.utils.scip_ecole_logger import logger
+from scip_ecole_model.variable_index import VariableIndex
+
+# Статистика задачи до запуска решения
+ModelStats = namedtuple("ModelStats", ["n_vars", "n_bin_vars", "n_int_vars", "n_conss"])
+# Сводка результатов поиска решения (размеры задачи -- после предобработки)
+ResultsSummary = namedtuple(
+    "ResultsSummary",
+    [
+        "obj_val",
+        "obj_sense",
+        "gap",
+        "solving_time",
+        "status",
+        "n_sols",
+        "n_best_sols",
+        "n_vars_after_presolving",
+        "n_bin_vars_after_presolving",
+        "n_int_vars_after_presolving",
+        "n_conss_after_presolving",
+    ],
+)
 
 
 def read_config_yaml_file(path_to_config_file: PosixPath) -> dict:
@@ -27,6 +57,19 @@ def read_config_yaml_file(path_to_config_file: PosixPath) -> dict:
     return config_params
 
 
+def get_file_hash(path_to_file: PosixPath, chunk_size: int = 2**20) -> str:
+    """
+    Вычисляет хэш содержимого файла (читает файл блоками,
+    не загружая его в память целиком)
+    """
+    file_hash = hashlib.sha256()
+    with open(path_to_file, mode="rb") as fo:
+        for chunk in iter(lambda: fo.read(chunk_size), b""):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
 def read_scip_solver_settings_file(path_to_settings_file: PosixPath) -> dict:
     """
     Читает файл настроек решателя SCIP
@@ -80,114 +123,223 @@ def read_scip_solver_settings_file(path_to_settings_file: PosixPath) -> dict:
 
 
 def get_stats_before_solving(
-    path_to_lp_file: PosixPath, logger: logging.Logger
+    model: pyscipopt.scip.Model, logger: logging.Logger
 ) -> t.NamedTuple:
     """
     Собирает статистику о задаче до запуска решения
+    по уже прочитанной модели (без повторного чтения lp-файла)
     """
-    model = pyscipopt.scip.Model()
-    try:
-        model.readProblem(path_to_lp_file)
-    except OSError as err:
-        logger.error(f"{err}")
-        sys.exit(-1)
-    n_vars: int = model.getNVars()
-    n_bin_vars: int = model.getNBinVars()
-    n_int_vars: int = model.getNIntVars()
-    n_conss: int = model.getNConss()
+    return ModelStats(
+        n_vars=model.getNVars(),
+        n_bin_vars=model.getNBinVars(),
+        n_int_vars=model.getNIntVars(),
+        n_conss=model.getNConss(),
+    )
 
-    model_stats = namedtuple(
-        "model_stats", ["n_vars", "n_bin_vars", "n_int_vars", "n_conss"]
+
+def get_results_summary(model: pyscipopt.scip.Model) -> t.NamedTuple:
+    """
+    Собирает сводку результатов поиска решения по решенной модели
+    """
+    return ResultsSummary(
+        obj_val=model.getObjVal(),
+        obj_sense=model.getObjectiveSense(),
+        gap=model.getGap(),
+        solving_time=model.getSolvingTime(),
+        status=model.getStatus(),
+        n_sols=model.getNSols(),
+        n_best_sols=model.getNBestSolsFound(),
+        n_vars_after_presolving=model.getNVars(),
+        n_bin_vars_after_presolving=model.getNBinVars(),
+        n_int_vars_after_presolving=model.getNIntVars(),
+        n_conss_after_presolving=model.getNConss(),
     )
-    model_stats.n_vars = n_vars
-    model_stats.n_bin_vars = n_bin_vars
-    model_stats.n_int_vars = n_int_vars
-    model_stats.n_conss = n_conss
 
-    return model_stats
 
+def compute_gap(primal_bound: float, dual_bound: float) -> float:
+    """
+    Относительный зазор в определении решателя SCIP
+    """
+    if primal_bound == dual_bound:
+        return 0.0
+    if primal_bound * dual_bound <= 0.0 or not np.isfinite(primal_bound + dual_bound):
+        return float("inf")
 
-def write_results_and_stats(
+    return abs(primal_bound - dual_bound) / min(abs(primal_bound), abs(dual_bound))
+
+
+def log_results_summary(
     problem_name: str,
-    model: pyscipopt.scip.Model,
+    results_summary: t.NamedTuple,
     stats_before_solving: t.NamedTuple,
-    path_to_output_dir: PosixPath,
     logger: logging.Logger,
 ) -> t.NoReturn:
     """
-    Записывает результаты поиска решения и статистику
+    Записывает в журнал сводку о задаче и результатах поиска решения
     """
-    obj_val: float = model.getObjVal()
-    obj_sense: str = model.getObjectiveSense()
-    gap: float = model.getGap()
-    solving_time: float = model.getSolvingTime()
-    status: str = model.getStatus()
-    n_sols: int = model.getNSols()
-    n_best_sols: int = model.getNBestSolsFound()
-
     n_vars: int = stats_before_solving.n_vars
     n_bin_vars: int = stats_before_solving.n_bin_vars
     n_int_vars: int = stats_before_solving.n_int_vars
     n_cont_vars: int = n_vars - n_bin_vars - n_int_vars
     n_conss: int = stats_before_solving.n_conss
 
-    n_vars_after_presolving: int = model.getNVars()
-    n_bin_vars_after_presolving: int = model.getNBinVars()
-    n_int_vars_after_presolving: int = model.getNIntVars()
+    n_vars_after_presolving: int = results_summary.n_vars_after_presolving
+    n_bin_vars_after_presolving: int = results_summary.n_bin_vars_after_presolving
+    n_int_vars_after_presolving: int = results_summary.n_int_vars_after_presolving
     n_cont_vars_after_presolving: int = (
         n_vars_after_presolving
         - n_bin_vars_after_presolving
         - n_int_vars_after_presolving
     )
-    n_conss_after_presolving: int = model.getNConss()
+    n_conss_after_presolving: int = results_summary.n_conss_after_presolving
 
     logger.info(
         f"\n\tSummary:\n"
-        f"\t- Problem name (sense): {problem_name} ({obj_sense})\n"
+        f"\t- Problem name (sense): {problem_name} ({results_summary.obj_sense})\n"
         f"\t- N Vars: {n_vars} (after presolving {n_vars - n_vars_after_presolving} vars was deleted)\n"
         f"\t\t* N Bin Vars: {n_bin_vars} (after presolving {n_bin_vars_after_presolving})\n"
         f"\t\t* N Int Vars: {n_int_vars} (after presolving {n_int_vars_after_presolving})\n"
         f"\t\t* N Cont Vars: {n_cont_vars} (after presolving {n_cont_vars_after_presolving})\n"
         f"\t- N Conss: {n_conss} (after presolving {n_conss - n_conss_after_presolving} conss was deleted)\n"
         f"\n\tResults:\n"
-        f"\t- N Sols / N Best sols: {n_sols} / {n_best_sols}\n"
-        f"\t- Objective value [{status}]: {obj_val:.8g}\n"
-        f"\t- Gap: {gap * 100:.3g}%\n"
-        f"\t- Solving time: {solving_time / 60:.2g} min"
+        f"\t- N Sols / N Best sols: {results_summary.n_sols} / {results_summary.n_best_sols}\n"
+        f"\t- Objective value [{results_summary.status}]: {results_summary.obj_val:.8g}\n"
+        f"\t- Gap: {results_summary.gap * 100:.3g}%\n"
+        f"\t- Solving time: {results_summary.solving_time / 60:.2g} min"
     )
 
-    path_to_output_dir = Path().cwd().joinpath(path_to_output_dir)
-    best_sol_filename = (
-        f"{problem_name}_{n_vars}_{n_bin_vars}_{n_int_vars}_{n_conss}.sol"
+
+def get_results_filename_stem(
+    problem_name: str, stats_before_solving: t.NamedTuple
+) -> str:
+    """
+    Формирует общую часть имен sol- и stats-файлов результатов
+    """
+    return (
+        f"{problem_name}_{stats_before_solving.n_vars}_"
+        f"{stats_before_solving.n_bin_vars}_{stats_before_solving.n_int_vars}_"
+        f"{stats_before_solving.n_conss}"
     )
-    stats_filename = f"{problem_name}_{n_vars}_{n_bin_vars}_{n_int_vars}_{n_conss}.stats"
 
-    model.writeBestSol(path_to_output_dir.joinpath(best_sol_filename), write_zeros=True)
+
+def write_results_and_stats(
+    problem_name: str,
+    model: pyscipopt.scip.Model,
+    stats_before_solving: t.NamedTuple,
+    path_to_output_dir: PosixPath,
+    logger: logging.Logger,
+    compress_best_sol: bool = False,
+    bound_trajectory: t.Optional[BoundTrajectory] = None,
+    target_gaps: t.Sequence[float] = DEFAULT_TARGET_GAPS,
+    status: t.Optional[str] = None,
+) -> PosixPath:
+    """
+    Записывает результаты поиска решения и статистику;
+    возвращает путь до sol-файла лучшего решения
+
+    При `compress_best_sol=True` лучшее решение записывается
+    в сжатый sol.gz-файл блочной записью. Если передана траектория
+    границ, рядом со stats-файлом записываются показатели
+    "в любой момент времени" (anytime.json). Статус `status` заменяет
+    статус решателя в сводке (например, при досрочной остановке)
+    """
+    results_summary: t.NamedTuple = get_results_summary(model)
+    if status is not None:
+        results_summary = results_summary._replace(status=status)
+    log_results_summary(problem_name, results_summary, stats_before_solving, logger)
+
+    path_to_output_dir = Path().cwd().joinpath(path_to_output_dir)
+    filename_stem: str = get_results_filename_stem(problem_name, stats_before_solving)
+    best_sol_filename = f"{filename_stem}.sol"
+    stats_filename = f"{filename_stem}.stats"
+
+    if compress_best_sol:
+        path_to_best_sol_file = path_to_output_dir.joinpath(f"{best_sol_filename}.gz")
+        var_index = VariableIndex.from_model(model)
+        write_sol_file(
+            path_to_best_sol_file,
+            names=var_index.names,
+            values=var_index.all_values(model),
+            objs=var_index.objs,
+            objective_value=results_summary.obj_val,
+            write_zeros=True,
+        )
+    else:
+        path_to_best_sol_file = path_to_output_dir.joinpath(best_sol_filename)
+        model.writeBestSol(path_to_best_sol_file, write_zeros=True)
     model.writeStatistics(path_to_output_dir.joinpath(stats_filename))
 
+    if bound_trajectory is not None:
+        anytime_metrics = bound_trajectory.compute_metrics(model, target_gaps)
+        path_to_metrics_file = path_to_output_dir.joinpath(
+            f"{filename_stem}.anytime.json"
+        )
+        write_anytime_metrics(
+            path_to_metrics_file, anytime_metrics, bound_trajectory.to_dict(model)
+        )
+        logger.info(
+            f"Anytime metrics have been written to `{path_to_metrics_file.name}`: "
+            + ", ".join(
+                f"{name} = {value:.4g}" if value is not None else f"{name} = -"
+                for name, value in anytime_metrics.items()
+            )
+        )
+
+    return path_to_best_sol_file
+
+
+def _find_var_by_name(
+    var_name: str, vars_: t.Iterable[pyscipopt.scip.Variable]
+) -> pyscipopt.scip.Variable:
+    """
+    Находит переменную по имени однократным просмотром списка
+    (для единичного запроса дешевле, чем построение VariableIndex)
+    """
+    for var in vars_:
+        if var.name == var_name:
+            return var
+
+    raise KeyError(var_name)
+
 
 def get_var_value_by_var_name(
     var_name: str,
     vars_: t.List[pyscipopt.scip.Variable],
     model: pyscipopt.scip.Model,
     sol: pyscipopt.scip.Solution,
+    var_index: t.Optional[VariableIndex] = None,
 ) -> float:
     """
     Извлекает значение переменной по ее имени
     из переданного решения
+
+    Для серии запросов следует один раз построить VariableIndex
+    и передавать его в `var_index` (или использовать VariableIndex.values_for)
     """
-    var_index: int = [var.getIndex() for var in vars_ if var.name == var_name][0]
+    var: pyscipopt.scip.Variable = (
+        _find_var_by_name(var_name, vars_)
+        if var_index is None
+        else var_index.var_by_name(var_name)
+    )
 
-    return model.getSolVal(sol, vars_[var_index])
+    return model.getSolVal(sol, var)
 
 
 def get_obj_var_by_var_name(
-    var_name: str, vars_: t.List[pyscipopt.scip.Variable]
+    var_name: str,
+    vars_: t.List[pyscipopt.scip.Variable],
+    var_index: t.Optional[VariableIndex] = None,
 ) -> float:
     """
     Извлекает коэффициент при переменной в целевой функции по имени переменной
+
+    Для серии запросов следует один раз построить VariableIndex
+    и передавать его в `var_index` (или использовать VariableIndex.objs_for)
     """
-    return [var.getObj() for var in vars_ if var.name == var_name][0]
+    if var_index is None:
+        return _find_var_by_name(var_name, vars_).getObj()
+
+    return float(var_index.objs[var_index.position_of(var_name)])
 
 
 def write_warm_start(
@@ -199,15 +351,19 @@ def write_warm_start(
     Записывает 'теплый' старт для сценария с бинарными переменными
     на базе sol-файла сценария без бинарных переменных
     """
-    base_sol: dict = parse_sol_file(path_to_base_sol_file)
-
-    with open(path_to_warm_start_file, mode="w", encoding="utf-8") as warm_start:
-        for var in tqdm(vars_):
-            var_name = var.name
-            if var_name in base_sol:
-                value = base_sol[var_name]
-            else:
-                value = 0
-            warm_start.write(
-                f"{var_name:<50}{value:>20}  (obj:{var_name_to_obj_var[var.name]})\n"
-            )
+    base_sol: SolData = read_sol_file(path_to_base_sol_file)
+    var_index = VariableIndex(vars_)
+
+    # Переменные, отсутствующие в базовом решении, инициализируются нулями
+    values = np.zeros(len(var_index), dtype=np.float64)
+    positions: np.ndarray = var_index.positions_of(base_sol.names, allow_missing=True)
+    found_mask = positions >= 0
+    values[positions[found_mask]] = base_sol.values[found_mask]
+
+    write_sol_file(
+        path_to_warm_start_file,
+        names=var_index.names,
+        values=values,
+        objs=var_index.objs,
+        write_zeros=True,
+    )
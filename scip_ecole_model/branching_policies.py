@@ -0,0 +1,164 @@
+import abc
+import typing as t
+
+import ecole
+import numpy as np
+import pyscipopt
+from pathlib2 import PosixPath
+
+
+class BranchingPolicy(abc.ABC):
+    """
+    Базовый класс политики ветвления для окружения Ecole
+
+    Политика получает массив кандидатов `action_set` (индексы переменных
+    преобразованной задачи) и наблюдение, и возвращает выбранный индекс
+    """
+
+    name: str = "base"
+
+    def make_observation_function(self) -> t.Any:
+        """
+        Возвращает функцию наблюдения Ecole, нужную политике
+        (None -- окружение создается без наблюдения)
+        """
+        return None
+
+    def reset(self, model: pyscipopt.scip.Model) -> t.NoReturn:
+        """
+        Подготавливает политику к новому эпизоду
+        """
+
+    def close(self) -> t.NoReturn:
+        """
+        Завершает эпизод (освобождает ресурсы политики)
+        """
+
+    @abc.abstractmethod
+    def __call__(self, action_set: np.ndarray, observation: t.Any) -> int:
+        """
+        Возвращает индекс переменной, по которой выполняется ветвление
+        """
+
+
+class FirstCandidatePolicy(BranchingPolicy):
+    """
+    Ветвление по первому кандидату (прежнее поведение)
+    """
+
+    name = "first"
+
+    def __call__(self, action_set: np.ndarray, observation: t.Any) -> int:
+        return action_set[0]
+
+
+class PseudocostPolicy(BranchingPolicy):
+    """
+    Ветвление по кандидату с наибольшей псевдостоимостью
+    (наблюдение ecole.observation.Pseudocosts)
+    """
+
+    name = "pseudocost"
+
+    def make_observation_function(self) -> ecole.observation.Pseudocosts:
+        return ecole.observation.Pseudocosts()
+
+    def __call__(self, action_set: np.ndarray, observation: np.ndarray) -> int:
+        scores: np.ndarray = np.asarray(observation)[action_set]
+        # Псевдостоимости некандидатов и неинициализированных переменных -- NaN
+        if np.isnan(scores).all():
+            return action_set[0]
+
+        return action_set[np.nanargmax(scores)]
+
+
+class MostFractionalPolicy(BranchingPolicy):
+    """
+    Ветвление по кандидату, значение которого в LP-решении
+    наиболее удалено от целого (дробные части значений всех переменных
+    берутся из наблюдения ecole.observation.NodeBipartite)
+    """
+
+    name = "most_fractional"
+
+    def __init__(self):
+        self._solution_frac_column = int(
+            ecole.observation.NodeBipartiteObs.ColumnFeatures.solution_frac
+        )
+
+    def make_observation_function(self) -> ecole.observation.NodeBipartite:
+        return ecole.observation.NodeBipartite()
+
+    def __call__(
+        self,
+        action_set: np.ndarray,
+        observation: "ecole.observation.NodeBipartiteObs",
+    ) -> int:
+        fractionality: np.ndarray = np.asarray(observation.column_features)[
+            action_set, self._solution_frac_column
+        ]
+
+        return action_set[np.argmax(np.minimum(fractionality, 1.0 - fractionality))]
+
+
+class RandomPolicy(BranchingPolicy):
+    """
+    Ветвление по случайному кандидату
+    """
+
+    name = "random"
+
+    def __init__(self, seed: t.Optional[int] = None):
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+
+    def reset(self, model: pyscipopt.scip.Model) -> t.NoReturn:
+        self._rng = np.random.default_rng(self.seed)
+
+    def __call__(self, action_set: np.ndarray, observation: t.Any) -> int:
+        return action_set[self._rng.integers(len(action_set))]
+
+
+LEARNED_POLICY_NAME = "learned"
+
+BRANCHING_POLICIES: t.Dict[str, t.Type[BranchingPolicy]] = {
+    policy_class.name: policy_class
+    for policy_class in (
+        FirstCandidatePolicy,
+        PseudocostPolicy,
+        MostFractionalPolicy,
+        RandomPolicy,
+    )
+}
+
+
+def make_branching_policy(
+    name: str,
+    seed: t.Optional[int] = None,
+    path_to_policy_weights: t.Optional[PosixPath] = None,
+    **learned_policy_params,
+) -> BranchingPolicy:
+    """
+    Создает политику ветвления по имени
+    """
+    if name == LEARNED_POLICY_NAME:
+        # Обученная политика зависит от этого модуля, поэтому импортируется здесь
+        from scip_ecole_model.learned_policy import LearnedPolicy
+
+        if path_to_policy_weights is None:
+            raise ValueError(f"Policy `{name}` requires a path to policy weights")
+
+        return LearnedPolicy.from_file(path_to_policy_weights, **learned_policy_params)
+
+    try:
+        policy_class = BRANCHING_POLICIES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown branching policy `{name}` "
+            f"(available: {', '.join(BRANCHING_POLICIES)}, {LEARNED_POLICY_NAME})"
+        ) from None
+
+    if policy_class is RandomPolicy:
+        return RandomPolicy(seed=seed)
+
+    return policy_class()
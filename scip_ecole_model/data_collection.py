@@ -0,0 +1,479 @@
+import concurrent.futures
+import json
+import logging
+import os
+import re
+import time
+import typing as t
+from dataclasses import dataclass
+
+import ecole
+import numpy as np
+import pathlib2
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.auxiliary_functions import get_file_hash
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+_INDEX_FILENAME = "index.json"
+_TMP_FILE_PREFIX = ".tmp_"
+_SHARD_FILE_EXTENSION = ".npz"
+# Временные файлы и шарды, которые записывает сбор данных
+_STALE_FILE_PATTERN = re.compile(
+    rf"^(?P<tmp_prefix>{re.escape(_TMP_FILE_PREFIX)}\d+_)?"
+    rf"(?:{re.escape(_INDEX_FILENAME)}"
+    rf"|(?P<episode_key>.+)_\d{{4}}(?:{re.escape(_SHARD_FILE_EXTENSION)})?)$"
+)
+
+# Массивы одного шарда: признаки разных образцов уложены подряд,
+# границы образцов задаются массивами смещений (как в CSR-матрице)
+_SHARD_ARRAYS = (
+    "row_features",
+    "row_offsets",
+    "column_features",
+    "column_offsets",
+    "edge_indices",
+    "edge_values",
+    "edge_offsets",
+    "action_set",
+    "scores",
+    "action_set_offsets",
+    "actions",
+)
+
+
+class ExploreThenStrongBranch:
+    """
+    Функция наблюдения эксперта: с вероятностью `expert_probability`
+    возвращает оценки сильного ветвления (strong branching),
+    иначе -- дешевые псевдостоимости (исследование дерева)
+    """
+
+    def __init__(self, expert_probability: float, rng: np.random.Generator):
+        self.expert_probability = expert_probability
+        self.rng = rng
+        self.pseudocosts_function = ecole.observation.Pseudocosts()
+        self.strong_branching_function = ecole.observation.StrongBranchingScores()
+
+    def before_reset(self, model: ecole.scip.Model) -> t.NoReturn:
+        self.pseudocosts_function.before_reset(model)
+        self.strong_branching_function.before_reset(model)
+
+    def extract(self, model: ecole.scip.Model, done: bool) -> t.Tuple[np.ndarray, bool]:
+        if self.rng.random() < self.expert_probability:
+            return self.strong_branching_function.extract(model, done), True
+
+        return self.pseudocosts_function.extract(model, done), False
+
+
+@dataclass(frozen=True)
+class CollectionEpisode:
+    """
+    Класс эпизода сбора данных: одна задача с одним начальным значением
+    """
+
+    path_to_lp_file: PosixPath
+    instance_hash: str
+    seed: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.instance_hash[:16]}_{self.seed}"
+
+
+class _ShardWriter:
+    """
+    Накапливает образцы эпизода и сбрасывает их в шарды
+    фиксированного размера (признаки хранятся в float32)
+    """
+
+    def __init__(
+        self,
+        *,
+        path_to_dataset_dir: PosixPath,
+        episode_key: str,
+        samples_per_shard: int,
+        compress: bool,
+    ):
+        self.path_to_dataset_dir = path_to_dataset_dir
+        self.episode_key = episode_key
+        self.samples_per_shard = samples_per_shard
+        self.compress = compress
+
+        self.shards: t.List[dict] = []
+        self._samples: t.List[dict] = []
+
+    def append(self, sample: dict) -> t.NoReturn:
+        self._samples.append(sample)
+        if len(self._samples) >= self.samples_per_shard:
+            self.flush()
+
+    def flush(self) -> t.NoReturn:
+        """
+        Записывает накопленные образцы в очередной шард
+        """
+        if not self._samples:
+            return
+
+        shard: t.Dict[str, np.ndarray] = _pack_samples(self._samples)
+        shard_name = f"{self.episode_key}_{len(self.shards):04d}"
+        if self.compress:
+            shard_name += _SHARD_FILE_EXTENSION
+        path_to_shard = self.path_to_dataset_dir.joinpath(shard_name)
+        path_to_tmp_shard = self.path_to_dataset_dir.joinpath(
+            f"{_TMP_FILE_PREFIX}{os.getpid()}_{shard_name}"
+        )
+        # Шард записывается под временным именем и атомарно переименовывается,
+        # поэтому прерванный сбор не оставляет поврежденных шардов
+        if self.compress:
+            with open(path_to_tmp_shard, mode="wb") as fo:
+                np.savez_compressed(fo, **shard)
+        else:
+            # Несжатый шард -- директория npy-файлов (читается через mmap)
+            path_to_tmp_shard.mkdir()
+            for array_name, array in shard.items():
+                np.save(str(path_to_tmp_shard.joinpath(f"{array_name}.npy")), array)
+        os.replace(path_to_tmp_shard, path_to_shard)
+
+        self.shards.append({"name": shard_name, "n_samples": len(self._samples)})
+        self._samples = []
+
+
+def _pack_samples(samples: t.List[dict]) -> t.Dict[str, np.ndarray]:
+    """
+    Укладывает образцы переменного размера в плоские массивы со смещениями
+    """
+
+    def _offsets(sizes: t.Iterable[int]) -> np.ndarray:
+        return np.concatenate(([0], np.cumsum(list(sizes)))).astype(np.int64)
+
+    return {
+        "row_features": np.concatenate([s["row_features"] for s in samples]),
+        "row_offsets": _offsets(len(s["row_features"]) for s in samples),
+        "column_features": np.concatenate([s["column_features"] for s in samples]),
+        "column_offsets": _offsets(len(s["column_features"]) for s in samples),
+        "edge_indices": np.concatenate([s["edge_indices"] for s in samples], axis=1),
+        "edge_values": np.concatenate([s["edge_values"] for s in samples]),
+        "edge_offsets": _offsets(len(s["edge_values"]) for s in samples),
+        "action_set": np.concatenate([s["action_set"] for s in samples]),
+        "scores": np.concatenate([s["scores"] for s in samples]),
+        "action_set_offsets": _offsets(len(s["action_set"]) for s in samples),
+        "actions": np.array([s["action"] for s in samples], dtype=np.int32),
+    }
+
+
+def _make_sample(
+    node_observation: "ecole.observation.NodeBipartiteObs",
+    action_set: np.ndarray,
+    scores: np.ndarray,
+    action_position: int,
+) -> dict:
+    return {
+        "row_features": np.asarray(node_observation.row_features, dtype=np.float32),
+        "column_features": np.asarray(
+            node_observation.column_features, dtype=np.float32
+        ),
+        "edge_indices": np.asarray(
+            node_observation.edge_features.indices, dtype=np.int32
+        ),
+        "edge_values": np.asarray(
+            node_observation.edge_features.values, dtype=np.float32
+        ),
+        "action_set": np.asarray(action_set, dtype=np.int32),
+        "scores": np.asarray(scores[action_set], dtype=np.float32),
+        # Действие эксперта -- позиция выбранного кандидата в action_set
+        "action": action_position,
+    }
+
+
+def _collect_episode(
+    episode: CollectionEpisode,
+    *,
+    path_to_dataset_dir: PosixPath,
+    scip_params: dict,
+    expert_probability: float,
+    max_samples: int,
+    samples_per_shard: int,
+    compress: bool,
+) -> dict:
+    """
+    Проводит один эпизод ветвления и записывает образцы эксперта
+    (выполняется в дочернем процессе)
+    """
+    rng = np.random.default_rng(episode.seed)
+    env = ecole.environment.Branching(
+        observation_function=(
+            ExploreThenStrongBranch(expert_probability=expert_probability, rng=rng),
+            ecole.observation.NodeBipartite(),
+        ),
+        scip_params=scip_params,
+    )
+    env.seed(episode.seed)
+
+    writer = _ShardWriter(
+        path_to_dataset_dir=path_to_dataset_dir,
+        episode_key=episode.key,
+        samples_per_shard=samples_per_shard,
+        compress=compress,
+    )
+
+    start = time.perf_counter()
+    n_samples = 0
+    observation, action_set, _, done, _ = env.reset(str(episode.path_to_lp_file))
+    while not done:
+        (scores, scores_are_expert), node_observation = observation
+        # Непроинициализированные псевдостоимости равны NaN
+        candidate_scores: np.ndarray = scores[action_set]
+        action_position = (
+            0
+            if np.isnan(candidate_scores).all()
+            else int(np.nanargmax(candidate_scores))
+        )
+
+        if scores_are_expert and n_samples < max_samples:
+            writer.append(
+                _make_sample(node_observation, action_set, scores, action_position)
+            )
+            n_samples += 1
+
+        observation, action_set, _, done, _ = env.step(action_set[action_position])
+    writer.flush()
+
+    return {
+        "instance": episode.path_to_lp_file.name,
+        "instance_hash": episode.instance_hash,
+        "seed": episode.seed,
+        "n_samples": n_samples,
+        "shards": writer.shards,
+        "time": time.perf_counter() - start,
+    }
+
+
+class CollectionIndex:
+    """
+    Индекс собранного набора данных (index.json): завершенные эпизоды
+    и их шарды; используется для возобновления сбора без повторов
+    """
+
+    def __init__(self, path_to_dataset_dir: t.Union[str, pathlib2.Path]):
+        self.path_to_index_file = Path(path_to_dataset_dir).joinpath(_INDEX_FILENAME)
+        self.episodes: t.Dict[str, dict] = {}
+        if self.path_to_index_file.exists():
+            with open(self.path_to_index_file, encoding="utf-8") as fo:
+                self.episodes = json.load(fo)["episodes"]
+
+    def __contains__(self, episode_key: str) -> bool:
+        return episode_key in self.episodes
+
+    @property
+    def n_samples(self) -> int:
+        return sum(episode["n_samples"] for episode in self.episodes.values())
+
+    @property
+    def shard_names(self) -> t.List[str]:
+        return [
+            shard["name"]
+            for episode in self.episodes.values()
+            for shard in episode["shards"]
+        ]
+
+    def add(self, episode_key: str, episode_record: dict) -> t.NoReturn:
+        """
+        Регистрирует завершенный эпизод и атомарно перезаписывает индекс
+        """
+        self.episodes[episode_key] = episode_record
+
+        path_to_tmp_file = self.path_to_index_file.with_name(
+            f"{_TMP_FILE_PREFIX}{os.getpid()}_{_INDEX_FILENAME}"
+        )
+        with open(path_to_tmp_file, mode="w", encoding="utf-8") as fo:
+            json.dump({"episodes": self.episodes}, fo, indent=2)
+        os.replace(path_to_tmp_file, self.path_to_index_file)
+
+
+def build_collection_episodes(
+    paths_to_lp_files: t.Sequence[PosixPath], seeds: t.Sequence[int]
+) -> t.List[CollectionEpisode]:
+    """
+    Строит эпизоды (задача, начальное значение); задачи с одинаковым
+    содержимым lp-файла учитываются один раз
+    """
+    episodes: t.Dict[str, CollectionEpisode] = {}
+    for path_to_lp_file in paths_to_lp_files:
+        instance_hash: str = get_file_hash(path_to_lp_file)
+        for seed in seeds:
+            episode = CollectionEpisode(
+                path_to_lp_file=Path(path_to_lp_file),
+                instance_hash=instance_hash,
+                seed=seed,
+            )
+            episodes.setdefault(episode.key, episode)
+
+    return list(episodes.values())
+
+
+def _remove_stale_files(
+    path_to_dataset_dir: PosixPath,
+    pending_episode_keys: t.Set[str],
+    logger: logging.Logger,
+) -> t.NoReturn:
+    """
+    Удаляет временные файлы сбора и шарды незавершенных эпизодов
+    (`<ключ_эпизода>_NNNN[.npz]`); прочие файлы директории не трогаются
+    """
+    for path in path_to_dataset_dir.iterdir():
+        match = _STALE_FILE_PATTERN.match(path.name)
+        if match is None or (
+            match.group("episode_key") not in pending_episode_keys
+            and not match.group("tmp_prefix")
+        ):
+            continue
+
+        if path.is_dir():
+            # Несжатый шард -- директория npy-файлов с известными именами
+            for array_name in _SHARD_ARRAYS:
+                path_to_array = path.joinpath(f"{array_name}.npy")
+                if path_to_array.exists():
+                    path_to_array.unlink()
+            try:
+                path.rmdir()
+            except OSError as err:
+                logger.warning(f"Stale shard `{path.name}` has not been removed: {err}")
+        else:
+            path.unlink()
+
+
+def collect_imitation_data(
+    *,
+    episodes: t.Sequence[CollectionEpisode],
+    path_to_dataset_dir: PosixPath,
+    scip_params: dict,
+    logger: logging.Logger,
+    expert_probability: float = 0.05,
+    max_samples_per_episode: int = 1000,
+    samples_per_shard: int = 256,
+    compress: bool = True,
+    n_workers: t.Optional[int] = None,
+) -> CollectionIndex:
+    """
+    Параллельно проводит эпизоды ветвления в пуле процессов;
+    эпизоды, уже записанные в индекс, пропускаются
+    """
+    path_to_dataset_dir = Path(path_to_dataset_dir)
+    path_to_dataset_dir.mkdir(parents=True, exist_ok=True)
+    index = CollectionIndex(path_to_dataset_dir)
+
+    pending_episodes = [episode for episode in episodes if episode.key not in index]
+    logger.info(
+        f"Data collection: {len(episodes) - len(pending_episodes)} of {len(episodes)} "
+        f"episodes are already in `{path_to_dataset_dir}`"
+    )
+    if not pending_episodes:
+        return index
+
+    # Шарды прерванных эпизодов не попали в индекс и будут записаны заново;
+    # удаляются только файлы, которые записывает сам сбор
+    _remove_stale_files(
+        path_to_dataset_dir,
+        pending_episode_keys={episode.key for episode in pending_episodes},
+        logger=logger,
+    )
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(pending_episodes))
+    start = time.perf_counter()
+    n_samples = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        future_to_episode = {
+            executor.submit(
+                _collect_episode,
+                episode,
+                path_to_dataset_dir=path_to_dataset_dir,
+                scip_params=scip_params,
+                expert_probability=expert_probability,
+                max_samples=max_samples_per_episode,
+                samples_per_shard=samples_per_shard,
+                compress=compress,
+            ): episode
+            for episode in pending_episodes
+        }
+        for future in concurrent.futures.as_completed(future_to_episode):
+            episode = future_to_episode[future]
+            try:
+                episode_record: dict = future.result()
+            except Exception as err:
+                logger.error(
+                    f"Episode `{episode.key}` ({episode.path_to_lp_file.name}): {err}"
+                )
+                continue
+
+            index.add(episode.key, episode_record)
+            n_samples += episode_record["n_samples"]
+            logger.info(
+                f"Episode `{episode.key}` ({episode_record['instance']}) "
+                f"has been collected: {episode_record['n_samples']} samples "
+                f"in {episode_record['time']:.1f} s"
+            )
+
+    elapsed_time = time.perf_counter() - start
+    logger.info(
+        f"\n\tData collection has been finished on {n_workers} workers\n"
+        f"\t- new samples: {n_samples} ({n_samples / elapsed_time:.1f} samples/s)\n"
+        f"\t- total samples in dataset: {index.n_samples}"
+    )
+
+    return index
+
+
+def load_shard(path_to_shard: t.Union[str, pathlib2.Path]) -> t.Dict[str, np.ndarray]:
+    """
+    Читает шард в словарь массивов (массивы несжатого шарда
+    отображаются в память, а не читаются целиком)
+    """
+    path_to_shard = Path(path_to_shard)
+    if path_to_shard.is_dir():
+        return {
+            name: np.load(str(path_to_shard.joinpath(f"{name}.npy")), mmap_mode="r")
+            for name in _SHARD_ARRAYS
+        }
+
+    with np.load(str(path_to_shard)) as shard:
+        return {name: shard[name] for name in _SHARD_ARRAYS}
+
+
+def iter_shard_samples(shard: t.Dict[str, np.ndarray]) -> t.Iterator[dict]:
+    """
+    Возвращает образцы шарда как срезы (представления) его массивов
+    """
+    row_offsets = shard["row_offsets"]
+    column_offsets = shard["column_offsets"]
+    edge_offsets = shard["edge_offsets"]
+    action_set_offsets = shard["action_set_offsets"]
+    for i in range(shard["actions"].size):
+        yield {
+            "row_features": shard["row_features"][row_offsets[i] : row_offsets[i + 1]],
+            "column_features": shard["column_features"][
+                column_offsets[i] : column_offsets[i + 1]
+            ],
+            "edge_indices": shard["edge_indices"][
+                :, edge_offsets[i] : edge_offsets[i + 1]
+            ],
+            "edge_values": shard["edge_values"][edge_offsets[i] : edge_offsets[i + 1]],
+            "action_set": shard["action_set"][
+                action_set_offsets[i] : action_set_offsets[i + 1]
+            ],
+            "scores": shard["scores"][action_set_offsets[i] : action_set_offsets[i + 1]],
+            "action": int(shard["actions"][i]),
+        }
+
+
+def iter_dataset_samples(
+    path_to_dataset_dir: t.Union[str, pathlib2.Path],
+) -> t.Iterator[dict]:
+    """
+    Последовательно возвращает все образцы набора данных (по индексу)
+    """
+    index = CollectionIndex(path_to_dataset_dir)
+    for shard_name in index.shard_names:
+        yield from iter_shard_samples(
+            load_shard(Path(path_to_dataset_dir).joinpath(shard_name))
+        )
@@ -0,0 +1,255 @@
+import heapq
+import logging
+import typing as t
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from pathlib2 import Path, PosixPath
+from scipy.sparse.csgraph import connected_components
+
+from scip_ecole_model.auxiliary_functions import (
+    ResultsSummary,
+    compute_gap,
+    get_results_filename_stem,
+    log_results_summary,
+)
+from scip_ecole_model.problem_arrays import ProblemArrays
+from scip_ecole_model.sol_io import write_sol_file
+
+# Статус решателя SCIP для блока, решенного до оптимальности
+_STATUS_OPTIMAL = "optimal"
+_STATUS_INFEASIBLE = "infeasible"
+
+
+@dataclass
+class BlockResult:
+    """
+    Класс результата решения одного блока (независимой подзадачи)
+    """
+
+    name: str
+    status: str
+    n_sols: int
+    n_best_sols: int
+    primal_bound: float
+    dual_bound: float
+    solving_time: float
+    var_names: np.ndarray
+    values: np.ndarray
+    n_vars_after_presolving: int
+    n_bin_vars_after_presolving: int
+    n_int_vars_after_presolving: int
+    n_conss_after_presolving: int
+
+
+@dataclass
+class DecomposedResult:
+    """
+    Класс объединенного результата решения блоков: сводка в формате
+    `write_results_and_stats` и решение исходной задачи
+    """
+
+    results_summary: ResultsSummary
+    var_names: np.ndarray
+    values: np.ndarray
+    objs: np.ndarray
+    block_results: t.List[BlockResult]
+
+    @property
+    def has_solution(self) -> bool:
+        return all(block_result.n_sols > 0 for block_result in self.block_results)
+
+
+def find_components(problem: ProblemArrays) -> t.Tuple[int, np.ndarray, np.ndarray]:
+    """
+    Компоненты связности двудольного графа "переменные -- ограничения"
+
+    Возвращает число компонент, метки переменных и метки ограничений
+    (пустые ограничения получают метку -1)
+    """
+    graph = sp.bmat([[None, problem.matrix], [problem.matrix.T, None]], format="csr")
+    _, labels = connected_components(graph, directed=False)
+    cons_labels, var_labels = labels[: problem.n_conss], labels[problem.n_conss :]
+
+    # Компоненты нумеруются по переменным, пустые ограничения ни с чем не связаны
+    component_labels, var_labels = np.unique(var_labels, return_inverse=True)
+    cons_labels = np.searchsorted(component_labels, cons_labels)
+    cons_labels[np.diff(problem.matrix.indptr) == 0] = -1
+
+    return component_labels.size, var_labels, cons_labels
+
+
+def assign_blocks(
+    problem: ProblemArrays,
+    n_components: int,
+    var_labels: np.ndarray,
+    cons_labels: np.ndarray,
+    max_n_blocks: int,
+) -> t.Tuple[int, np.ndarray]:
+    """
+    Объединяет компоненты в не более чем `max_n_blocks` блоков близкого
+    размера (крупнейшая компонента -- в наименее загруженный блок)
+
+    Возвращает число блоков и номер блока каждой компоненты
+    """
+    nonempty = cons_labels >= 0
+    sizes = np.bincount(var_labels, minlength=n_components) + np.bincount(
+        cons_labels[nonempty],
+        weights=np.diff(problem.matrix.indptr)[nonempty],
+        minlength=n_components,
+    )
+
+    n_blocks = min(max_n_blocks, n_components)
+    blocks_heap = [(0.0, block) for block in range(n_blocks)]
+    component_blocks = np.empty(n_components, dtype=np.int64)
+    for component in np.argsort(-sizes, kind="stable").tolist():
+        load, block = heapq.heappop(blocks_heap)
+        component_blocks[component] = block
+        heapq.heappush(blocks_heap, (load + sizes[component], block))
+
+    return n_blocks, component_blocks
+
+
+def split_into_blocks(
+    problem: ProblemArrays, max_n_blocks: int, logger: logging.Logger
+) -> t.List[t.Tuple[np.ndarray, np.ndarray]]:
+    """
+    Разбивает задачу на независимые блоки; возвращает пары
+    (индексы переменных, индексы ограничений) блоков
+    """
+    n_components, var_labels, cons_labels = find_components(problem)
+    if n_components < 2:
+        logger.info("Problem has a single connected component")
+        return []
+
+    n_blocks, component_blocks = assign_blocks(
+        problem, n_components, var_labels, cons_labels, max_n_blocks
+    )
+    var_blocks = component_blocks[var_labels]
+    nonempty_conss = np.flatnonzero(cons_labels >= 0)
+    cons_blocks = component_blocks[cons_labels[nonempty_conss]]
+
+    var_order = np.argsort(var_blocks, kind="stable")
+    cons_order = np.argsort(cons_blocks, kind="stable")
+    var_splits = np.cumsum(np.bincount(var_blocks, minlength=n_blocks))[:-1]
+    cons_splits = np.cumsum(np.bincount(cons_blocks, minlength=n_blocks))[:-1]
+    blocks = list(
+        zip(
+            np.split(var_order, var_splits),
+            np.split(nonempty_conss[cons_order], cons_splits),
+        )
+    )
+    logger.info(
+        f"Problem has {n_components} connected components, "
+        f"grouped into {n_blocks} blocks "
+        f"(largest block: {max(var_ids.size for var_ids, _ in blocks)} vars)"
+    )
+
+    return blocks
+
+
+def _merge_status(statuses: t.Sequence[str]) -> str:
+    """
+    Статус задачи по статусам блоков: недопустимость любого блока делает
+    недопустимой задачу, иначе -- первый статус, отличный от оптимального
+    """
+    if _STATUS_INFEASIBLE in statuses:
+        return _STATUS_INFEASIBLE
+
+    return next(
+        (status for status in statuses if status != _STATUS_OPTIMAL), _STATUS_OPTIMAL
+    )
+
+
+def merge_block_results(
+    problem: ProblemArrays,
+    block_results: t.Sequence[BlockResult],
+    solving_time: float,
+) -> DecomposedResult:
+    """
+    Объединяет решения блоков в решение исходной задачи (по именам
+    переменных) и суммирует границы целевой функции
+    """
+    positions = pd.Index(problem.var_names, dtype=object).get_indexer(
+        np.concatenate([block_result.var_names for block_result in block_results])
+    )
+    values = np.zeros(problem.n_vars, dtype=np.float64)
+    values[positions] = np.concatenate(
+        [block_result.values for block_result in block_results]
+    )
+
+    primal_bound = problem.obj_offset + sum(
+        block_result.primal_bound for block_result in block_results
+    )
+    dual_bound = problem.obj_offset + sum(
+        block_result.dual_bound for block_result in block_results
+    )
+    results_summary = ResultsSummary(
+        obj_val=primal_bound,
+        obj_sense=problem.obj_sense,
+        gap=compute_gap(primal_bound, dual_bound),
+        solving_time=solving_time,
+        status=_merge_status([block_result.status for block_result in block_results]),
+        n_sols=min(block_result.n_sols for block_result in block_results),
+        n_best_sols=min(block_result.n_best_sols for block_result in block_results),
+        **{
+            field_name: sum(
+                getattr(block_result, field_name) for block_result in block_results
+            )
+            for field_name in (
+                "n_vars_after_presolving",
+                "n_bin_vars_after_presolving",
+                "n_int_vars_after_presolving",
+                "n_conss_after_presolving",
+            )
+        },
+    )
+
+    return DecomposedResult(
+        results_summary=results_summary,
+        var_names=problem.var_names,
+        values=values,
+        objs=problem.obj,
+        block_results=list(block_results),
+    )
+
+
+def write_decomposed_results_and_stats(
+    problem_name: str,
+    decomposed_result: DecomposedResult,
+    stats_before_solving: t.NamedTuple,
+    path_to_output_dir: PosixPath,
+    logger: logging.Logger,
+) -> t.Optional[PosixPath]:
+    """
+    Записывает объединенное решение блоков и сводку в формате
+    `write_results_and_stats` (статистика решателя -- по блокам,
+    в рабочей директории декомпозиции)
+
+    Возвращает путь до sol-файла или None, если решение найдено не для всех блоков
+    """
+    log_results_summary(
+        problem_name, decomposed_result.results_summary, stats_before_solving, logger
+    )
+    if not decomposed_result.has_solution:
+        logger.warning("Some blocks have no solution, merged solution is not written")
+        return None
+
+    path_to_best_sol_file = (
+        Path()
+        .cwd()
+        .joinpath(path_to_output_dir)
+        .joinpath(f"{get_results_filename_stem(problem_name, stats_before_solving)}.sol")
+    )
+    write_sol_file(
+        path_to_best_sol_file,
+        names=decomposed_result.var_names,
+        values=decomposed_result.values,
+        objs=decomposed_result.objs,
+        objective_value=decomposed_result.results_summary.obj_val,
+        write_zeros=True,
+    )
+
+    return path_to_best_sol_file
@@ -0,0 +1,314 @@
+import logging
+import sys
+import typing as t
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import pathlib2
+import scipy.sparse as sp
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.problem_arrays import ProblemArrays, load_problem_arrays
+from scip_ecole_model.sol_io import SolData, read_sol_file, write_sol_file
+
+# Допуск выполнения ограничений и целочисленности (как feastol решателя SCIP)
+DEFAULT_FEASIBILITY_TOL = 1e-6
+# Число наиболее нарушенных строк и переменных в отчете
+_N_REPORTED_VIOLATIONS = 10
+# Штраф за единицу нарушения строки в LP-задаче исправления
+_ELASTIC_PENALTY = 1e3
+
+
+@dataclass
+class FeasibilityReport:
+    """
+    Класс отчета о проверке решения: нарушения строк lhs <= Ax <= rhs,
+    границ и целочисленности переменных (с величинами нарушений)
+    """
+
+    n_violated_rows: int
+    max_row_violation: float
+    n_bound_violations: int
+    max_bound_violation: float
+    n_integrality_violations: int
+    max_integrality_violation: float
+    objective_value: float
+    # Переменные sol-файла, отсутствующие в задаче
+    n_unknown_vars: int = 0
+    # Наиболее нарушенные строки и переменные: имя -> величина нарушения
+    worst_rows: t.Dict[str, float] = field(default_factory=dict)
+    worst_bounds: t.Dict[str, float] = field(default_factory=dict)
+    worst_integrality: t.Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def is_feasible(self) -> bool:
+        return (
+            self.n_violated_rows == 0
+            and self.n_bound_violations == 0
+            and self.n_integrality_violations == 0
+        )
+
+    def log(self, logger: logging.Logger, title: str = "Warm start") -> t.NoReturn:
+        """
+        Записывает отчет в журнал
+        """
+        if self.is_feasible:
+            logger.info(
+                f"{title} is feasible (objective value: {self.objective_value:.8g})"
+            )
+            return
+
+        logger.warning(
+            f"\n\t{title} is infeasible:\n"
+            f"\t- Violated rows: {self.n_violated_rows} "
+            f"(max violation {self.max_row_violation:.3g})\n"
+            f"\t- Bound violations: {self.n_bound_violations} "
+            f"(max violation {self.max_bound_violation:.3g})\n"
+            f"\t- Integrality violations: {self.n_integrality_violations} "
+            f"(max violation {self.max_integrality_violation:.3g})\n"
+            f"\t- Unknown vars in sol-file: {self.n_unknown_vars}\n"
+            f"\t- Worst rows: {_format_violations(self.worst_rows)}\n"
+            f"\t- Worst bounds: {_format_violations(self.worst_bounds)}\n"
+            f"\t- Worst integrality: {_format_violations(self.worst_integrality)}"
+        )
+
+
+def _format_violations(violations: t.Dict[str, float]) -> str:
+    return ", ".join(f"{name} ({value:.3g})" for name, value in violations.items())
+
+
+def _worst(names: np.ndarray, violations: np.ndarray) -> t.Dict[str, float]:
+    """
+    Наибольшие нарушения в порядке убывания
+    """
+    violated = np.flatnonzero(violations > 0.0)
+    worst = violated[np.argsort(-violations[violated])[:_N_REPORTED_VIOLATIONS]]
+
+    return dict(zip(names[worst].tolist(), violations[worst].tolist()))
+
+
+def sol_to_vector(problem: ProblemArrays, sol: SolData) -> t.Tuple[np.ndarray, int]:
+    """
+    Раскладывает значения sol-файла по столбцам задачи; переменные,
+    отсутствующие в sol-файле, считаются нулевыми (как при чтении решателем);
+    возвращает вектор и число неизвестных задаче переменных sol-файла
+    """
+    positions = pd.Index(problem.var_names, dtype=object).get_indexer(sol.names)
+    found_mask = positions >= 0
+    x = np.zeros(problem.n_vars, dtype=np.float64)
+    x[positions[found_mask]] = sol.values[found_mask]
+
+    return x, int(np.count_nonzero(~found_mask))
+
+
+def row_violations(
+    problem: ProblemArrays, activities: np.ndarray, tol: float
+) -> np.ndarray:
+    """
+    Нарушения строк (с относительным допуском, как в SCIP)
+    """
+    with np.errstate(invalid="ignore"):
+        violations = np.fmax(problem.lhs - activities, activities - problem.rhs)
+    violations = np.nan_to_num(np.maximum(violations, 0.0), nan=0.0)
+    sides = np.where(activities < problem.lhs, problem.lhs, problem.rhs)
+    violations[violations <= tol * np.maximum(1.0, np.abs(sides))] = 0.0
+
+    return violations
+
+
+def is_integer_var_mask(problem: ProblemArrays) -> np.ndarray:
+    """
+    Маска целочисленных переменных (бинарные и неявно целые -- тоже)
+    """
+    return problem.vtypes != "CONTINUOUS"
+
+
+def check_solution(
+    problem: ProblemArrays,
+    x: np.ndarray,
+    tol: float = DEFAULT_FEASIBILITY_TOL,
+    n_unknown_vars: int = 0,
+) -> FeasibilityReport:
+    """
+    Проверяет допустимость решения `x` (одно умножение разреженной
+    матрицы на вектор и векторные проверки границ и целочисленности)
+    """
+    activities: np.ndarray = problem.matrix @ x
+    row_violation_values = row_violations(problem, activities, tol)
+
+    bound_violations = np.maximum(np.maximum(problem.lbs - x, x - problem.ubs), 0.0)
+    bound_tols = tol * np.maximum(
+        1.0, np.abs(np.where(x < problem.lbs, problem.lbs, problem.ubs))
+    )
+    bound_violations[bound_violations <= bound_tols] = 0.0
+
+    integrality_violations = np.where(
+        is_integer_var_mask(problem), np.abs(x - np.round(x)), 0.0
+    )
+    integrality_violations[integrality_violations <= tol] = 0.0
+
+    return FeasibilityReport(
+        n_violated_rows=int(np.count_nonzero(row_violation_values)),
+        max_row_violation=float(row_violation_values.max(initial=0.0)),
+        n_bound_violations=int(np.count_nonzero(bound_violations)),
+        max_bound_violation=float(bound_violations.max(initial=0.0)),
+        n_integrality_violations=int(np.count_nonzero(integrality_violations)),
+        max_integrality_violation=float(integrality_violations.max(initial=0.0)),
+        objective_value=float(problem.obj @ x + problem.obj_offset),
+        n_unknown_vars=n_unknown_vars,
+        worst_rows=_worst(problem.cons_names, row_violation_values),
+        worst_bounds=_worst(problem.var_names, bound_violations),
+        worst_integrality=_worst(problem.var_names, integrality_violations),
+    )
+
+
+def _fix_continuous_vars(
+    problem: ProblemArrays,
+    x: np.ndarray,
+    tol: float,
+    logger: logging.Logger,
+) -> np.ndarray:
+    """
+    Небольшая LP-задача исправления: непрерывные переменные нарушенных
+    строк сдвигаются так, чтобы выполнялись все содержащие их строки;
+    прочие переменные зафиксированы
+
+    Задача эластична: нарушения строк допускаются со штрафом
+    `_ELASTIC_PENALTY`, поэтому при невозможности полного исправления
+    суммарное нарушение все равно уменьшается
+    """
+    # scipy.optimize нужен только для исправления, поэтому импортируется здесь
+    from scipy.optimize import linprog
+
+    activities: np.ndarray = problem.matrix @ x
+    violated_rows = np.flatnonzero(row_violations(problem, activities, tol))
+    is_continuous = ~is_integer_var_mask(problem)
+    cols = np.unique(problem.matrix[violated_rows].indices)
+    cols = cols[is_continuous[cols]]
+    if cols.size == 0:
+        logger.warning("Violated rows contain no continuous vars to fix")
+        return x
+
+    # Строки, содержащие сдвигаемые переменные
+    csc_matrix = problem.get_csc_matrix()[:, cols]
+    rows = np.unique(csc_matrix.indices)
+    sub_matrix: sp.csr_matrix = csc_matrix.tocsr()[rows]
+    lhs_slack = problem.lhs[rows] - activities[rows]
+    rhs_slack = problem.rhs[rows] - activities[rows]
+    finite_rhs, finite_lhs = np.isfinite(rhs_slack), np.isfinite(lhs_slack)
+
+    # Сдвиг d = d_plus - d_minus и нарушения строк v >= 0:
+    # A d - v <= rhs - Ax, -A d - v <= Ax - lhs, lb <= x + d <= ub
+    shift_matrix = sp.hstack([sub_matrix, -sub_matrix])
+    shift_rows = sp.vstack([shift_matrix[finite_rhs], -shift_matrix[finite_lhs]])
+    n_shifts, n_rows = 2 * cols.size, shift_rows.shape[0]
+    result = linprog(
+        c=np.concatenate([np.ones(n_shifts), np.full(n_rows, _ELASTIC_PENALTY)]),
+        A_ub=sp.hstack([shift_rows, -sp.identity(n_rows)]).tocsr(),
+        b_ub=np.concatenate([rhs_slack[finite_rhs], -lhs_slack[finite_lhs]]),
+        bounds=np.column_stack(
+            [
+                np.zeros(n_shifts + n_rows),
+                np.concatenate(
+                    [
+                        problem.ubs[cols] - x[cols],
+                        x[cols] - problem.lbs[cols],
+                        np.full(n_rows, np.inf),
+                    ]
+                ),
+            ]
+        ),
+        method="highs",
+    )
+    if result.status != 0:
+        logger.warning(f"LP fix-up of continuous vars has failed: {result.message}")
+        return x
+
+    shifts = result.x[: cols.size] - result.x[cols.size : n_shifts]
+    x = x.copy()
+    x[cols] += shifts
+    logger.info(
+        f"LP fix-up has shifted {int(np.count_nonzero(np.abs(shifts) > tol))} "
+        f"continuous values ({cols.size} vars, {rows.size} rows), "
+        f"remaining violation: {result.x[n_shifts:].sum():.3g}"
+    )
+
+    return x
+
+
+def repair_solution(
+    problem: ProblemArrays,
+    x: np.ndarray,
+    logger: logging.Logger,
+    tol: float = DEFAULT_FEASIBILITY_TOL,
+    fix_continuous: bool = True,
+) -> np.ndarray:
+    """
+    Дешевое исправление решения: округление целочисленных переменных,
+    приведение значений к границам и (при `fix_continuous=True`)
+    LP-исправление непрерывных переменных нарушенных строк
+    """
+    is_integer = is_integer_var_mask(problem)
+    x = np.where(is_integer, np.round(x), x)
+    lbs = np.where(is_integer, np.ceil(problem.lbs - tol), problem.lbs)
+    ubs = np.where(is_integer, np.floor(problem.ubs + tol), problem.ubs)
+    x = np.clip(x, lbs, ubs)
+
+    if fix_continuous and check_solution(problem, x, tol).n_violated_rows > 0:
+        x = _fix_continuous_vars(problem, x, tol, logger)
+
+    return x
+
+
+def preflight_warm_start(
+    path_to_lp_file: t.Union[str, pathlib2.Path],
+    path_to_warm_start_file: t.Union[str, pathlib2.Path],
+    *,
+    path_to_arrays_dir: t.Union[str, pathlib2.Path],
+    logger: logging.Logger,
+    repair: bool = False,
+    path_to_repaired_file: t.Optional[t.Union[str, pathlib2.Path]] = None,
+    tol: float = DEFAULT_FEASIBILITY_TOL,
+) -> PosixPath:
+    """
+    Проверяет 'теплый' старт до запуска решателя; при `repair=True`
+    недопустимое решение исправляется и записывается в `path_to_repaired_file`
+
+    Возвращает путь до sol-файла, который следует передать решателю
+    """
+    path_to_warm_start_file = Path(path_to_warm_start_file)
+    problem = load_problem_arrays(
+        path_to_lp_file, path_to_arrays_dir=path_to_arrays_dir, logger=logger
+    )
+    try:
+        sol: SolData = read_sol_file(path_to_warm_start_file)
+    except OSError as err:
+        logger.error(f"{err}")
+        sys.exit(-1)
+
+    x, n_unknown_vars = sol_to_vector(problem, sol)
+    report = check_solution(problem, x, tol=tol, n_unknown_vars=n_unknown_vars)
+    report.log(logger)
+    if report.is_feasible or not repair:
+        return path_to_warm_start_file
+
+    x = repair_solution(problem, x, logger, tol=tol)
+    repaired_report = check_solution(problem, x, tol=tol)
+    repaired_report.log(logger, title="Repaired warm start")
+
+    path_to_repaired_file = (
+        path_to_warm_start_file.with_name(f"{path_to_warm_start_file.stem}_repaired.sol")
+        if path_to_repaired_file is None
+        else Path(path_to_repaired_file)
+    )
+    write_sol_file(
+        path_to_repaired_file,
+        names=problem.var_names,
+        values=x,
+        objs=problem.obj,
+        objective_value=repaired_report.objective_value,
+    )
+    logger.info(f"Repaired warm start has been written to `{path_to_repaired_file}`")
+
+    return path_to_repaired_file
@@ -0,0 +1,261 @@
+import json
+import logging
+import os
+import time
+import typing as t
+
+import numpy as np
+import pathlib2
+import pyscipopt
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.auxiliary_functions import get_file_hash
+from scip_ecole_model.problem_arrays import ProblemArrays
+
+# Классы ограничений (по структуре строки, в порядке проверки)
+CONSTRAINT_CLASSES = (
+    "empty",
+    "singleton",
+    "aggregation",
+    "varbound",
+    "set_partitioning",
+    "set_packing",
+    "set_covering",
+    "cardinality",
+    "knapsack",
+    "integer_knapsack",
+    "binary",
+    "integer",
+    "continuous",
+    "mixed",
+)
+
+
+def _describe(values: np.ndarray, prefix: str) -> t.Dict[str, float]:
+    """
+    Сводные статистики распределения
+    """
+    if values.size == 0:
+        return {
+            f"{prefix}_{name}": 0.0 for name in ("min", "max", "mean", "std", "median")
+        }
+
+    return {
+        f"{prefix}_min": float(values.min()),
+        f"{prefix}_max": float(values.max()),
+        f"{prefix}_mean": float(values.mean()),
+        f"{prefix}_std": float(values.std()),
+        f"{prefix}_median": float(np.median(values)),
+    }
+
+
+def _log10_range(abs_values: np.ndarray) -> float:
+    """
+    Разброс порядков величин ненулевых значений (log10(max/min))
+    """
+    abs_values = abs_values[abs_values > 0.0]
+    if abs_values.size == 0:
+        return 0.0
+
+    return float(np.log10(abs_values.max() / abs_values.min()))
+
+
+def classify_constraints(problem: ProblemArrays) -> np.ndarray:
+    """
+    Относит каждое ограничение к одному из классов CONSTRAINT_CLASSES
+    (векторно, по строкам CSR-матрицы)
+    """
+    matrix = problem.matrix
+    n_conss = problem.n_conss
+    row_nnz = np.diff(matrix.indptr)
+    row_ids = np.repeat(np.arange(n_conss), row_nnz)
+
+    coefs = matrix.data
+
+    def _row_count(mask: np.ndarray) -> np.ndarray:
+        return np.bincount(row_ids[mask], minlength=n_conss)
+
+    # Маски типов переменных строятся по столбцам, а затем разносятся по ненулям
+    n_bin = _row_count((problem.vtypes == "BINARY")[matrix.indices])
+    n_cont = _row_count((problem.vtypes == "CONTINUOUS")[matrix.indices])
+    n_unit_coefs = _row_count(coefs == 1.0)
+    n_integral_coefs = _row_count(coefs == np.round(coefs))
+
+    is_equality = problem.lhs == problem.rhs
+    finite_lhs = np.isfinite(problem.lhs)
+    finite_rhs = np.isfinite(problem.rhs)
+    all_binary = n_bin == row_nnz
+    all_unit = n_unit_coefs == row_nnz
+    all_integral_coefs = n_integral_coefs == row_nnz
+
+    conditions = [
+        row_nnz == 0,
+        row_nnz == 1,
+        (row_nnz == 2) & is_equality,
+        (row_nnz == 2) & (n_cont <= 1),
+        all_binary & all_unit & is_equality & (problem.rhs == 1.0),
+        all_binary & all_unit & ~finite_lhs & (problem.rhs == 1.0),
+        all_binary & all_unit & ~finite_rhs & (problem.lhs == 1.0),
+        all_binary & all_unit & is_equality,
+        all_binary & all_integral_coefs & (finite_lhs ^ finite_rhs),
+        (n_cont == 0) & all_integral_coefs & (finite_lhs ^ finite_rhs),
+        all_binary,
+        n_cont == 0,
+        n_cont == row_nnz,
+    ]
+    class_ids = np.select(
+        conditions, np.arange(len(conditions)), default=len(CONSTRAINT_CLASSES) - 1
+    )
+
+    return np.asarray(CONSTRAINT_CLASSES)[class_ids]
+
+
+def compute_instance_features(problem: ProblemArrays) -> t.Dict[str, float]:
+    """
+    Вычисляет статические признаки задачи векторными операциями
+    над матрицей ограничений
+    """
+    matrix = problem.matrix
+    n_vars, n_conss, n_nonzeros = problem.n_vars, problem.n_conss, matrix.nnz
+
+    features: t.Dict[str, float] = {
+        "n_vars": n_vars,
+        "n_conss": n_conss,
+        "n_nonzeros": n_nonzeros,
+        "density": n_nonzeros / max(n_vars * n_conss, 1),
+        "is_maximize": float(problem.obj_sense == "maximize"),
+    }
+
+    # Типы переменных
+    for vtype in ("BINARY", "INTEGER", "IMPLINT", "CONTINUOUS"):
+        n_vtype = int(np.count_nonzero(problem.vtypes == vtype))
+        features[f"n_{vtype.lower()}_vars"] = n_vtype
+        features[f"frac_{vtype.lower()}_vars"] = n_vtype / max(n_vars, 1)
+
+    # Границы переменных
+    finite_lbs, finite_ubs = np.isfinite(problem.lbs), np.isfinite(problem.ubs)
+    features["n_free_vars"] = int(np.count_nonzero(~finite_lbs & ~finite_ubs))
+    features["n_fixed_vars"] = int(np.count_nonzero(problem.lbs == problem.ubs))
+    features["frac_boxed_vars"] = (
+        float(np.mean(finite_lbs & finite_ubs)) if n_vars else 0.0
+    )
+
+    # Целевая функция
+    abs_obj = np.abs(problem.obj)
+    nonzero_obj = abs_obj[abs_obj > 0.0]
+    features["obj_nnz"] = nonzero_obj.size
+    features.update(_describe(nonzero_obj, "obj_abs"))
+    features["obj_log10_range"] = _log10_range(nonzero_obj)
+
+    # Степени строк и столбцов
+    row_degrees = np.diff(matrix.indptr)
+    col_degrees = np.bincount(matrix.indices, minlength=n_vars)
+    features.update(_describe(row_degrees, "row_degree"))
+    features.update(_describe(col_degrees, "col_degree"))
+    features["n_empty_cols"] = int(np.count_nonzero(col_degrees == 0))
+
+    # Коэффициенты матрицы
+    abs_coefs = np.abs(matrix.data)
+    features.update(_describe(abs_coefs, "coef_abs"))
+    features["coef_log10_range"] = _log10_range(abs_coefs)
+    features["frac_unit_coefs"] = float(np.mean(abs_coefs == 1.0)) if n_nonzeros else 0.0
+    features["frac_negative_coefs"] = (
+        float(np.mean(matrix.data < 0.0)) if n_nonzeros else 0.0
+    )
+    if n_nonzeros:
+        nonempty_rows = row_degrees > 0
+        starts = matrix.indptr[:-1][nonempty_rows]
+        row_dynamism = np.log10(
+            np.maximum.reduceat(abs_coefs, starts)
+            / np.minimum.reduceat(abs_coefs, starts)
+        )
+        features.update(_describe(row_dynamism, "row_log10_dynamism"))
+
+    # Правые части и типы ограничений
+    is_equality = problem.lhs == problem.rhs
+    finite_lhs, finite_rhs = np.isfinite(problem.lhs), np.isfinite(problem.rhs)
+    features["n_equality_conss"] = int(np.count_nonzero(is_equality))
+    features["n_ranged_conss"] = int(
+        np.count_nonzero(finite_lhs & finite_rhs & ~is_equality)
+    )
+    features["n_le_conss"] = int(np.count_nonzero(~finite_lhs & finite_rhs))
+    features["n_ge_conss"] = int(np.count_nonzero(finite_lhs & ~finite_rhs))
+    sides = np.where(finite_rhs, problem.rhs, np.where(finite_lhs, problem.lhs, 0.0))
+    features["frac_zero_rhs"] = float(np.mean(sides == 0.0)) if n_conss else 0.0
+    features["rhs_abs_max"] = float(np.abs(sides).max()) if n_conss else 0.0
+
+    constraint_classes, class_counts = np.unique(
+        classify_constraints(problem), return_counts=True
+    )
+    class_counts = dict(zip(constraint_classes.tolist(), class_counts.tolist()))
+    for constraint_class in CONSTRAINT_CLASSES:
+        features[f"n_{constraint_class}_conss"] = class_counts.get(constraint_class, 0)
+
+    return {name: float(value) for name, value in features.items()}
+
+
+class InstanceFeatures:
+    """
+    Извлекатель статических признаков задачи с кэшем на диске
+
+    Признаки записываются в json-файл, ключом служит хэш
+    содержимого lp-файла, поэтому повторное извлечение для
+    неизменной задачи сводится к чтению кэша
+    """
+
+    _CACHE_FILE_EXTENSION = ".json"
+
+    def __init__(
+        self, path_to_cache_dir: t.Optional[t.Union[str, pathlib2.Path]] = None
+    ):
+        self.path_to_cache_dir = (
+            None if path_to_cache_dir is None else Path(path_to_cache_dir)
+        )
+        if self.path_to_cache_dir is not None:
+            self.path_to_cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _get_path_to_cached_features(self, path_to_lp_file: PosixPath) -> PosixPath:
+        key: str = get_file_hash(path_to_lp_file)
+
+        return self.path_to_cache_dir.joinpath(f"{key}{self._CACHE_FILE_EXTENSION}")
+
+    def extract(
+        self,
+        path_to_lp_file: PosixPath,
+        logger: logging.Logger,
+        model: t.Optional[pyscipopt.scip.Model] = None,
+    ) -> t.Dict[str, float]:
+        """
+        Возвращает признаки задачи (из кэша, если он есть); lp-файл
+        разбирается напрямую, без чтения решателем, а уже прочитанная
+        модель обходится по ограничениям
+        """
+        path_to_lp_file = Path(path_to_lp_file)
+        path_to_cached_features: t.Optional[PosixPath] = None
+        if self.path_to_cache_dir is not None:
+            path_to_cached_features = self._get_path_to_cached_features(path_to_lp_file)
+            if path_to_cached_features.exists():
+                with open(path_to_cached_features, encoding="utf-8") as fo:
+                    return json.load(fo)
+
+        start = time.perf_counter()
+        problem = (
+            ProblemArrays.from_problem_file(path_to_lp_file, logger)
+            if model is None
+            else ProblemArrays.from_model(model, logger)
+        )
+        features = compute_instance_features(problem)
+        logger.info(
+            f"Features of `{path_to_lp_file.name}` have been extracted "
+            f"in {time.perf_counter() - start:.2f} s"
+        )
+
+        if path_to_cached_features is not None:
+            path_to_tmp_file = path_to_cached_features.with_name(
+                f".tmp_{os.getpid()}_{path_to_cached_features.name}"
+            )
+            with open(path_to_tmp_file, mode="w", encoding="utf-8") as fo:
+                json.dump(features, fo, indent=2)
+            os.replace(path_to_tmp_file, path_to_cached_features)
+
+        return features
@@ -0,0 +1,421 @@
+import logging
+import time
+import typing as t
+
+import ecole
+import numpy as np
+import pathlib2
+import pyscipopt
+
+from scip_ecole_model.branching_policies import (
+    LEARNED_POLICY_NAME,
+    BranchingPolicy,
+    PseudocostPolicy,
+)
+from scip_ecole_model.data_collection import iter_dataset_samples
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+try:
+    import threadpoolctl
+except ImportError:  # ограничение потоков BLAS необязательно
+    threadpoolctl = None
+
+# Границы корзин гистограммы задержек вывода (с): от 1 мкс до 1 с
+_LATENCY_BIN_EDGES = np.logspace(-6, 0, num=61)
+
+
+class MLPBranchingModel:
+    """
+    Двухслойный перцептрон, оценивающий кандидатов на ветвление
+    по их признакам из наблюдения NodeBipartite (column_features)
+    """
+
+    def __init__(
+        self,
+        *,
+        feature_mean: np.ndarray,
+        feature_std: np.ndarray,
+        w1: np.ndarray,
+        b1: np.ndarray,
+        w2: np.ndarray,
+    ):
+        self.feature_mean = feature_mean
+        self.feature_std = feature_std
+        self.w1 = w1
+        self.b1 = b1
+        self.w2 = w2
+
+    @classmethod
+    def init_random(
+        cls,
+        *,
+        feature_mean: np.ndarray,
+        feature_std: np.ndarray,
+        hidden_size: int,
+        rng: np.random.Generator,
+    ) -> "MLPBranchingModel":
+        n_features = feature_mean.size
+
+        return cls(
+            feature_mean=feature_mean,
+            feature_std=feature_std,
+            w1=rng.normal(0.0, np.sqrt(2.0 / n_features), (n_features, hidden_size)),
+            b1=np.zeros(hidden_size),
+            w2=rng.normal(0.0, np.sqrt(1.0 / hidden_size), hidden_size),
+        )
+
+    @property
+    def n_features(self) -> int:
+        return self.w1.shape[0]
+
+    @property
+    def hidden_size(self) -> int:
+        return self.w1.shape[1]
+
+    def save(self, path_to_weights_file: t.Union[str, pathlib2.Path]) -> t.NoReturn:
+        np.savez(
+            str(path_to_weights_file),
+            feature_mean=self.feature_mean,
+            feature_std=self.feature_std,
+            w1=self.w1,
+            b1=self.b1,
+            w2=self.w2,
+        )
+
+    @classmethod
+    def load(
+        cls, path_to_weights_file: t.Union[str, pathlib2.Path]
+    ) -> "MLPBranchingModel":
+        with np.load(str(path_to_weights_file)) as weights:
+            return cls(**{name: weights[name] for name in weights.files})
+
+    def astype(self, dtype: np.dtype) -> "MLPBranchingModel":
+        return MLPBranchingModel(
+            feature_mean=self.feature_mean.astype(dtype),
+            feature_std=self.feature_std.astype(dtype),
+            w1=self.w1.astype(dtype),
+            b1=self.b1.astype(dtype),
+            w2=self.w2.astype(dtype),
+        )
+
+    def normalize(self, features: np.ndarray) -> np.ndarray:
+        return (features - self.feature_mean) / self.feature_std
+
+    def forward(self, normalized: np.ndarray) -> t.Tuple[np.ndarray, np.ndarray]:
+        """
+        Возвращает оценки кандидатов и активации скрытого слоя
+        по нормированным признакам (используется при обучении)
+        """
+        hidden = np.maximum(normalized @ self.w1 + self.b1, 0.0)
+
+        return hidden @ self.w2, hidden
+
+
+def _load_training_samples(
+    path_to_dataset_dir: t.Union[str, pathlib2.Path],
+) -> t.Tuple[t.List[np.ndarray], np.ndarray]:
+    """
+    Возвращает признаки кандидатов каждого образца и позиции действий эксперта
+    """
+    candidate_features: t.List[np.ndarray] = []
+    actions: t.List[int] = []
+    for sample in iter_dataset_samples(path_to_dataset_dir):
+        candidate_features.append(
+            np.nan_to_num(
+                sample["column_features"][sample["action_set"]].astype(np.float64)
+            )
+        )
+        actions.append(sample["action"])
+
+    return candidate_features, np.array(actions, dtype=np.int64)
+
+
+def _segment_softmax_loss(
+    scores: np.ndarray, starts: np.ndarray, sizes: np.ndarray, targets: np.ndarray
+) -> t.Tuple[float, float, np.ndarray]:
+    """
+    Перекрестная энтропия softmax по кандидатам каждого образца;
+    возвращает среднюю потерю, точность (top-1) и градиент по оценкам
+    """
+    segment_max = np.maximum.reduceat(scores, starts)
+    exp_scores = np.exp(scores - np.repeat(segment_max, sizes))
+    segment_sum = np.add.reduceat(exp_scores, starts)
+
+    target_scores = scores[starts + targets]
+    loss = float(np.mean(segment_max + np.log(segment_sum) - target_scores))
+    accuracy = float(np.mean(target_scores >= segment_max))
+
+    grad = exp_scores / np.repeat(segment_sum, sizes)
+    grad[starts + targets] -= 1.0
+
+    return loss, accuracy, grad / starts.size
+
+
+def train_mlp_branching_model(
+    *,
+    path_to_dataset_dir: t.Union[str, pathlib2.Path],
+    logger: logging.Logger,
+    hidden_size: int = 32,
+    n_epochs: int = 20,
+    batch_size: int = 64,
+    learning_rate: float = 1e-3,
+    validation_fraction: float = 0.1,
+    seed: int = 0,
+) -> MLPBranchingModel:
+    """
+    Обучает перцептрон имитации решений эксперта (Adam,
+    softmax по кандидатам образца) на собранном наборе данных
+    """
+    rng = np.random.default_rng(seed)
+    candidate_features, actions = _load_training_samples(path_to_dataset_dir)
+    if not candidate_features:
+        raise ValueError(f"No samples in `{path_to_dataset_dir}`")
+
+    sample_ids = rng.permutation(len(candidate_features))
+    n_valid = int(len(sample_ids) * validation_fraction)
+    valid_ids, train_ids = sample_ids[:n_valid], sample_ids[n_valid:]
+
+    all_features = np.concatenate([candidate_features[i] for i in train_ids])
+    feature_std = all_features.std(axis=0)
+    feature_std[feature_std == 0.0] = 1.0
+    model = MLPBranchingModel.init_random(
+        feature_mean=all_features.mean(axis=0),
+        feature_std=feature_std,
+        hidden_size=hidden_size,
+        rng=rng,
+    )
+
+    def _make_batch(batch_ids: np.ndarray) -> t.Tuple[np.ndarray, ...]:
+        sizes = np.array([candidate_features[i].shape[0] for i in batch_ids])
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        features = np.concatenate([candidate_features[i] for i in batch_ids])
+
+        return features, starts, sizes, actions[batch_ids]
+
+    params = ("w1", "b1", "w2")
+    first_moments = {name: np.zeros_like(getattr(model, name)) for name in params}
+    second_moments = {name: np.zeros_like(getattr(model, name)) for name in params}
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    n_updates = 0
+
+    for epoch in range(n_epochs):
+        train_losses, train_accuracies = [], []
+        epoch_ids = rng.permutation(train_ids)
+        for batch_start in range(0, epoch_ids.size, batch_size):
+            features, starts, sizes, targets = _make_batch(
+                epoch_ids[batch_start : batch_start + batch_size]
+            )
+            normalized = model.normalize(features)
+            scores, hidden = model.forward(normalized)
+            loss, accuracy, grad_scores = _segment_softmax_loss(
+                scores, starts, sizes, targets
+            )
+            train_losses.append(loss)
+            train_accuracies.append(accuracy)
+
+            grad_hidden = np.outer(grad_scores, model.w2) * (hidden > 0.0)
+            grads = {
+                "w1": normalized.T @ grad_hidden,
+                "b1": grad_hidden.sum(axis=0),
+                "w2": hidden.T @ grad_scores,
+            }
+
+            n_updates += 1
+            for name in params:
+                first_moments[name] = (
+                    beta1 * first_moments[name] + (1.0 - beta1) * grads[name]
+                )
+                second_moments[name] = (
+                    beta2 * second_moments[name] + (1.0 - beta2) * grads[name] ** 2
+                )
+                step = (
+                    learning_rate
+                    * (first_moments[name] / (1.0 - beta1**n_updates))
+                    / (np.sqrt(second_moments[name] / (1.0 - beta2**n_updates)) + eps)
+                )
+                setattr(model, name, getattr(model, name) - step)
+
+        msg = (
+            f"Epoch {epoch + 1}/{n_epochs}: train loss {np.mean(train_losses):.4f}, "
+            f"train acc {np.mean(train_accuracies):.3f}"
+        )
+        if valid_ids.size > 0:
+            features, starts, sizes, targets = _make_batch(valid_ids)
+            valid_loss, valid_accuracy, _ = _segment_softmax_loss(
+                model.forward(model.normalize(features))[0], starts, sizes, targets
+            )
+            msg += f", valid loss {valid_loss:.4f}, valid acc {valid_accuracy:.3f}"
+        logger.info(msg)
+
+    return model
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек вывода с фиксированными логарифмическими
+    корзинами (запись одного значения -- бинарный поиск, без выделения памяти)
+    """
+
+    def __init__(self, bin_edges: np.ndarray = _LATENCY_BIN_EDGES):
+        self.bin_edges = bin_edges
+        # Крайние корзины собирают значения вне диапазона границ
+        self.counts = np.zeros(bin_edges.size + 1, dtype=np.int64)
+        self.n_values = 0
+        self.total = 0.0
+
+    def add(self, latency: float) -> t.NoReturn:
+        self.counts[np.searchsorted(self.bin_edges, latency)] += 1
+        self.n_values += 1
+        self.total += latency
+
+    def quantile(self, q: float) -> float:
+        """
+        Возвращает оценку квантиля (верхнюю границу корзины)
+        """
+        if self.n_values == 0:
+            return float("nan")
+        bin_idx = int(np.searchsorted(np.cumsum(self.counts), q * self.n_values))
+
+        return float(self.bin_edges[min(bin_idx, self.bin_edges.size - 1)])
+
+    def summary(self) -> str:
+        if self.n_values == 0:
+            return "no inference calls"
+
+        return (
+            f"{self.n_values} calls, mean {self.total / self.n_values * 1e3:.3f} ms, "
+            f"p50 <= {self.quantile(0.5) * 1e3:.3f} ms, "
+            f"p90 <= {self.quantile(0.9) * 1e3:.3f} ms, "
+            f"p99 <= {self.quantile(0.99) * 1e3:.3f} ms"
+        )
+
+
+class LearnedPolicy(BranchingPolicy):
+    """
+    Обученная политика ветвления (перцептрон над признаками кандидатов)
+
+    Входные буферы выделяются заранее, вывод может выполняться в float32
+    и с ограничением числа потоков BLAS; если средняя задержка вывода
+    превышает бюджет, политика до конца эпизода переходит
+    на ветвление по псевдостоимостям
+    """
+
+    name = LEARNED_POLICY_NAME
+
+    def __init__(
+        self,
+        model: MLPBranchingModel,
+        *,
+        dtype: t.Union[str, np.dtype] = np.float32,
+        n_threads: t.Optional[int] = 1,
+        time_budget_ms: t.Optional[float] = None,
+        max_candidates: int = 1024,
+    ):
+        self.dtype = np.dtype(dtype)
+        self.model = model.astype(self.dtype)
+        self.n_threads = n_threads
+        self.time_budget = None if time_budget_ms is None else time_budget_ms / 1e3
+
+        # Признаки наблюдения Ecole -- float64, вывод выполняется в `dtype`
+        self._raw_features = np.empty((max_candidates, model.n_features), np.float64)
+        self._features = np.empty((max_candidates, model.n_features), self.dtype)
+        self._hidden = np.empty((max_candidates, model.hidden_size), self.dtype)
+        self._scores = np.empty(max_candidates, self.dtype)
+
+        self._fallback_policy = PseudocostPolicy()
+        self._thread_limiter = None
+        self.latency_histogram = LatencyHistogram()
+        self.use_fallback = False
+        self.n_fallback_steps = 0
+        self._mean_latency = 0.0
+
+    @classmethod
+    def from_file(
+        cls, path_to_policy_weights: t.Union[str, pathlib2.Path], **policy_params
+    ) -> "LearnedPolicy":
+        return cls(MLPBranchingModel.load(path_to_policy_weights), **policy_params)
+
+    def make_observation_function(self) -> tuple:
+        # Псевдостоимости нужны для перехода на резервную политику
+        return ecole.observation.NodeBipartite(), ecole.observation.Pseudocosts()
+
+    def reset(self, model: pyscipopt.scip.Model) -> t.NoReturn:
+        self.latency_histogram = LatencyHistogram()
+        self.use_fallback = False
+        self.n_fallback_steps = 0
+        self._mean_latency = 0.0
+        if (self.n_threads is not None) and (threadpoolctl is not None):
+            self._thread_limiter = threadpoolctl.threadpool_limits(limits=self.n_threads)
+
+    def close(self) -> t.NoReturn:
+        if self._thread_limiter is not None:
+            self._thread_limiter.restore_original_limits()
+            self._thread_limiter = None
+
+        logger.info(
+            f"Learned policy inference: {self.latency_histogram.summary()}; "
+            f"pseudocost fallback steps: {self.n_fallback_steps}"
+        )
+
+    def _ensure_capacity(self, n_candidates: int) -> t.NoReturn:
+        if n_candidates > self._scores.size:
+            capacity = 2 * n_candidates
+            self._raw_features = np.empty((capacity, self.model.n_features), np.float64)
+            self._features = np.empty((capacity, self.model.n_features), self.dtype)
+            self._hidden = np.empty((capacity, self.model.hidden_size), self.dtype)
+            self._scores = np.empty(capacity, self.dtype)
+
+    def score(self, column_features: np.ndarray, action_set: np.ndarray) -> np.ndarray:
+        """
+        Возвращает оценки кандидатов (вывод в заранее выделенных буферах)
+        """
+        n_candidates = len(action_set)
+        self._ensure_capacity(n_candidates)
+        raw_features = self._raw_features[:n_candidates]
+        features = self._features[:n_candidates]
+        hidden = self._hidden[:n_candidates]
+        scores = self._scores[:n_candidates]
+
+        # При mode="clip" np.take пишет прямо в `out` без промежуточной копии
+        np.take(
+            np.asarray(column_features, dtype=np.float64),
+            action_set,
+            axis=0,
+            out=raw_features,
+            mode="clip",
+        )
+        np.copyto(features, raw_features, casting="same_kind")
+        np.nan_to_num(features, copy=False)
+        features -= self.model.feature_mean
+        features /= self.model.feature_std
+        np.matmul(features, self.model.w1, out=hidden)
+        hidden += self.model.b1
+        np.maximum(hidden, 0.0, out=hidden)
+        np.matmul(hidden, self.model.w2, out=scores)
+
+        return scores
+
+    def __call__(self, action_set: np.ndarray, observation: tuple) -> int:
+        node_observation, pseudocosts = observation
+        if self.use_fallback:
+            self.n_fallback_steps += 1
+            return self._fallback_policy(action_set, pseudocosts)
+
+        start = time.perf_counter()
+        scores = self.score(node_observation.column_features, action_set)
+        action = action_set[int(np.argmax(scores))]
+        latency = time.perf_counter() - start
+
+        self.latency_histogram.add(latency)
+        if self.time_budget is not None:
+            # Экспоненциальное скользящее среднее сглаживает единичные выбросы
+            self._mean_latency = 0.9 * self._mean_latency + 0.1 * latency
+            if self._mean_latency > self.time_budget:
+                self.use_fallback = True
+                logger.warning(
+                    f"Mean inference latency {self._mean_latency * 1e3:.3f} ms exceeds "
+                    f"the budget {self.time_budget * 1e3:.3f} ms, "
+                    f"switching to pseudocost branching"
+                )
+
+        return action
@@ -0,0 +1,250 @@
+import logging
+import time
+import typing as t
+
+import numpy as np
+import pathlib2
+import scipy.sparse as sp
+from pathlib2 import Path, PosixPath
+from scipy.optimize import linprog
+
+from scip_ecole_model.feasibility import (
+    DEFAULT_FEASIBILITY_TOL,
+    check_solution,
+    is_integer_var_mask,
+    row_violations,
+)
+from scip_ecole_model.problem_arrays import ProblemArrays, load_problem_arrays
+from scip_ecole_model.sol_io import write_sol_file
+
+# Число случайных округлений (в дополнение к детерминированным)
+DEFAULT_N_RANDOM_ROUNDINGS = 8
+# Число лучших округлений, для которых пересчитываются непрерывные переменные
+DEFAULT_MAX_RESOLVES = 3
+
+
+def solve_lp_relaxation(
+    problem: ProblemArrays,
+    logger: logging.Logger,
+    lbs: t.Optional[np.ndarray] = None,
+    ubs: t.Optional[np.ndarray] = None,
+    time_limit: t.Optional[float] = None,
+    title: str = "LP relaxation",
+) -> t.Optional[np.ndarray]:
+    """
+    Решает LP-релаксацию задачи (HiGHS); границы переменных можно
+    переопределить через `lbs` и `ubs`
+
+    Возвращает None, если оптимальное решение не найдено
+    """
+    lbs = problem.lbs if lbs is None else lbs
+    ubs = problem.ubs if ubs is None else ubs
+    is_equality = problem.lhs == problem.rhs
+    finite_rhs = np.isfinite(problem.rhs) & ~is_equality
+    finite_lhs = np.isfinite(problem.lhs) & ~is_equality
+    sense = -1.0 if problem.obj_sense == "maximize" else 1.0
+
+    result = linprog(
+        c=sense * problem.obj,
+        A_ub=sp.vstack(
+            [problem.matrix[finite_rhs], -problem.matrix[finite_lhs]]
+        ).tocsr(),
+        b_ub=np.concatenate([problem.rhs[finite_rhs], -problem.lhs[finite_lhs]]),
+        A_eq=problem.matrix[is_equality],
+        b_eq=problem.rhs[is_equality],
+        bounds=np.column_stack([lbs, ubs]),
+        method="highs",
+        options={} if time_limit is None else {"time_limit": time_limit},
+    )
+    if result.status != 0:
+        logger.warning(f"{title} has not been solved: {result.message}")
+        return None
+
+    return result.x
+
+
+def compute_locks(problem: ProblemArrays) -> t.Tuple[np.ndarray, np.ndarray]:
+    """
+    Число строк, которые могут нарушиться при уменьшении (down-locks)
+    и увеличении (up-locks) значения каждой переменной
+    """
+    matrix = problem.matrix
+    row_ids = np.repeat(np.arange(problem.n_conss), np.diff(matrix.indptr))
+    finite_lhs = np.isfinite(problem.lhs)[row_ids]
+    finite_rhs = np.isfinite(problem.rhs)[row_ids]
+    is_positive = matrix.data > 0.0
+
+    down_locks = np.bincount(
+        matrix.indices,
+        weights=(is_positive & finite_lhs) | (~is_positive & finite_rhs),
+        minlength=problem.n_vars,
+    )
+    up_locks = np.bincount(
+        matrix.indices,
+        weights=(is_positive & finite_rhs) | (~is_positive & finite_lhs),
+        minlength=problem.n_vars,
+    )
+
+    return down_locks, up_locks
+
+
+def round_candidates(
+    problem: ProblemArrays,
+    x_lp: np.ndarray,
+    n_random_roundings: int = DEFAULT_N_RANDOM_ROUNDINGS,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Строит матрицу округлений LP-решения (по строке на кандидата):
+    к ближайшему целому, по блокировкам и случайные (floor(x + u))
+
+    Непрерывные переменные сохраняют значения LP-решения
+    """
+    is_integer = is_integer_var_mask(problem)
+    down_locks, up_locks = compute_locks(problem)
+    floors, ceils = np.floor(x_lp), np.ceil(x_lp)
+
+    # Округление в сторону, не нарушающую ни одной строки (или меньшего числа строк)
+    lock_rounding = np.where(
+        down_locks == up_locks,
+        np.round(x_lp),
+        np.where(down_locks < up_locks, floors, ceils),
+    )
+    rng = np.random.default_rng(seed)
+    random_roundings = np.floor(x_lp + rng.random((n_random_roundings, problem.n_vars)))
+
+    candidates = np.vstack([np.round(x_lp), lock_rounding, random_roundings])
+    candidates = np.where(is_integer, candidates, x_lp)
+    lbs = np.where(is_integer, np.ceil(problem.lbs), problem.lbs)
+    ubs = np.where(is_integer, np.floor(problem.ubs), problem.ubs)
+
+    return np.clip(candidates, lbs, ubs)
+
+
+def rank_candidates(
+    problem: ProblemArrays, candidates: np.ndarray, tol: float
+) -> t.Tuple[np.ndarray, np.ndarray]:
+    """
+    Проверяет всех кандидатов одним умножением матрицы на матрицу и
+    упорядочивает их по числу нарушенных строк, затем по целевой функции
+
+    Возвращает порядок кандидатов и число нарушенных каждым строк
+    """
+    activities: np.ndarray = (problem.matrix @ candidates.T).T
+    n_violated_rows = np.count_nonzero(row_violations(problem, activities, tol), axis=1)
+    sense = -1.0 if problem.obj_sense == "maximize" else 1.0
+    objective_values = sense * (candidates @ problem.obj)
+
+    return np.lexsort((objective_values, n_violated_rows)), n_violated_rows
+
+
+def lp_rounding(
+    problem: ProblemArrays,
+    logger: logging.Logger,
+    n_random_roundings: int = DEFAULT_N_RANDOM_ROUNDINGS,
+    max_resolves: int = DEFAULT_MAX_RESOLVES,
+    seed: int = 0,
+    time_limit: t.Optional[float] = None,
+    tol: float = DEFAULT_FEASIBILITY_TOL,
+) -> t.Optional[np.ndarray]:
+    """
+    Эвристика округления LP-релаксации: LP решается один раз, округления
+    проверяются пакетно; если лучшее из них недопустимо, для нескольких
+    лучших округлений непрерывные переменные пересчитываются LP-задачей
+    при зафиксированных целочисленных
+
+    Возвращает допустимое решение или None
+    """
+    x_lp = solve_lp_relaxation(problem, logger, time_limit=time_limit)
+    if x_lp is None:
+        return None
+
+    candidates = np.unique(
+        round_candidates(problem, x_lp, n_random_roundings, seed), axis=0
+    )
+    order, n_violated_rows = rank_candidates(problem, candidates, tol)
+    logger.info(
+        f"Best of {candidates.shape[0]} distinct LP roundings "
+        f"violates {n_violated_rows[order[0]]} rows"
+    )
+    if n_violated_rows[order[0]] == 0:
+        return candidates[order[0]]
+
+    is_integer = is_integer_var_mask(problem)
+    if is_integer.all():
+        return None
+
+    for position in order[:max_resolves].tolist():
+        x = solve_lp_relaxation(
+            problem,
+            logger,
+            lbs=np.where(is_integer, candidates[position], problem.lbs),
+            ubs=np.where(is_integer, candidates[position], problem.ubs),
+            time_limit=time_limit,
+            title="LP with fixed integer vars",
+        )
+        if x is None:
+            continue
+        # Целочисленные переменные зафиксированы, HiGHS возвращает их с погрешностью
+        x = np.where(is_integer, np.round(x), x)
+        if check_solution(problem, x, tol).is_feasible:
+            return x
+
+    return None
+
+
+def generate_lp_rounding_warm_start(
+    path_to_lp_file: t.Union[str, pathlib2.Path],
+    path_to_warm_start_file: t.Union[str, pathlib2.Path],
+    *,
+    path_to_arrays_dir: t.Union[str, pathlib2.Path],
+    logger: logging.Logger,
+    n_random_roundings: int = DEFAULT_N_RANDOM_ROUNDINGS,
+    max_resolves: int = DEFAULT_MAX_RESOLVES,
+    seed: int = 0,
+    time_limit: t.Optional[float] = None,
+    tol: float = DEFAULT_FEASIBILITY_TOL,
+) -> t.Optional[PosixPath]:
+    """
+    Строит 'теплый' старт округлением LP-релаксации и записывает его
+    в sol-файл `path_to_warm_start_file`
+
+    Возвращает путь до sol-файла или None, если допустимое решение не найдено
+    """
+    start = time.perf_counter()
+    problem = load_problem_arrays(
+        path_to_lp_file, path_to_arrays_dir=path_to_arrays_dir, logger=logger
+    )
+    x = lp_rounding(
+        problem,
+        logger,
+        n_random_roundings=n_random_roundings,
+        max_resolves=max_resolves,
+        seed=seed,
+        time_limit=time_limit,
+        tol=tol,
+    )
+    if x is None:
+        logger.warning(
+            f"LP rounding has not found a feasible warm start "
+            f"in {time.perf_counter() - start:.2f} s"
+        )
+        return None
+
+    path_to_warm_start_file = Path(path_to_warm_start_file)
+    path_to_warm_start_file.parent.mkdir(parents=True, exist_ok=True)
+    objective_value = float(problem.obj @ x + problem.obj_offset)
+    write_sol_file(
+        path_to_warm_start_file,
+        names=problem.var_names,
+        values=x,
+        objs=problem.obj,
+        objective_value=objective_value,
+    )
+    logger.info(
+        f"LP rounding warm start (objective value: {objective_value:.8g}) "
+        f"has been written to `{path_to_warm_start_file}` "
+        f"in {time.perf_counter() - start:.2f} s"
+    )
+
+    return path_to_warm_start_file
@@ -0,0 +1,73 @@
+import logging
+import resource
+import sys
+import time
+import typing as t
+
+import pyscipopt
+from pathlib2 import PosixPath
+
+from scip_ecole_model.problem_cache import ProblemCache
+
+
+def get_peak_rss_mb() -> float:
+    """
+    Возвращает пиковый объем резидентной памяти процесса (в МБ)
+    """
+    # В Linux значение `ru_maxrss` возвращается в КБ, в macOS -- в байтах
+    peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak_rss / 1024**2
+
+    return peak_rss / 1024
+
+
+def load_problem(
+    path_to_lp_file: PosixPath,
+    logger: logging.Logger,
+    problem_cache: t.Optional[ProblemCache] = None,
+) -> pyscipopt.scip.Model:
+    """
+    Читает файл математической постановки задачи один раз
+    за запуск конвейера и возвращает SCIP-модель, которая
+    затем передается сборщику статистики и процедурам поиска решения
+
+    Если передан кэш задач, модель читается из кэша,
+    а при промахе -- из lp-файла с последующим сохранением в кэш
+    """
+    model = pyscipopt.scip.Model()
+
+    start = time.perf_counter()
+    loaded_from_cache = False
+    if problem_cache is not None:
+        path_to_cached_problem: PosixPath = problem_cache.get_path_to_cached_problem(
+            path_to_lp_file
+        )
+        loaded_from_cache = problem_cache.load(
+            model=model,
+            path_to_cached_problem=path_to_cached_problem,
+            logger=logger,
+        )
+
+    if not loaded_from_cache:
+        try:
+            model.readProblem(str(path_to_lp_file))
+        except OSError as err:
+            logger.error(f"{err}")
+            sys.exit(-1)
+    reading_time: float = time.perf_counter() - start
+
+    logger.info(
+        f"File `{path_to_lp_file.name}` has been read successfully"
+        f"{' (from cache)' if loaded_from_cache else ''}! "
+        f"(reading time: {reading_time:.2f} s, peak RSS: {get_peak_rss_mb():.0f} MB)"
+    )
+
+    if (problem_cache is not None) and (not loaded_from_cache):
+        problem_cache.store(
+            model=model,
+            path_to_cached_problem=path_to_cached_problem,
+            logger=logger,
+        )
+
+    return model
@@ -1,39 +1,330 @@
+import collections
+import concurrent.futures
+import json
 import logging
+import os
 import sys
+import time
 import typing as t
 
 import ecole
+import numpy as np
 import pyscipopt
-from pathlib2 import PosixPath
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.branching_policies import BranchingPolicy, FirstCandidatePolicy
+from scip_ecole_model.decomposition import (
+    BlockResult,
+    DecomposedResult,
+    merge_block_results,
+    split_into_blocks,
+)
+from scip_ecole_model.feasibility import sol_to_vector
+from scip_ecole_model.problem_arrays import ProblemArrays
+from scip_ecole_model.scip_elems import SCIPAttributes
+from scip_ecole_model.sol_io import read_sol_file, write_sol_file
+from scip_ecole_model.telemetry import StepTelemetry
+from scip_ecole_model.variable_index import VariableIndex
+
+# Значения ограничения времени не меньше считаются отсутствием ограничения
+_SCIP_INFINITY = 1e20
+# Метод оценки размера дерева (доля завершенного дерева; остальные методы
+# решателя SCIP дают оценку лишь после накопления большого числа листьев)
+_TREESIZE_ESTIMATION_PARAM = "estimation/method"
+_TREESIZE_ESTIMATION_METHOD = "c"
+# Число узлов, до которого оценка размера дерева считается ненадежной
+_MIN_NODES_FOR_TREESIZE_ESTIMATION = 100
+_CHECKPOINT_TMP_FILE_PREFIX = ".tmp_"
+
+
+class _IncumbentCheckpointEventhdlr(pyscipopt.Eventhdlr):
+    """
+    Обработчик событий решателя, сохраняющий лучшее решение в контрольную
+    точку -- sol-файл (sol.gz -- сжатый) только с ненулевыми значениями;
+    границы целевой функции и время решения записываются рядом в json-файл
+    (решатель SCIP не допускает комментариев в sol-файлах)
+
+    Файл заменяется атомарно и не чаще одного раза в `min_interval`
+    секунд; решение, найденное внутри интервала, записывается по событию
+    решения узла после его истечения или вызовом `flush`
+    """
+
+    def __init__(
+        self,
+        *,
+        path_to_checkpoint_file: PosixPath,
+        min_interval: float,
+        logger: logging.Logger,
+    ):
+        self.path_to_checkpoint_file = Path(path_to_checkpoint_file)
+        self.path_to_meta_file = get_path_to_checkpoint_meta_file(
+            self.path_to_checkpoint_file
+        )
+        self.min_interval = min_interval
+        self.logger = logger
+        self.var_index: t.Optional[VariableIndex] = None
+        self.last_write_time = -float("inf")
+        self.has_pending_sol = False
+        self.n_checkpoints = 0
+
+    def eventinit(self):
+        self.var_index = VariableIndex.from_model(self.model)
+        self.path_to_checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        self.model.catchEvent(pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND, self)
+        self.model.catchEvent(pyscipopt.SCIP_EVENTTYPE.NODESOLVED, self)
+
+    def eventexit(self):
+        self.model.dropEvent(pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND, self)
+        self.model.dropEvent(pyscipopt.SCIP_EVENTTYPE.NODESOLVED, self)
+
+    def eventexec(self, event):
+        if event.getType() == pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND:
+            self.has_pending_sol = True
+        if (
+            self.has_pending_sol
+            and time.perf_counter() - self.last_write_time >= self.min_interval
+        ):
+            self.flush()
+
+    def flush(self) -> t.NoReturn:
+        """
+        Записывает лучшее решение, если оно еще не сохранено
+        """
+        if not self.has_pending_sol or self.model.getNSols() == 0:
+            return
+
+        # Внутри события BESTSOLFOUND граница может быть еще не обновлена,
+        # поэтому значение целевой функции берется из самого решения
+        best_sol: pyscipopt.scip.Solution = self.model.getBestSol()
+        objective_value: float = self.model.getSolObjVal(best_sol)
+        try:
+            path_to_tmp_file = self._get_path_to_tmp_file(self.path_to_checkpoint_file)
+            write_sol_file(
+                path_to_tmp_file,
+                names=self.var_index.names,
+                values=self.var_index.all_values(self.model, best_sol),
+                objs=self.var_index.objs,
+                objective_value=objective_value,
+            )
+            os.replace(path_to_tmp_file, self.path_to_checkpoint_file)
+
+            # Описание записывается после решения, поэтому всегда
+            # соответствует решению в sol-файле или предшествует ему
+            path_to_tmp_file = self._get_path_to_tmp_file(self.path_to_meta_file)
+            with open(path_to_tmp_file, mode="w", encoding="utf-8") as fo:
+                json.dump(
+                    {
+                        "primal_bound": objective_value,
+                        "dual_bound": self.model.getDualbound(),
+                        "solving_time": self.model.getSolvingTime(),
+                        "n_sols": self.model.getNSols(),
+                    },
+                    fo,
+                    indent=2,
+                )
+            os.replace(path_to_tmp_file, self.path_to_meta_file)
+        except OSError as err:
+            # Сбой записи контрольной точки не должен прерывать решение
+            self.logger.warning(f"Checkpoint was not written: {err}")
+        else:
+            self.n_checkpoints += 1
+        self.has_pending_sol = False
+        self.last_write_time = time.perf_counter()
+
+    @staticmethod
+    def _get_path_to_tmp_file(path_to_file: PosixPath) -> PosixPath:
+        return path_to_file.with_name(
+            f"{_CHECKPOINT_TMP_FILE_PREFIX}{os.getpid()}_{path_to_file.name}"
+        )
+
+
+def get_path_to_checkpoint_meta_file(path_to_checkpoint_file: PosixPath) -> PosixPath:
+    """
+    Путь до json-файла описания контрольной точки
+    (границы целевой функции и время решения)
+    """
+    path_to_checkpoint_file = Path(path_to_checkpoint_file)
+    stem: str = path_to_checkpoint_file.name.split(".", 1)[0]
+
+    return path_to_checkpoint_file.with_name(f"{stem}.json")
+
+
+class _GapStallEventhdlr(pyscipopt.Eventhdlr):
+    """
+    Обработчик событий решателя (решение узла и LP), вызывающий
+    проверку политики остановки не чаще одного раза в `check_interval` секунд
+    """
+
+    def __init__(self, *, termination: "GapStallTermination", check_interval: float):
+        self.termination = termination
+        self.check_interval = check_interval
+        self.last_check_time = -float("inf")
+
+    def eventinit(self):
+        self.model.catchEvent(pyscipopt.SCIP_EVENTTYPE.NODESOLVED, self)
+        self.model.catchEvent(pyscipopt.SCIP_EVENTTYPE.LPSOLVED, self)
+
+    def eventexit(self):
+        self.model.dropEvent(pyscipopt.SCIP_EVENTTYPE.NODESOLVED, self)
+        self.model.dropEvent(pyscipopt.SCIP_EVENTTYPE.LPSOLVED, self)
+
+    def eventexec(self, event):
+        now = time.perf_counter()
+        if now - self.last_check_time < self.check_interval:
+            return
+        self.last_check_time = now
+        self.termination.check(self.model)
+
+
+class GapStallTermination:
+    """
+    Политика досрочной остановки решения, освобождающая ядро для других задач:
+    - застой зазора: за последние `window` секунд относительный зазор
+      уменьшился меньше чем на `min_gap_improvement` (пока решение
+      не найдено, зазор застоем не считается);
+    - прогноз по оценке размера дерева: ожидаемое время решения превышает
+      ограничение времени более чем в `max_predicted_time_ratio` раз
+
+    До `min_time` секунд решения остановка не выполняется; причина
+    остановки сохраняется в `stop_status` (решатель сообщает userinterrupt).
+    Для прогноза задается метод оценки размера дерева по доле завершенного
+    дерева, если set-файл не задает другой
+    """
+
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        window: float = 300.0,
+        min_gap_improvement: float = 1e-3,
+        max_predicted_time_ratio: t.Optional[float] = 10.0,
+        min_time: float = 60.0,
+        check_interval: float = 1.0,
+    ):
+        self.logger = logger
+        self.window = window
+        self.min_gap_improvement = min_gap_improvement
+        self.max_predicted_time_ratio = max_predicted_time_ratio
+        self.min_time = min_time
+        self.check_interval = check_interval
+
+        self.stop_status: t.Optional[str] = None
+        self._gap_samples: t.Deque[t.Tuple[float, float]] = collections.deque()
+
+    def attach(self, model: pyscipopt.scip.Model) -> t.NoReturn:
+        """
+        Подключает обработчик событий к модели (до запуска решения)
+        """
+        model.includeEventhdlr(
+            _GapStallEventhdlr(termination=self, check_interval=self.check_interval),
+            "gap_stall_termination",
+            "Interrupts solving when the gap stalls or the tree is too large",
+        )
+        # Оценка размера дерева появилась в PySCIPOpt позже версии 3.4.0
+        if self.max_predicted_time_ratio is not None and not hasattr(
+            model, "getTreesizeEstimation"
+        ):
+            self.logger.warning(
+                "Tree size estimation is not available in this PySCIPOpt version, "
+                "the tree size limit is disabled"
+            )
+            self.max_predicted_time_ratio = None
+        if self.max_predicted_time_ratio is not None:
+            model.setParam(_TREESIZE_ESTIMATION_PARAM, _TREESIZE_ESTIMATION_METHOD)
+
+    def check(self, model: pyscipopt.scip.Model) -> t.NoReturn:
+        """
+        Проверяет условия остановки и при их выполнении прерывает решение
+        """
+        if self.stop_status is not None:
+            return
+
+        solving_time: float = model.getSolvingTime()
+        gap: float = model.getGap()
+        infinity: float = model.infinity()
+        self._gap_samples.append((solving_time, gap))
+        # Первым остается последний образец не позже начала окна
+        while (
+            len(self._gap_samples) > 1
+            and self._gap_samples[1][0] <= solving_time - self.window
+        ):
+            self._gap_samples.popleft()
+
+        if solving_time < self.min_time:
+            return
+
+        past_time, past_gap = self._gap_samples[0]
+        if past_time <= solving_time - self.window and gap < infinity:
+            gap_improvement = past_gap - gap if past_gap < infinity else float("inf")
+            if gap_improvement < self.min_gap_improvement:
+                self._stop(
+                    model,
+                    SCIPAttributes.STATUS_GAPSTALL,
+                    f"gap {gap * 100:.4g}% has improved by "
+                    f"{gap_improvement * 100:.3g}% over last {self.window:g} s",
+                )
+                return
+
+        if self.max_predicted_time_ratio is None:
+            return
+        time_limit: float = model.getParam(SCIPAttributes.LIMITS_TIME)
+        n_nodes: int = model.getNNodes()
+        if time_limit >= infinity or n_nodes < _MIN_NODES_FOR_TREESIZE_ESTIMATION:
+            return
+        # Оценка недоступна, пока дерево не накопило достаточно узлов (-1)
+        treesize_estimation: float = model.getTreesizeEstimation()
+        if treesize_estimation <= 0.0:
+            return
+        predicted_time = solving_time / n_nodes * treesize_estimation
+        if predicted_time > self.max_predicted_time_ratio * time_limit:
+            self._stop(
+                model,
+                SCIPAttributes.STATUS_TREESIZELIMIT,
+                f"estimated tree size {treesize_estimation:.3g} nodes "
+                f"needs ~{predicted_time:.3g} s (time limit {time_limit:g} s)",
+            )
+
+    def _stop(self, model: pyscipopt.scip.Model, status: str, reason: str):
+        self.stop_status = status
+        self.logger.info(
+            f"Solving is stopped early [{status}] at "
+            f"{model.getSolvingTime():.2f} s: {reason}"
+        )
+        model.interruptSolve()
 
 
 def scip_optimize(
-    env: t.Union[
-        ecole.environment.Branching,
-        ecole.environment.Configuring,
-    ],
-    path_to_lp_file: PosixPath,
+    model_scip: pyscipopt.scip.Model,
+    scip_params: dict,
     path_to_warm_start_file: PosixPath,
     logger: logging.Logger,
     use_warm_start: bool = False,
+    path_to_checkpoint_file: t.Optional[PosixPath] = None,
+    checkpoint_min_interval: float = 10.0,
 ) -> pyscipopt.scip.Model:
     """
     Запускает процесс поиска решения
-    только с помощью SCIP
-    """
-    model_scip = pyscipopt.scip.Model()
-    # Прочитать файл математической постановки
-    try:
-        model_scip.readProblem(str(path_to_lp_file))
-    except OSError as err:
-        logger.error(f"{err}")
-        sys.exit(-1)
-    else:
-        logger.info(f"File `{path_to_lp_file.name}` has been read successfully!")
+    только с помощью SCIP на заранее прочитанной модели
 
-    scip_params = env.scip_params
+    Если задан `path_to_checkpoint_file`, каждое новое лучшее решение
+    сохраняется в контрольную точку (не чаще одного раза
+    в `checkpoint_min_interval` секунд)
+    """
     model_scip.setParams(scip_params)
 
+    checkpoint_eventhdlr: t.Optional[_IncumbentCheckpointEventhdlr] = None
+    if path_to_checkpoint_file is not None:
+        checkpoint_eventhdlr = _IncumbentCheckpointEventhdlr(
+            path_to_checkpoint_file=path_to_checkpoint_file,
+            min_interval=checkpoint_min_interval,
+            logger=logger,
+        )
+        model_scip.includeEventhdlr(
+            checkpoint_eventhdlr,
+            "incumbent_checkpoint",
+            "Writes each new incumbent to the checkpoint file",
+        )
+
     if use_warm_start:
         # Прочитать файл стартового решения
         try:
@@ -53,6 +344,13 @@ def scip_optimize(
 
     model_scip.optimize()
 
+    if checkpoint_eventhdlr is not None:
+        checkpoint_eventhdlr.flush()
+        logger.info(
+            f"{checkpoint_eventhdlr.n_checkpoints} checkpoints have been written "
+            f"to `{checkpoint_eventhdlr.path_to_checkpoint_file}`"
+        )
+
     return model_scip
 
 
@@ -61,28 +359,28 @@ def scip_ecole_optimize(
         ecole.environment.Branching,
         ecole.environment.Configuring,
     ],
-    path_to_lp_file: PosixPath,
+    model_scip: pyscipopt.scip.Model,
     path_to_warm_start_file: PosixPath,
     logger: logging.Logger,
     use_warm_start: bool = False,
-) -> ecole.core.scip.Model:
+    telemetry: t.Optional[StepTelemetry] = None,
+    branching_policy: t.Optional[BranchingPolicy] = None,
+) -> t.Tuple[pyscipopt.scip.Model, StepTelemetry]:
     """
     Запускает процесс поиска решения с помощью SCIP+Ecole
+    на заранее прочитанной модели; возвращает модель и телеметрию шагов
     """
     env.seed(42)
-    nb_nodes, time = 0, 0
+    telemetry = StepTelemetry(logger=logger) if telemetry is None else telemetry
+    branching_policy = (
+        FirstCandidatePolicy() if branching_policy is None else branching_policy
+    )
 
-    if use_warm_start:
-        model_scip = pyscipopt.scip.Model()
-        # Прочитать файлы математической постановки и стартового решения
-        try:
-            model_scip.readProblem(str(path_to_lp_file))
-        except OSError as err:
-            logger.error(f"{err}")
-            sys.exit(-1)
-        else:
-            logger.info(f"File `{path_to_lp_file.name}` has been read successfully!")
+    scip_params = env.scip_params
+    model_scip.setParams(scip_params)
 
+    if use_warm_start:
+        # Прочитать файл стартового решения
         try:
             warm_start_for_SCIP: pyscipopt.scip.Solution = model_scip.readSolFile(
                 str(path_to_warm_start_file)
@@ -93,34 +391,195 @@ def scip_ecole_optimize(
         else:
             logger.info(f"File `{path_to_warm_start_file}` has been read successfully!")
 
-        scip_params = env.scip_params
-        model_scip.setParams(scip_params)
         # Добавить решение для 'теплого' старта
         model_scip.addSol(warm_start_for_SCIP)
-        # Отобразить SCIP-модель на Ecole-модель
-        model_ecole = ecole.scip.Model.from_pyscipopt(model_scip)
-    else:
-        model_ecole = ecole.scip.Model.from_file(str(path_to_lp_file))
-        model_ecole.set_params(env.scip_params)
+
+    # Отобразить SCIP-модель на Ecole-модель (без повторного чтения lp-файла)
+    model_ecole = ecole.scip.Model.from_pyscipopt(model_scip)
 
     logger.info("Reset environment ...")
     obs, action_set, reward, done, info = env.reset(model_ecole)
+    branching_policy.reset(env.model.as_pyscipopt())
+    logger.info(f"Branching policy: `{branching_policy.name}`")
+
+    # Журнал ведется выборочно через телеметрию, а не на каждом шаге
+    record = telemetry.record
+    while not done:
+        obs, action_set, reward, done, info = env.step(branching_policy(action_set, obs))
+        record(
+            reward=reward,
+            nb_nodes=info["nb_nodes"],
+            time_=info["time"],
+            action_set_size=0 if action_set is None else len(action_set),
+        )
+    branching_policy.close()
 
-    msg = (
-        "\n\tNew step in environment [iter={}]\n"
-        "\taction_set: {}\n"
-        "\treward: {}\n"
-        "\tinfo: {}\n"
-        "\tdone: {}\n"
+    logger.info(
+        f"Ecole loop has been finished: {telemetry.n_steps} steps, "
+        f"nb_nodes: {info['nb_nodes']}, time: {info['time']:.2f}"
     )
 
-    count = 0
-    while not done:
-        logger.info(msg.format(count, action_set, reward, info, done))
-        obs, action_set, reward, done, info = env.step(action_set[0])
+    return env.model.as_pyscipopt(), telemetry
+
+
+def _solve_block(
+    path_to_block_file: PosixPath,
+    scip_params: dict,
+    path_to_warm_start_file: t.Optional[PosixPath],
+    logger: logging.Logger,
+    deadline: t.Optional[float] = None,
+) -> BlockResult:
+    """
+    Решает один блок декомпозиции (выполняется в дочернем процессе);
+    бюджет времени блока сокращается до времени, оставшегося до `deadline`
+    (момент по часам time.time())
+    """
+    if deadline is not None:
+        scip_params = dict(scip_params)
+        scip_params[SCIPAttributes.LIMITS_TIME] = min(
+            scip_params.get(SCIPAttributes.LIMITS_TIME, _SCIP_INFINITY),
+            max(deadline - time.time(), 0.0),
+        )
 
-        nb_nodes += info["nb_nodes"]
-        time += info["time"]
-        count += 1
+    model = pyscipopt.Model()
+    # Журналы параллельно работающих решателей не должны перемешиваться
+    model.hideOutput()
+    try:
+        model.readProblem(str(path_to_block_file))
+    except OSError as err:
+        logger.error(f"{err}")
+        sys.exit(-1)
+
+    model = scip_optimize(
+        model_scip=model,
+        scip_params=scip_params,
+        path_to_warm_start_file=path_to_warm_start_file,
+        logger=logger,
+        use_warm_start=path_to_warm_start_file is not None,
+    )
+    model.writeStatistics(str(path_to_block_file.with_suffix(".stats")))
+
+    n_sols: int = model.getNSols()
+    var_index = VariableIndex.from_model(model)
+
+    return BlockResult(
+        name=path_to_block_file.stem,
+        status=model.getStatus(),
+        n_sols=n_sols,
+        n_best_sols=model.getNBestSolsFound(),
+        primal_bound=model.getPrimalbound(),
+        dual_bound=model.getDualbound(),
+        solving_time=model.getSolvingTime(),
+        var_names=var_index.names,
+        values=(
+            var_index.all_values(model)
+            if n_sols > 0
+            else np.zeros(len(var_index), dtype=np.float64)
+        ),
+        n_vars_after_presolving=model.getNVars(),
+        n_bin_vars_after_presolving=model.getNBinVars(),
+        n_int_vars_after_presolving=model.getNIntVars(),
+        n_conss_after_presolving=model.getNConss(),
+    )
 
-    return env.model.as_pyscipopt()
+
+def scip_decomposed_optimize(
+    problem: ProblemArrays,
+    scip_params: dict,
+    path_to_work_dir: PosixPath,
+    logger: logging.Logger,
+    path_to_warm_start_file: t.Optional[PosixPath] = None,
+    use_warm_start: bool = False,
+    n_workers: t.Optional[int] = None,
+    max_n_blocks: int = 64,
+) -> t.Optional[DecomposedResult]:
+    """
+    Решает независимые блоки задачи (компоненты связности графа
+    "переменные -- ограничения") параллельно в пуле процессов
+
+    Ограничение времени распределяется между блоками пропорционально
+    их размеру с учетом числа процессов; блок, запущенный позже, получает
+    не больше времени, чем осталось до общего ограничения. Возвращает
+    None, если задача не распадается на независимые блоки
+    """
+    blocks = split_into_blocks(problem, max_n_blocks=max_n_blocks, logger=logger)
+    if not blocks:
+        return None
+
+    start = time.perf_counter()
+    time_limit: float = scip_params.get(SCIPAttributes.LIMITS_TIME, _SCIP_INFINITY)
+    # Часы time.time() общие для дочерних процессов пула
+    deadline: t.Optional[float] = (
+        time.time() + time_limit if time_limit < _SCIP_INFINITY else None
+    )
+    # Решатель SCIP однопоточный, поэтому один блок -- одно ядро
+    n_workers = min(n_workers or os.cpu_count() or 1, len(blocks))
+    path_to_work_dir = Path(path_to_work_dir)
+    path_to_work_dir.mkdir(parents=True, exist_ok=True)
+
+    x_warm_start: t.Optional[np.ndarray] = None
+    if use_warm_start:
+        try:
+            x_warm_start, _ = sol_to_vector(
+                problem, read_sol_file(path_to_warm_start_file)
+            )
+        except OSError as err:
+            logger.error(f"{err}")
+            sys.exit(-1)
+
+    block_sizes = np.array(
+        [var_ids.size + problem.matrix[cons_ids].nnz for var_ids, cons_ids in blocks],
+        dtype=np.float64,
+    )
+    time_budgets = np.minimum(
+        time_limit, time_limit * n_workers * block_sizes / block_sizes.sum()
+    )
+
+    block_jobs: t.List[t.Tuple[PosixPath, dict, t.Optional[PosixPath]]] = []
+    for block_id, (var_ids, cons_ids) in enumerate(blocks):
+        path_to_block_file = path_to_work_dir.joinpath(f"block_{block_id:04d}.lp")
+        subproblem = problem.subproblem(var_ids, cons_ids)
+        subproblem.write_lp_file(path_to_block_file)
+
+        path_to_block_warm_start_file: t.Optional[PosixPath] = None
+        if x_warm_start is not None:
+            path_to_block_warm_start_file = path_to_block_file.with_suffix(".ws.sol")
+            write_sol_file(
+                path_to_block_warm_start_file,
+                names=subproblem.var_names,
+                values=x_warm_start[var_ids],
+                objs=subproblem.obj,
+            )
+
+        block_params = dict(scip_params)
+        if time_limit < _SCIP_INFINITY:
+            block_params[SCIPAttributes.LIMITS_TIME] = float(time_budgets[block_id])
+        block_jobs.append(
+            (path_to_block_file, block_params, path_to_block_warm_start_file)
+        )
+
+    logger.info(
+        f"{len(blocks)} blocks have been written to `{path_to_work_dir}`, "
+        f"solving on {n_workers} workers ..."
+    )
+    block_results: t.List[BlockResult] = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(_solve_block, *job, logger, deadline) for job in block_jobs
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            block_result: BlockResult = future.result()
+            block_results.append(block_result)
+            logger.info(
+                f"Block `{block_result.name}` [{block_result.status}]: "
+                f"primal bound {block_result.primal_bound:.8g}, "
+                f"dual bound {block_result.dual_bound:.8g}, "
+                f"time {block_result.solving_time:.2f} s "
+                f"({len(block_results)}/{len(blocks)})"
+            )
+
+    block_results.sort(key=lambda block_result: block_result.name)
+
+    return merge_block_results(
+        problem, block_results, solving_time=time.perf_counter() - start
+    )
@@ -85,11 +85,208 @@ class ServiceAttributes:
     _NUM_COLS_NEIGHBORHOODS = 18
 
 
+# Шаблоны компилируются один раз при импорте модуля
+_FLOAT_NUMBER_PATTERN = re.compile(r"^(\d+[.]\d+)\s\(.*$")
+_SIMPLE_INT_FLOAT_NUMBER_PATTERN = re.compile(r"^(\d+([.]\d+)?)$")
+_INT_NUMBER_WO_PLUS_PATTERN = re.compile(r"^(\d+)\+$")
+_VARS_STATS_PATTERN = re.compile(
+    r"^(\d+)\s\((\d+)\sbinary,\s(\d+)\sinteger,"
+    r"\s(\d+)\simplicit integer,\s(\d+)\scontinuous\)$"
+)
+_CONSS_STATS_PATTERN = re.compile(r"^(\d+)\sinitial")
+_SUB_STRING_IN_BRACKETS_PATTERN = re.compile(r"(\s+\(.*\))$")
+_NODES_PATTERN = re.compile(r"^(\d+) \((\d+) internal, (\d+) leaves\)")
+_REPROPAGATIONS_PATTERN = re.compile(
+    r"^(\d+) \((\d+) domain reductions, (\d+) cutoffs\)"
+)
+_ESTIMATION_TREE_PATTERN = re.compile(
+    r"^(\d+) nodes \((\d+) visited, " r"(\d+) internal, (\d+) leaves, (\d+) open"
+)
+_SOL_SOLS_FOUND_PATTERN = re.compile(
+    r"^([+-]?\d[.]\d+e\+\d+)\s+.*\(in run (\d+), after (\d+) nodes, "
+    r"(\d+[.]\d+) seconds, depth (\d+), found by <(\w+)>\)"
+)
+_GAP_PATTERN = re.compile(r"^(\d+[.]\d+)\s\%")
+
+_NUM_COLS_OF_TABLES = frozenset(
+    (
+        ServiceAttributes._NUM_COLS_PRESOLVERS,
+        ServiceAttributes._NUM_COLS_CONSTRAINTS,
+        ServiceAttributes._NUM_COLS_CONSTRAINTS_TIMINGS,
+        ServiceAttributes._NUM_COLS_PROPAGATORS,
+        ServiceAttributes._NUM_COLS_PROPAGATORS_TIMINGS,
+        ServiceAttributes._NUM_COLS_CONFLICT_ANALYSIS,
+        ServiceAttributes._NUM_COLS_SEPARATORS,
+        ServiceAttributes._NUM_COLS_PRIMAL_HEURISTICS,
+        ServiceAttributes._NUM_COLS_DIVING_SINGLE,
+        ServiceAttributes._NUM_COLS_DIVING_ADAPTIVE,
+        ServiceAttributes._NUM_COLS_NEIGHBORHOODS,
+    )
+)
+
+# Секции stat-файла, строки которых являются строками таблиц
+_TABLE_SECTIONS = frozenset(
+    (
+        "Presolvers",
+        "Constraints",
+        "Constraint_Timings",
+        "Propagators",
+        "Propagator_Timings",
+        "Conflict_Analysis",
+        "Separators",
+        "Cutselectors",
+        "Pricers",
+        "Branching_Rules",
+        "Primal_Heuristics",
+        "Diving_(single)",
+        "Diving_(adaptive)",
+        "Neighborhoods",
+        "LP",
+        "Estimations",
+        "Integrals",
+    )
+)
+
+_LP_APPEND_KEYS = frozenset(
+    (
+        ServiceAttributes._LP_PRIMAL_LP,
+        ServiceAttributes._LP_DUAL_LP,
+        ServiceAttributes._LP_BARRIER_LP,
+    )
+)
+_ESTIMATIONS_APPEND_INSERT_KEYS = frozenset(
+    (
+        ServiceAttributes._ESTIMATIONS_GAP,
+        ServiceAttributes._ESTIMATIONS_TREE_WEIGHT,
+        ServiceAttributes._ESTIMATIONS_LEAF_FREQUENCY,
+        ServiceAttributes._ESTIMATIONS_SSG,
+        ServiceAttributes._ESTIMATIONS_OPEN_NODES,
+    )
+)
+# Строки этих подзаголовков LP разбираются без изменений (в отличие
+# от остальных подзаголовков, без удаления пробелов по краям)
+_LP_AS_IS_KEYS = frozenset(
+    (
+        ServiceAttributes._LP_LEX_DUAL_LP,
+        ServiceAttributes._LP_RESOLVE_INSTABLE,
+        ServiceAttributes._LP_DIVING_PROBING_LP,
+        ServiceAttributes._LP_AT_ROOT_NODE,
+        ServiceAttributes._LP_CONFLICT_ANALYSIS,
+    )
+)
+
+
+def _convert_table_row(value: str) -> t.Union[t.List[str], t.Any]:
+    """
+    Разбивает строку таблицы на значения столбцов
+    (с удалением символа '+' после целых чисел)
+    """
+    elems: t.List[str] = value.split()
+    # Строки, которые могли бы подойти под шаблоны нетабличных значений
+    # (второй элемент вида '(...', '%', 'initial', 'nodes'),
+    # разбираются общим порядком проверок
+    if (len(elems) not in _NUM_COLS_OF_TABLES) or (
+        elems[1][0] in "(%" or elems[1] in ("initial", "nodes")
+    ):
+        return _convert_scalar(value)
+
+    row: t.List[str] = []
+    for elem in elems:
+        if elem.endswith("+"):
+            int_number_wo_plus = _INT_NUMBER_WO_PLUS_PATTERN.match(elem)
+            if int_number_wo_plus:
+                elem = int_number_wo_plus.group(1)
+        row.append(elem)
+
+    return row
+
+
+def _convert_scalar(value: str) -> t.Any:
+    """
+    Преобразует значение нетабличной секции
+    """
+    # The order of placement of conditions is important!!!
+    match = _FLOAT_NUMBER_PATTERN.match(value)
+    if match:
+        return float(match.group(1))
+
+    match = _SIMPLE_INT_FLOAT_NUMBER_PATTERN.match(value)
+    if match:
+        return float(match.group(1))
+
+    match = _VARS_STATS_PATTERN.match(value)
+    if match:
+        vars_, bins, ints, impl_ints, conts = match.groups()
+        return {
+            "vars": int(vars_),
+            "bins": int(bins),
+            "ints": int(ints),
+            "impl_ints": int(impl_ints),
+            "conts": int(conts),
+        }
+
+    match = _NODES_PATTERN.match(value)
+    if match:
+        nodes, internal, leaves = match.groups()
+        return {
+            "nodes": int(nodes),
+            "internal": int(internal),
+            "leaves": int(leaves),
+        }
+
+    match = _REPROPAGATIONS_PATTERN.match(value)
+    if match:
+        repropagations, domain_reductions, cutoffs = match.groups()
+        return {
+            "repropagations": int(repropagations),
+            "domain_reductions": int(domain_reductions),
+            "cutoffs": cutoffs,
+        }
+
+    match = _ESTIMATION_TREE_PATTERN.match(value)
+    if match:
+        et_nodes, et_visited, et_internal, et_leaves, et_open = match.groups()
+        return {
+            "et_nodes": int(et_nodes),
+            "et_visited": int(et_visited),
+            "et_leaves": int(et_leaves),
+            "et_open": int(et_open),
+        }
+
+    match = _SOL_SOLS_FOUND_PATTERN.match(value)
+    if match:
+        first_sol, run, after_nodes, seconds, depth, found_by_heur = match.groups()
+        return {
+            "first_sol": float(first_sol),
+            "run": int(run),
+            "after_nodes": int(after_nodes),
+            "seconds": float(seconds),
+            "depth": int(depth),
+            "found_by_heur": found_by_heur,
+        }
+
+    match = _CONSS_STATS_PATTERN.match(value)
+    if match:
+        return int(match.group(1))
+
+    match = _GAP_PATTERN.match(value)
+    if match:
+        return float(match.group(1))
+
+    if len(value.split()) in _NUM_COLS_OF_TABLES:
+        return _convert_table_row(value)
+
+    return value
+
+
 class StatFileParser:
     """
     Парсит stat-файл, подготовленный решателем SCIP
     ...
     SCIP> write stats file_name.stat
+
+    Файл читается за один проход: текущая секция хранится в переменной,
+    а способ преобразования значения выбирается по имени секции
     """
 
     def __init__(
@@ -102,184 +299,75 @@ class StatFileParser:
         self.main_delimiter = main_delimiter
         self._structure_of_doc = collections.OrderedDict()
 
+        structure_of_doc = self._structure_of_doc
+        # Секция, к которой относятся строки-подзаголовки
+        # (секция последнего добавленного в структуру ключа)
+        current_section: t.Optional[str] = None
+
         with open(self.path_to_stat_file, encoding="utf-8") as stat_file:
             for line in stat_file:
                 # Headers
                 if not line.startswith(ServiceAttributes._TWO_BLANK):
-                    header, right_part_of_separtor = line.split(
-                        self.main_delimiter, maxsplit=1
-                    )
+                    header, value = line.split(self.main_delimiter, maxsplit=1)
                     header = header.strip().replace(ServiceAttributes._ONE_BLANK, "_")
 
                     if header == ServiceAttributes._CONFLICT_ANALYSIS:
-                        right_part_of_separtor = self._regex_delete_sub_string(
-                            value=right_part_of_separtor,
+                        value = self._regex_delete_sub_string(
+                            value=value,
                             sub_string_for_del=ServiceAttributes._SUB_STRING_FOR_DEL_CONFLICT_ANALYSIS,
-                        )
-                        right_part_of_separtor = right_part_of_separtor.replace(
+                        ).replace(
                             ServiceAttributes._LP_ITER_WITH_WHITESPACE,
                             ServiceAttributes._LP_ITER_WO_WHITESPACE,
                         )
-                        self._structure_of_doc[header] = right_part_of_separtor
                     elif header == ServiceAttributes._DIVING_SINGLE:
-                        right_part_of_separtor = right_part_of_separtor.replace(
+                        value = value.replace(
                             ServiceAttributes._LP_ITER_WITH_WHITESPACE,
                             ServiceAttributes._LP_ITER_WO_WHITESPACE,
-                        )
-                        self._structure_of_doc[header] = right_part_of_separtor.strip()
+                        ).strip()
                     elif header == ServiceAttributes._DIVING_ADAPTIVE:
-                        self._structure_of_doc[header] = right_part_of_separtor.replace(
+                        value = value.replace(
                             ServiceAttributes._LP_ITER_WITH_WHITESPACE,
                             ServiceAttributes._LP_ITER_WO_WHITESPACE,
                         )
                     else:
-                        self._structure_of_doc[header] = right_part_of_separtor.strip()
+                        value = value.strip()
+
+                    key = header
+                    section = header
                 # Subheaders
                 else:
                     sub_header, value = line.strip().split(
                         self.main_delimiter, maxsplit=1
                     )
-                    header = list(self._structure_of_doc.keys())[-1].split(
-                        ".", maxsplit=1
-                    )[0]
                     sub_header = sub_header.strip().replace(
                         ServiceAttributes._ONE_BLANK, "_"
                     )
-                    key = f"{header}.{sub_header}"
-
-                    if key in (
-                        ServiceAttributes._LP_PRIMAL_LP,
-                        ServiceAttributes._LP_DUAL_LP,
-                        ServiceAttributes._LP_BARRIER_LP,
-                    ):
-                        self._append_value(key, value)
-                    elif key in (
-                        ServiceAttributes._ESTIMATIONS_GAP,
-                        ServiceAttributes._ESTIMATIONS_TREE_WEIGHT,
-                        ServiceAttributes._ESTIMATIONS_LEAF_FREQUENCY,
-                        ServiceAttributes._ESTIMATIONS_SSG,
-                        ServiceAttributes._ESTIMATIONS_OPEN_NODES,
-                    ):
-                        self._append_insert_value(key, value)
-                    elif key in (
-                        ServiceAttributes._LP_LEX_DUAL_LP,
-                        ServiceAttributes._LP_RESOLVE_INSTABLE,
-                        ServiceAttributes._LP_DIVING_PROBING_LP,
-                        ServiceAttributes._LP_AT_ROOT_NODE,
-                        ServiceAttributes._LP_CONFLICT_ANALYSIS,
-                    ):
-                        self._extend_value(key, value)
+                    section = current_section
+                    key = f"{section}.{sub_header}"
+
+                    if key in _LP_APPEND_KEYS:
+                        value = self._append_value(value)
+                    elif key in _ESTIMATIONS_APPEND_INSERT_KEYS:
+                        value = self._append_insert_value(value)
+                    elif key in _LP_AS_IS_KEYS:
+                        pass
                     elif key == ServiceAttributes._SEPARATORS_CUT_POOL:
                         values: t.List[str] = self._regex_delete_sub_string(
                             value=value,
                             sub_string_for_del=ServiceAttributes._SUB_STRING_FOR_DEL_SEPARATORS_CUT_POOL,
                         ).split()
                         values.insert(1, "-")
-                        self._structure_of_doc[key] = (
-                            ServiceAttributes._ONE_BLANK
-                        ).join(values)
+                        value = (ServiceAttributes._ONE_BLANK).join(values)
                     else:
-                        self._structure_of_doc[key] = value.strip()
-
-        for key, value in self._structure_of_doc.items():
-            # The order of placement of conditions is important!!!
-            if self._regex_extract_float_number(value):
-                self._structure_of_doc[key] = float(
-                    self._regex_extract_float_number(value)[0]
-                )
-            elif self._regex_extract_simple_int_float_number(value):
-                self._structure_of_doc[key] = float(
-                    self._regex_extract_simple_int_float_number(value)[0][0]
-                )
-            elif self._regex_extract_vars_stats(value):
-                (vars_, bins, ints, impl_ints, conts) = self._regex_extract_vars_stats(
-                    value
-                )[0]
-                self._structure_of_doc[key] = {
-                    "vars": int(vars_),
-                    "bins": int(bins),
-                    "ints": int(ints),
-                    "impl_ints": int(impl_ints),
-                    "conts": int(conts),
-                }
-            elif self._regex_extract_nodes(value):
-                (nodes, internal, leaves) = self._regex_extract_nodes(value)[0]
-                self._structure_of_doc[key] = {
-                    "nodes": int(nodes),
-                    "internal": int(internal),
-                    "leaves": int(leaves),
-                }
-            elif self._regex_extract_repropagations(value):
-                (
-                    repropagations,
-                    domain_reductions,
-                    cutoffs,
-                ) = self._regex_extract_repropagations(value)[0]
-                self._structure_of_doc[key] = {
-                    "repropagations": int(repropagations),
-                    "domain_reductions": int(domain_reductions),
-                    "cutoffs": cutoffs,
-                }
-            elif self._regex_extract_estimation_tree(value):
-                (
-                    et_nodes,
-                    et_visited,
-                    et_internal,
-                    et_leaves,
-                    et_open,
-                ) = self._regex_extract_estimation_tree(value)[0]
-                self._structure_of_doc[key] = {
-                    "et_nodes": int(et_nodes),
-                    "et_visited": int(et_visited),
-                    "et_leaves": int(et_leaves),
-                    "et_open": int(et_open),
-                }
-            elif self._regex_extract_sol_sols_found(value):
-                (
-                    first_sol,
-                    run,
-                    after_nodes,
-                    seconds,
-                    depth,
-                    found_by_heur,
-                ) = self._regex_extract_sol_sols_found(value)[0]
-                self._structure_of_doc[key] = {
-                    "first_sol": float(first_sol),
-                    "run": int(run),
-                    "after_nodes": int(after_nodes),
-                    "seconds": float(seconds),
-                    "depth": int(depth),
-                    "found_by_heur": found_by_heur,
-                }
-            elif self._regex_extract_conss_stats(value):
-                self._structure_of_doc[key] = int(
-                    self._regex_extract_conss_stats(value)[0]
-                )
-            elif self._regex_extract_gap(value):
-                self._structure_of_doc[key] = float(self._regex_extract_gap(value)[0])
-            elif len(value.split()) in (
-                ServiceAttributes._NUM_COLS_PRESOLVERS,
-                ServiceAttributes._NUM_COLS_CONSTRAINTS,
-                ServiceAttributes._NUM_COLS_CONSTRAINTS_TIMINGS,
-                ServiceAttributes._NUM_COLS_PROPAGATORS,
-                ServiceAttributes._NUM_COLS_PROPAGATORS_TIMINGS,
-                ServiceAttributes._NUM_COLS_CONFLICT_ANALYSIS,
-                ServiceAttributes._NUM_COLS_SEPARATORS,
-                ServiceAttributes._NUM_COLS_PRIMAL_HEURISTICS,
-                ServiceAttributes._NUM_COLS_DIVING_SINGLE,
-                ServiceAttributes._NUM_COLS_DIVING_ADAPTIVE,
-                ServiceAttributes._NUM_COLS_NEIGHBORHOODS,
-            ):
-                self._structure_of_doc[key] = [
-                    (
-                        self._regex_extract_int_number_wo_plus(elem)[0]
-                        if self._regex_extract_int_number_wo_plus(elem)
-                        else elem
-                    )
-                    for elem in value.split()
-                ]
-            else:
-                continue
+                        value = value.strip()
+
+                if key not in structure_of_doc:
+                    current_section = key.split(".", maxsplit=1)[0]
+
+                if section in _TABLE_SECTIONS:
+                    structure_of_doc[key] = _convert_table_row(value)
+                else:
+                    structure_of_doc[key] = _convert_scalar(value)
 
     @property
     def get_keys(self) -> t.List[str]:
@@ -328,20 +416,20 @@ class StatFileParser:
         Извлекает вещественное число
         из строки с 'мусорным' хвостом
         """
-        return re.compile(r"^(\d+[.]\d+)\s\(.*$").findall(value)
+        return _FLOAT_NUMBER_PATTERN.findall(value)
 
     def _regex_extract_simple_int_float_number(self, value: str) -> list:
         """
         Извлекает целое или вещественное число
         """
-        return re.compile(r"^(\d+([.]\d+)?)$").findall(value)
+        return _SIMPLE_INT_FLOAT_NUMBER_PATTERN.findall(value)
 
     def _regex_extract_int_number_wo_plus(self, value: str) -> list:
         """
         Извлекает из 'числовой' строки целое число
         без следующего за ним символа '+'
         """
-        return re.compile(r"^(\d+)\+$").findall(value)
+        return _INT_NUMBER_WO_PLUS_PATTERN.findall(value)
 
     def _regex_extract_vars_stats(self, value: str) -> list:
         """
@@ -352,17 +440,14 @@ class StatFileParser:
         - количество неявно целочисленных переменных,
         - количество вещественных переменных
         """
-        return re.compile(
-            r"^(\d+)\s\((\d+)\sbinary,\s(\d+)\sinteger,"
-            r"\s(\d+)\simplicit integer,\s(\d+)\scontinuous\)$"
-        ).findall(value)
+        return _VARS_STATS_PATTERN.findall(value)
 
     def _regex_extract_conss_stats(self, value: str) -> list:
         """
         Извлекает количество ограничений
         из переданной строки
         """
-        return re.compile(r"^(\d+)\sinitial").findall(value)
+        return _CONSS_STATS_PATTERN.findall(value)
 
     def _regex_delete_sub_string(
         self, value: str, sub_string_for_del: str, *, how_to_replace: str = ""
@@ -370,7 +455,7 @@ class StatFileParser:
         """
         Удалаяет заданную подстроку из целевой стоки
         """
-        sub_string = re.compile(r"(\s+\(.*\))$").findall(value)[0]
+        sub_string = _SUB_STRING_IN_BRACKETS_PATTERN.findall(value)[0]
 
         return value.replace(sub_string, how_to_replace)
 
@@ -378,39 +463,32 @@ class StatFileParser:
         """
         Извлекает число узлов
         """
-        return re.compile(r"^(\d+) \((\d+) internal, (\d+) leaves\)").findall(value)
+        return _NODES_PATTERN.findall(value)
 
     def _regex_extract_repropagations(self, value: str) -> t.List[t.Tuple]:
         """
         Извлекает число повторных
         распространений по дереву ветвей-и-границ
         """
-        return re.compile(r"^(\d+) \((\d+) domain reductions, (\d+) cutoffs\)").findall(
-            value
-        )
+        return _REPROPAGATIONS_PATTERN.findall(value)
 
     def _regex_extract_estimation_tree(self, value: str) -> t.List[t.Tuple]:
         """
         Извлекает оценку дерева ветвей-и-границ
         """
-        return re.compile(
-            r"^(\d+) nodes \((\d+) visited, " r"(\d+) internal, (\d+) leaves, (\d+) open"
-        ).findall(value)
+        return _ESTIMATION_TREE_PATTERN.findall(value)
 
     def _regex_extract_sol_sols_found(self, value: str) -> t.List[t.Tuple]:
         """
         Извлекает информацию по найденным решениям
         """
-        return re.compile(
-            r"^([+-]?\d[.]\d+e\+\d+)\s+.*\(in run (\d+), after (\d+) nodes, "
-            r"(\d+[.]\d+) seconds, depth (\d+), found by <(\w+)>\)"
-        ).findall(value)
+        return _SOL_SOLS_FOUND_PATTERN.findall(value)
 
     def _regex_extract_gap(self, value: str) -> t.List[t.Tuple]:
         """
         Извлекает велечину найденного зазора
         """
-        return re.compile(r"^(\d+[.]\d+)\s\%").findall(value)
+        return _GAP_PATTERN.findall(value)
 
     def get_param(self, param_name: str) -> t.Any:
         """
@@ -418,25 +496,18 @@ class StatFileParser:
         """
         return self._structure_of_doc.get(param_name, "-")
 
-    def _append_value(self, key, value) -> t.NoReturn:
+    @staticmethod
+    def _append_value(value: str) -> str:
         """
         Добавляет символ "-" к строке
-        и создает пару в словаре структуры stat-файла
         """
         values: t.List = value.split()
         values.append("-")
-        self._structure_of_doc[key] = (ServiceAttributes._ONE_BLANK).join(values)
 
-    def _extend_value(self, key, value, times: int = 3) -> t.NoReturn:
-        """
-        Добавляет несколько символов "-" к строке
-        и создает пару в словаре структуры stat-файла
-        """
-        values: t.List = value.split()
-        values.extend(["-"] * times)
-        self._structure_of_doc[key] = value
+        return (ServiceAttributes._ONE_BLANK).join(values)
 
-    def _append_insert_value(self, key, value, pos: int = 2) -> t.NoReturn:
+    @staticmethod
+    def _append_insert_value(value: str, pos: int = 2) -> str:
         """
         Добавляет символ "-" в конец строки и
         вставляет символ "-" в заданную позицию
@@ -444,7 +515,8 @@ class StatFileParser:
         values: t.List = value.split()
         values.append("-")
         values.insert(pos, "-")
-        self._structure_of_doc[key] = (ServiceAttributes._ONE_BLANK).join(values)
+
+        return (ServiceAttributes._ONE_BLANK).join(values)
 
 
 def SCIP_elems_activity_plot(
@@ -0,0 +1,1019 @@
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import typing as t
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pathlib2
+import pyscipopt
+import scipy.sparse as sp
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.auxiliary_functions import get_file_hash
+from scip_ecole_model.variable_index import VariableIndex
+
+_META_FILENAME = "meta.json"
+_TMP_FILE_PREFIX = ".tmp_"
+# Массивы задачи, записываемые в отдельные npy-файлы
+_ARRAY_NAMES = (
+    "var_names",
+    "cons_names",
+    "lhs",
+    "rhs",
+    "obj",
+    "lbs",
+    "ubs",
+    "vtypes",
+    "matrix_data",
+    "matrix_indices",
+    "matrix_indptr",
+)
+
+# Секции mps-файла, которые разбирает _read_mps_file
+_MPS_SECTIONS = ("NAME", "OBJSENSE", "ROWS", "COLUMNS", "RHS", "RANGES", "BOUNDS")
+_MPS_MARKER = "'MARKER'"
+_MPS_INTORG = "'INTORG'"
+# Начало строки без отступа (заголовка секции) и строка комментария
+_MPS_HEADER_PATTERN = re.compile(r"\n(?=[^\s*])")
+_MPS_COMMENT_PATTERN = re.compile(r"\n\*[^\n]*")
+
+# Бесконечность в lp-файлах (значения не меньше считаются бесконечными, как в SCIP)
+_LP_INFINITY = 1e20
+# Заголовки секций lp-файла (формат CPLEX LP) и их виды
+_LP_SECTION_PATTERN = re.compile(
+    r"^[ \t]*(maximi[sz]e|maximum|max|minimi[sz]e|minimum|min|subject[ \t]+to|"
+    r"such[ \t]+that|st|s\.t\.|bounds?|generals?|gen|integers?|binar(?:y|ies)|bin|"
+    r"semi-continuous|semis?|sos|end)[ \t]*$",
+    flags=re.MULTILINE,
+)
+_LP_SECTION_KINDS = (
+    ("max", "maximize"),
+    ("min", "minimize"),
+    ("su", "constraints"),
+    ("st", "constraints"),
+    ("s.t.", "constraints"),
+    ("bound", "bounds"),
+    ("gen", "generals"),
+    ("integer", "generals"),
+    ("bin", "binaries"),
+    ("end", "end"),
+)
+_LP_COMMENT_PATTERN = re.compile(r"\\[^\n]*")
+_LP_SENSE_PATTERN = re.compile(r"(<=|>=|=<|=>|<|>|=)")
+# Знак, не являющийся частью показателя степени (1e+5)
+_LP_SIGN_PATTERN = re.compile(r"(?<![0-9.][eE])([+-])")
+# Коэффициент, записанный слитно с переменной (3x)
+_LP_GLUED_COEF_PATTERN = re.compile(
+    r"(?<![\w.])((?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(?=[A-Za-z_])(?![eE][+-]?\d)"
+)
+# Оператор, записанный слитно с последующим (в перевернутом тексте --
+# с предыдущим) операндом; в файлах, записанных решателем, не встречается
+_LP_GLUED_OPERATOR_PATTERN = re.compile(r"[<>=+-][^\s<>=\d.]")
+_LP_REVERSED_GLUED_OPERATOR_PATTERN = re.compile(r"[<>=+-][^\s<>=+-]")
+# Операторы lp-файла; по позиции в кортеже определяется вид лексемы
+_LP_OPERATORS = (":", "+", "-", "<=", "=<", "<", ">=", "=>", ">", "=")
+_LP_INFINITY_TOKENS = ("inf", "Inf", "INF", "infinity", "Infinity", "INFINITY")
+_LP_RELATIONS = {
+    "<=": "<",
+    "=<": "<",
+    "<": "<",
+    ">=": ">",
+    "=>": ">",
+    ">": ">",
+    "=": "=",
+}
+_LP_TOKEN_VAR, _LP_TOKEN_NUMBER, _LP_TOKEN_SIGN, _LP_TOKEN_SENSE, _LP_TOKEN_NAME = range(
+    5
+)
+
+
+@dataclass
+class ProblemArrays:
+    """
+    Класс задачи в виде массивов: матрица ограничений A (CSR, строки --
+    ограничения), границы строк lhs <= Ax <= rhs, целевая функция,
+    границы и типы переменных
+    """
+
+    var_names: np.ndarray
+    cons_names: np.ndarray
+    matrix: sp.csr_matrix
+    lhs: np.ndarray
+    rhs: np.ndarray
+    obj: np.ndarray
+    lbs: np.ndarray
+    ubs: np.ndarray
+    vtypes: np.ndarray
+    obj_sense: str = "minimize"
+    obj_offset: float = 0.0
+
+    @property
+    def n_vars(self) -> int:
+        return self.var_names.size
+
+    @property
+    def n_conss(self) -> int:
+        return self.cons_names.size
+
+    def get_csc_matrix(self) -> sp.csc_matrix:
+        """
+        Возвращает матрицу ограничений в формате CSC (доступ по столбцам)
+        """
+        return self.matrix.tocsc()
+
+    @classmethod
+    def from_model(
+        cls, model: pyscipopt.scip.Model, logger: logging.Logger
+    ) -> "ProblemArrays":
+        """
+        Строит массивы обходом линейных ограничений прочитанной
+        (непреобразованной) модели; нелинейные ограничения пропускаются
+
+        Обход выполняется из Python и для больших задач медленный,
+        поэтому файлы задач следует разбирать через `from_problem_file`
+        """
+        var_index = VariableIndex.from_model(model)
+        infinity: float = model.infinity()
+
+        cons_names: t.List[str] = []
+        lhs: t.List[float] = []
+        rhs: t.List[float] = []
+        row_nnz: t.List[int] = []
+        col_names: t.List[str] = []
+        values: t.List[float] = []
+        n_skipped = 0
+        for cons in model.getConss():
+            if not cons.isLinear():
+                n_skipped += 1
+                continue
+            coefs: t.Dict[str, float] = model.getValsLinear(cons)
+            cons_names.append(cons.name)
+            lhs.append(model.getLhs(cons))
+            rhs.append(model.getRhs(cons))
+            row_nnz.append(len(coefs))
+            col_names.extend(coefs.keys())
+            values.extend(coefs.values())
+
+        if n_skipped > 0:
+            logger.warning(f"{n_skipped} nonlinear constraints have been skipped")
+
+        indptr = np.zeros(len(row_nnz) + 1, dtype=np.int64)
+        np.cumsum(row_nnz, out=indptr[1:])
+        matrix = sp.csr_matrix(
+            (
+                np.array(values, dtype=np.float64),
+                var_index.positions_of(col_names),
+                indptr,
+            ),
+            shape=(len(cons_names), len(var_index)),
+        )
+
+        return cls(
+            var_names=var_index.names.astype(str),
+            cons_names=np.array(cons_names, dtype=str),
+            matrix=matrix,
+            lhs=_to_inf(np.array(lhs, dtype=np.float64), infinity),
+            rhs=_to_inf(np.array(rhs, dtype=np.float64), infinity),
+            obj=var_index.objs,
+            lbs=_to_inf(var_index.lbs, infinity),
+            ubs=_to_inf(var_index.ubs, infinity),
+            vtypes=var_index.vtypes.astype(str),
+            obj_sense=model.getObjectiveSense(),
+            obj_offset=model.getObjoffset(),
+        )
+
+    @classmethod
+    def from_problem_file(
+        cls, path_to_problem_file: t.Union[str, pathlib2.Path], logger: logging.Logger
+    ) -> "ProblemArrays":
+        """
+        Строит массивы по файлу задачи: lp- и mps-файлы разбираются
+        напрямую векторными операциями, без чтения решателем; файлы других
+        форматов и не поддерживаемые конструкции (SOS, квадратичные
+        члены, ...) читаются решателем и обходятся через `from_model`
+        """
+        path_to_problem_file = Path(path_to_problem_file)
+        readers = {".lp": _read_lp_file, ".mps": _read_mps_file}
+        reader = readers.get(path_to_problem_file.suffix)
+        if reader is not None:
+            try:
+                return reader(path_to_problem_file)
+            except ValueError as err:
+                logger.warning(
+                    f"`{path_to_problem_file.name}` cannot be parsed directly ({err}), "
+                    f"the problem is read by the solver"
+                )
+
+        model = pyscipopt.Model()
+        model.hideOutput()
+        model.readProblem(str(path_to_problem_file))
+
+        return cls.from_model(model, logger)
+
+    def save(self, path_to_arrays_dir: t.Union[str, pathlib2.Path]) -> t.NoReturn:
+        """
+        Записывает массивы задачи в директорию npy-файлов
+        (запись атомарна: сначала во временную директорию)
+        """
+        path_to_arrays_dir = Path(path_to_arrays_dir)
+        path_to_arrays_dir.parent.mkdir(parents=True, exist_ok=True)
+        path_to_tmp_dir = path_to_arrays_dir.with_name(
+            f"{_TMP_FILE_PREFIX}{os.getpid()}_{path_to_arrays_dir.name}"
+        )
+        path_to_tmp_dir.mkdir()
+
+        # Индексы и указатели строк CSR хранятся в одном типе,
+        # чтобы при чтении матрица собиралась без копирования
+        index_dtype = np.int32 if self.matrix.nnz < np.iinfo(np.int32).max else np.int64
+        arrays = {
+            "var_names": self.var_names.astype(str),
+            "cons_names": self.cons_names.astype(str),
+            "lhs": self.lhs,
+            "rhs": self.rhs,
+            "obj": self.obj,
+            "lbs": self.lbs,
+            "ubs": self.ubs,
+            "vtypes": self.vtypes.astype(str),
+            "matrix_data": self.matrix.data,
+            "matrix_indices": self.matrix.indices.astype(index_dtype),
+            "matrix_indptr": self.matrix.indptr.astype(index_dtype),
+        }
+        for array_name, array in arrays.items():
+            np.save(str(path_to_tmp_dir.joinpath(f"{array_name}.npy")), array)
+        with open(path_to_tmp_dir.joinpath(_META_FILENAME), "w", encoding="utf-8") as fo:
+            json.dump(
+                {
+                    "n_vars": self.n_vars,
+                    "n_conss": self.n_conss,
+                    "nnz": int(self.matrix.nnz),
+                    "obj_sense": self.obj_sense,
+                    "obj_offset": self.obj_offset,
+                },
+                fo,
+                indent=2,
+            )
+
+        if path_to_arrays_dir.exists():
+            shutil.rmtree(path_to_arrays_dir)
+        os.replace(path_to_tmp_dir, path_to_arrays_dir)
+
+    @classmethod
+    def load(
+        cls, path_to_arrays_dir: t.Union[str, pathlib2.Path], mmap: bool = True
+    ) -> "ProblemArrays":
+        """
+        Читает массивы задачи; при `mmap=True` npy-файлы отображаются
+        в память, и данные подгружаются с диска только при обращении
+        """
+        path_to_arrays_dir = Path(path_to_arrays_dir)
+        with open(path_to_arrays_dir.joinpath(_META_FILENAME), encoding="utf-8") as fo:
+            meta: dict = json.load(fo)
+
+        arrays = {
+            array_name: np.load(
+                str(path_to_arrays_dir.joinpath(f"{array_name}.npy")),
+                mmap_mode="r" if mmap else None,
+            )
+            for array_name in _ARRAY_NAMES
+        }
+        matrix = sp.csr_matrix(
+            (
+                arrays.pop("matrix_data"),
+                arrays.pop("matrix_indices"),
+                arrays.pop("matrix_indptr"),
+            ),
+            shape=(meta["n_conss"], meta["n_vars"]),
+            copy=False,
+        )
+
+        return cls(
+            matrix=matrix,
+            obj_sense=meta["obj_sense"],
+            obj_offset=meta["obj_offset"],
+            **arrays,
+        )
+
+    def subproblem(self, var_ids: np.ndarray, cons_ids: np.ndarray) -> "ProblemArrays":
+        """
+        Подзадача на заданных переменных и ограничениях (ограничения
+        не должны содержать других переменных); смещение целевой
+        функции в подзадачу не переносится
+        """
+        return ProblemArrays(
+            var_names=self.var_names[var_ids],
+            cons_names=self.cons_names[cons_ids],
+            matrix=self.matrix[cons_ids][:, var_ids],
+            lhs=self.lhs[cons_ids],
+            rhs=self.rhs[cons_ids],
+            obj=self.obj[var_ids],
+            lbs=self.lbs[var_ids],
+            ubs=self.ubs[var_ids],
+            vtypes=self.vtypes[var_ids],
+            obj_sense=self.obj_sense,
+        )
+
+    def write_lp_file(self, path_to_lp_file: t.Union[str, pathlib2.Path]) -> t.NoReturn:
+        """
+        Записывает задачу в lp-файл (формат CPLEX LP) векторными операциями:
+        двусторонние ограничения записываются парой строк `_lhs`/`_rhs`,
+        пустые ограничения не записываются
+        """
+        var_names = self.var_names.astype(object)
+        # Целевая функция содержит все переменные, чтобы каждая была объявлена
+        objective = "".join(_format_lp_terms(self.obj, var_names).tolist())
+        if self.obj_offset:
+            objective += _format_lp_terms(np.array([self.obj_offset]), [""])[0]
+
+        row_nnz = np.diff(self.matrix.indptr)
+        is_equality = self.lhs == self.rhs
+        finite_lhs = np.isfinite(self.lhs) & (row_nnz > 0) & ~is_equality
+        finite_rhs = np.isfinite(self.rhs) & (row_nnz > 0) & ~is_equality
+        is_ranged = finite_lhs & finite_rhs
+        eq_rows = np.flatnonzero(is_equality & (row_nnz > 0))
+        le_rows, ge_rows = np.flatnonzero(finite_rhs), np.flatnonzero(finite_lhs)
+
+        row_ids = np.concatenate([eq_rows, le_rows, ge_rows])
+        cons_names = self.cons_names.astype(object)[row_ids] + np.concatenate(
+            [
+                np.full(eq_rows.size, "", dtype=object),
+                np.where(is_ranged[le_rows], "_rhs", "").astype(object),
+                np.where(is_ranged[ge_rows], "_lhs", "").astype(object),
+            ]
+        )
+        tails = (
+            np.repeat(
+                np.array([" = ", " <= ", " >= "], dtype=object),
+                [eq_rows.size, le_rows.size, ge_rows.size],
+            )
+            + np.concatenate([self.rhs[eq_rows], self.rhs[le_rows], self.lhs[ge_rows]])
+            .astype(str)
+            .astype(object)
+            + "\n"
+        )
+        # Строки записываются в исходном порядке
+        order = np.argsort(row_ids, kind="stable")
+        row_ids, cons_names, tails = row_ids[order], cons_names[order], tails[order]
+
+        # Строка ограничения -- заголовок, члены и правая часть; куски всех
+        # строк раскладываются в один массив и склеиваются одним вызовом
+        rows_matrix: sp.csr_matrix = self.matrix[row_ids]
+        n_rows, nnz = row_ids.size, rows_matrix.nnz
+        row_offsets = 2 * np.arange(n_rows)
+        pieces = np.empty(nnz + 2 * n_rows, dtype=object)
+        pieces[rows_matrix.indptr[:-1] + row_offsets] = " " + cons_names + ":"
+        pieces[
+            np.arange(nnz) + np.repeat(row_offsets, np.diff(rows_matrix.indptr)) + 1
+        ] = _format_lp_terms(rows_matrix.data, var_names[rows_matrix.indices])
+        pieces[rows_matrix.indptr[1:] + row_offsets + 1] = tails
+
+        is_free = np.isneginf(self.lbs) & np.isposinf(self.ubs)
+        bounds = np.where(
+            is_free,
+            " " + var_names + " free\n",
+            " "
+            + self.lbs.astype(str).astype(object)
+            + " <= "
+            + var_names
+            + " <= "
+            + self.ubs.astype(str).astype(object)
+            + "\n",
+        )
+        is_binary = self.vtypes == "BINARY"
+        is_general = (self.vtypes == "INTEGER") | (self.vtypes == "IMPLINT")
+
+        with open(path_to_lp_file, mode="w", encoding="utf-8") as fo:
+            fo.write("Maximize\n" if self.obj_sense == "maximize" else "Minimize\n")
+            fo.write(f" obj:{objective}\nSubject To\n")
+            fo.write("".join(pieces.tolist()))
+            fo.write("Bounds\n")
+            fo.write("".join(bounds.tolist()))
+            fo.write("Binaries\n")
+            fo.write("".join((" " + var_names[is_binary] + "\n").tolist()))
+            fo.write("Generals\n")
+            fo.write("".join((" " + var_names[is_general] + "\n").tolist()))
+            fo.write("End\n")
+
+
+def load_problem_arrays(
+    path_to_problem_file: t.Union[str, pathlib2.Path],
+    *,
+    path_to_arrays_dir: t.Union[str, pathlib2.Path],
+    logger: logging.Logger,
+) -> ProblemArrays:
+    """
+    Возвращает массивы задачи из кэша npy-файлов (ключ -- хэш файла задачи);
+    при промахе массивы строятся по файлу задачи и записываются в кэш
+    """
+    path_to_problem_file = Path(path_to_problem_file)
+    path_to_cached_arrays = Path(path_to_arrays_dir).joinpath(
+        get_file_hash(path_to_problem_file)
+    )
+    if path_to_cached_arrays.joinpath(_META_FILENAME).exists():
+        return ProblemArrays.load(path_to_cached_arrays)
+
+    problem = ProblemArrays.from_problem_file(path_to_problem_file, logger)
+    problem.save(path_to_cached_arrays)
+    logger.info(
+        f"Arrays of `{path_to_problem_file.name}` have been written "
+        f"to `{path_to_cached_arrays}`"
+    )
+
+    return ProblemArrays.load(path_to_cached_arrays)
+
+
+def _format_lp_terms(coefs: np.ndarray, var_names: t.Sequence[str]) -> np.ndarray:
+    """
+    Члены линейного выражения lp-файла (" + 3.0 x", " - 1.5 y")
+    """
+    return (
+        np.where(coefs < 0.0, " - ", " + ").astype(object)
+        + np.abs(coefs).astype(str).astype(object)
+        + " "
+        + np.asarray(var_names, dtype=object)
+    )
+
+
+def _to_inf(values: np.ndarray, infinity: float) -> np.ndarray:
+    """
+    Заменяет бесконечность решателя SCIP (1e+20) на np.inf
+    """
+    values = values.copy()
+    values[values >= infinity] = np.inf
+    values[values <= -infinity] = -np.inf
+
+    return values
+
+
+def _read_whitespace_table(text: str, dtypes: t.Dict[int, t.Any]) -> pd.DataFrame:
+    """
+    Разбирает текст секции файла задачи как таблицу с разделителями-пробелами
+    (C-парсер pandas)
+    """
+    if not text.strip():
+        return pd.DataFrame(
+            {name: pd.Series(dtype=dtype) for name, dtype in dtypes.items()}
+        )
+
+    return pd.read_csv(
+        io.StringIO(text),
+        sep=r"\s+",
+        header=None,
+        names=list(dtypes),
+        dtype=dtypes,
+        engine="c",
+    )
+
+
+def _split_mps_sections(path_to_mps_file: PosixPath) -> t.Dict[str, str]:
+    """
+    Делит mps-файл на тексты секций (заголовок секции -- строка без отступа)
+    """
+    # Перевод строки в начале позволяет искать строки по шаблону,
+    # начинающемуся с "\n" (такой поиск быстрее многострочного режима)
+    with open(path_to_mps_file, encoding="utf-8") as fo:
+        text: str = "\n" + fo.read()
+    if "\n*" in text:
+        text = _MPS_COMMENT_PATTERN.sub("", text)
+
+    sections: t.Dict[str, str] = {}
+    header_starts = [header.end() for header in _MPS_HEADER_PATTERN.finditer(text)]
+    for header_start, next_header_start in zip(
+        header_starts, header_starts[1:] + [len(text)]
+    ):
+        header_end = text.find("\n", header_start, next_header_start)
+        if header_end < 0:
+            header_end = next_header_start
+        name, *rest = text[header_start:header_end].split(maxsplit=1)
+        if name == "ENDATA":
+            break
+        if name not in _MPS_SECTIONS:
+            raise ValueError(f"mps section `{name}` is not supported")
+        # Значение может быть записано в строке заголовка (OBJSENSE MAX)
+        sections[name] = (
+            sections.get(name, "") + "".join(rest) + text[header_end:next_header_start]
+        )
+
+    return sections
+
+
+def _read_mps_file(path_to_mps_file: PosixPath) -> ProblemArrays:
+    """
+    Разбирает mps-файл в массивы задачи (порядок переменных --
+    порядок их появления в секции COLUMNS)
+    """
+    sections = _split_mps_sections(path_to_mps_file)
+
+    obj_sense = "minimize"
+    if sections.get("OBJSENSE", "").split()[:1] in (["MAX"], ["MAXIMIZE"]):
+        obj_sense = "maximize"
+
+    # Строки: тип (N -- целевая функция, L, G, E) и имя
+    rows = _read_whitespace_table(sections["ROWS"], {0: object, 1: object})
+    is_obj_row = (rows[0] == "N").to_numpy()
+    obj_row_name: str = rows.loc[is_obj_row, 1].iloc[0]
+    cons_types = rows.loc[~is_obj_row, 0].to_numpy()
+    cons_names = rows.loc[~is_obj_row, 1].to_numpy()
+    cons_index = pd.Index(cons_names, dtype=object)
+    n_conss = cons_names.size
+
+    # Столбцы: маркеры задают диапазоны целочисленных переменных
+    columns = _read_whitespace_table(
+        sections.get("COLUMNS", ""),
+        {0: object, 1: object, 2: object, 3: object, 4: np.float64},
+    )
+    is_marker = (columns[1] == _MPS_MARKER).to_numpy()
+    marker_deltas = np.where(is_marker, np.where(columns[2] == _MPS_INTORG, 1, -1), 0)
+    is_integer_line = (np.cumsum(marker_deltas) > 0)[~is_marker]
+    columns = columns.loc[~is_marker]
+    columns[2] = pd.to_numeric(columns[2])
+
+    col_ids, col_names = pd.factorize(columns[0].to_numpy())
+    n_vars = col_names.size
+
+    entries = pd.DataFrame(
+        {
+            "col": np.concatenate((col_ids, col_ids)),
+            "row": pd.concat([columns[1], columns[3]], ignore_index=True),
+            "value": np.concatenate((columns[2].to_numpy(), columns[4].to_numpy())),
+        }
+    ).dropna()
+    is_obj_entry = (entries["row"] == obj_row_name).to_numpy()
+
+    obj = np.zeros(n_vars)
+    obj[entries["col"].to_numpy()[is_obj_entry]] = entries["value"].to_numpy()[
+        is_obj_entry
+    ]
+
+    entries = entries.loc[~is_obj_entry]
+    row_ids = cons_index.get_indexer(entries["row"])
+    if (row_ids < 0).any():
+        raise ValueError("mps-file contains unknown rows")
+    matrix = sp.csr_matrix(
+        (entries["value"].to_numpy(), (row_ids, entries["col"].to_numpy())),
+        shape=(n_conss, n_vars),
+    )
+
+    # Правые части и диапазоны
+    sides = np.zeros(n_conss)
+    obj_offset = 0.0
+    if "RHS" in sections:
+        rhs_table = _read_whitespace_table(
+            sections["RHS"],
+            {0: object, 1: object, 2: np.float64, 3: object, 4: np.float64},
+        )
+        rhs_entries = pd.DataFrame(
+            {
+                "row": pd.concat([rhs_table[1], rhs_table[3]], ignore_index=True),
+                "value": np.concatenate(
+                    (rhs_table[2].to_numpy(), rhs_table[4].to_numpy())
+                ),
+            }
+        ).dropna()
+        is_obj_rhs = (rhs_entries["row"] == obj_row_name).to_numpy()
+        # Правая часть строки целевой функции -- константа со знаком минус
+        obj_offset = -float(rhs_entries["value"].to_numpy()[is_obj_rhs].sum())
+        rhs_entries = rhs_entries.loc[~is_obj_rhs]
+        sides[cons_index.get_indexer(rhs_entries["row"])] = rhs_entries["value"]
+
+    lhs = np.where(cons_types == "L", -np.inf, sides)
+    rhs = np.where(cons_types == "G", np.inf, sides)
+    if "RANGES" in sections:
+        ranges_table = _read_whitespace_table(
+            sections["RANGES"],
+            {0: object, 1: object, 2: np.float64, 3: object, 4: np.float64},
+        )
+        range_entries = pd.DataFrame(
+            {
+                "row": pd.concat([ranges_table[1], ranges_table[3]], ignore_index=True),
+                "value": np.concatenate(
+                    (ranges_table[2].to_numpy(), ranges_table[4].to_numpy())
+                ),
+            }
+        ).dropna()
+        range_rows = cons_index.get_indexer(range_entries["row"])
+        ranges = range_entries["value"].to_numpy()
+        range_types = cons_types[range_rows]
+        range_sides = sides[range_rows]
+
+        lower_ranged = (range_types == "L") | ((range_types == "E") & (ranges < 0.0))
+        lhs[range_rows[lower_ranged]] = range_sides[lower_ranged] - np.abs(
+            ranges[lower_ranged]
+        )
+        upper_ranged = (range_types == "G") | ((range_types == "E") & (ranges > 0.0))
+        rhs[range_rows[upper_ranged]] = range_sides[upper_ranged] + np.abs(
+            ranges[upper_ranged]
+        )
+
+    # Границы переменных: при повторном задании действует последнее
+    col_is_integer = np.zeros(n_vars, dtype=bool)
+    col_is_integer[col_ids[is_integer_line]] = True
+    lbs = np.zeros(n_vars)
+    ubs = np.full(n_vars, np.inf)
+    if "BOUNDS" in sections:
+        bounds = _read_whitespace_table(
+            sections["BOUNDS"], {0: object, 1: object, 2: object, 3: np.float64}
+        )
+        if bounds[0].isin(["SC"]).any():
+            raise ValueError("semicontinuous variables are not supported")
+        bound_cols = pd.Index(col_names, dtype=object).get_indexer(bounds[2])
+        if (bound_cols < 0).any():
+            raise ValueError("mps-file contains bounds of unknown variables")
+        bound_types = bounds[0].to_numpy()
+        bound_values = bounds[3].to_numpy()
+
+        lower_values = pd.Series(
+            np.select(
+                [
+                    np.isin(bound_types, ["LO", "FX", "LI"]),
+                    np.isin(bound_types, ["MI", "FR"]),
+                    bound_types == "BV",
+                ],
+                [bound_values, -np.inf, 0.0],
+                default=np.nan,
+            ),
+            index=bound_cols,
+        ).dropna()
+        upper_values = pd.Series(
+            np.select(
+                [
+                    np.isin(bound_types, ["UP", "FX", "UI"]),
+                    np.isin(bound_types, ["PL", "FR"]),
+                    bound_types == "BV",
+                ],
+                [bound_values, np.inf, 1.0],
+                default=np.nan,
+            ),
+            index=bound_cols,
+        ).dropna()
+        lower_values = lower_values[~lower_values.index.duplicated(keep="last")]
+        upper_values = upper_values[~upper_values.index.duplicated(keep="last")]
+        lbs[lower_values.index.to_numpy()] = lower_values.to_numpy()
+        ubs[upper_values.index.to_numpy()] = upper_values.to_numpy()
+        col_is_integer[bound_cols[np.isin(bound_types, ["BV", "LI", "UI"])]] = True
+
+    vtypes = np.where(col_is_integer, "INTEGER", "CONTINUOUS")
+    vtypes[col_is_integer & (lbs == 0.0) & (ubs == 1.0)] = "BINARY"
+
+    return ProblemArrays(
+        var_names=np.asarray(col_names, dtype=str),
+        cons_names=cons_names.astype(str),
+        matrix=matrix,
+        lhs=lhs,
+        rhs=rhs,
+        obj=obj,
+        lbs=lbs,
+        ubs=ubs,
+        vtypes=vtypes,
+        obj_sense=obj_sense,
+        obj_offset=obj_offset,
+    )
+
+
+def _split_lp_sections(path_to_lp_file: PosixPath) -> t.Dict[str, str]:
+    """
+    Делит lp-файл на тексты секций по видам (комментарии удаляются)
+    """
+    with open(path_to_lp_file, encoding="utf-8") as fo:
+        text: str = fo.read()
+    if "\\" in text:
+        text = _LP_COMMENT_PATTERN.sub("", text)
+
+    # Заголовки ищутся в тексте в нижнем регистре
+    # (поиск без учета регистра заметно медленнее)
+    lowered_text = text.lower()
+    if len(lowered_text) != len(text):
+        raise ValueError("lp-file contains characters changing length in lower case")
+    sections: t.Dict[str, str] = {}
+    headers = list(_LP_SECTION_PATTERN.finditer(lowered_text))
+    if not headers or text[: headers[0].start()].strip():
+        raise ValueError("lp-file does not start with a section header")
+    for header, next_header in zip(headers, headers[1:] + [None]):
+        header_name = " ".join(header.group(1).split())
+        kind = next(
+            (
+                kind
+                for prefix, kind in _LP_SECTION_KINDS
+                if header_name.startswith(prefix)
+            ),
+            None,
+        )
+        if kind is None:
+            raise ValueError(f"lp section `{header_name}` is not supported")
+        if kind == "end":
+            break
+        body = text[
+            header.end() : len(text) if next_header is None else next_header.start()
+        ]
+        sections[kind] = sections.get(kind, "") + f"\n{body}"
+
+    return sections
+
+
+def _to_char_codes(chars: str) -> np.ndarray:
+    """
+    Коды символов (для сравнения с массивом первых символов лексем)
+    """
+    return np.array([ord(char) for char in chars], dtype=np.uint32)
+
+
+def _normalize_lp_expressions(text: str) -> str:
+    """
+    Отделяет пробелами операторы и коэффициенты, записанные слитно
+    с операндами (x<=5, -x, 3x)
+    """
+    text = " ".join(_LP_SENSE_PATTERN.split(text))
+    text = " ".join(_LP_SIGN_PATTERN.split(text))
+
+    return " ".join(_LP_GLUED_COEF_PATTERN.split(text))
+
+
+def _tokenize_lp_expressions(
+    text: str,
+) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Делит текст линейных выражений lp-файла на лексемы и возвращает
+    лексемы, их виды и числовые значения (знаки слиты с числами)
+
+    Регулярные выражения применяются ко всему тексту, только если
+    в нем есть слитно записанные операторы; иначе лексемы -- просто
+    части текста между пробелами
+    """
+    text = text.replace(":", " : ")
+    is_normalized = False
+    if _LP_GLUED_OPERATOR_PATTERN.search(
+        text
+    ) or _LP_REVERSED_GLUED_OPERATOR_PATTERN.search(text[::-1]):
+        text = _normalize_lp_expressions(text)
+        is_normalized = True
+
+    special_tokens = pd.Index(_LP_OPERATORS + _LP_INFINITY_TOKENS, dtype=object)
+    while True:
+        token_list: t.List[str] = text.split()
+        tokens = np.array(token_list, dtype=object)
+        # Коды первых символов лексем
+        first_chars = np.array(token_list, dtype="U1").view(np.uint32)
+        # Операторы и бесконечности ищутся только среди лексем
+        # с подходящим первым символом
+        special_ids = np.full(tokens.size, -1)
+        may_be_special = np.isin(first_chars, _to_char_codes(":+-<>=iI"))
+        special_ids[may_be_special] = special_tokens.get_indexer(tokens[may_be_special])
+        is_number_like = (special_ids >= len(_LP_OPERATORS)) | (
+            (special_ids < 0) & np.isin(first_chars, _to_char_codes("0123456789.+-"))
+        )
+        values = np.full(tokens.size, np.nan)
+        try:
+            values[is_number_like] = tokens[is_number_like].astype(np.float64)
+            break
+        except ValueError:
+            # Лексема, похожая на число, но не разбираемая (3x), --
+            # признак слитной записи
+            if not is_normalized:
+                text = _normalize_lp_expressions(text)
+                is_normalized = True
+                continue
+            values[is_number_like] = pd.to_numeric(
+                tokens[is_number_like], errors="coerce"
+            )
+            break
+
+    kinds = np.select(
+        [
+            special_ids == 0,
+            (special_ids == 1) | (special_ids == 2),
+            (special_ids >= 3) & (special_ids < len(_LP_OPERATORS)),
+            ~np.isnan(values),
+        ],
+        [_LP_TOKEN_NAME, _LP_TOKEN_SIGN, _LP_TOKEN_SENSE, _LP_TOKEN_NUMBER],
+        default=_LP_TOKEN_VAR,
+    )
+    values = np.where(
+        kinds == _LP_TOKEN_SIGN, np.where(special_ids == 2, -1.0, 1.0), values
+    )
+    values[kinds == _LP_TOKEN_SENSE] = special_ids[kinds == _LP_TOKEN_SENSE]
+    if np.isin(
+        first_chars[kinds == _LP_TOKEN_VAR], _to_char_codes("0123456789.[]^*/")
+    ).any():
+        raise ValueError("lp-file contains unsupported terms")
+
+    # Имя строки -- лексема перед двоеточием
+    colon_positions = np.flatnonzero(kinds == _LP_TOKEN_NAME)
+    if (colon_positions == 0).any() or (
+        kinds[colon_positions - 1] != _LP_TOKEN_VAR
+    ).any():
+        raise ValueError("lp-file contains an invalid row name")
+    kinds[colon_positions - 1] = _LP_TOKEN_NAME
+    keep = np.ones(tokens.size, dtype=bool)
+    keep[colon_positions] = False
+
+    # Знак перед числом сливается с ним, знак перед переменной -- коэффициент 1
+    next_kinds = np.append(kinds[1:], _LP_TOKEN_NAME)
+    is_sign = kinds == _LP_TOKEN_SIGN
+    signed_numbers = np.flatnonzero(is_sign & (next_kinds == _LP_TOKEN_NUMBER)) + 1
+    values[signed_numbers] *= values[signed_numbers - 1]
+    keep[signed_numbers - 1] = False
+    kinds[is_sign & (next_kinds == _LP_TOKEN_VAR)] = _LP_TOKEN_NUMBER
+    if (is_sign & ~np.isin(next_kinds, [_LP_TOKEN_NUMBER, _LP_TOKEN_VAR])).any():
+        raise ValueError("lp-file contains a sign without an operand")
+
+    return tokens[keep], kinds[keep], values[keep]
+
+
+def _parse_lp_rows(text: str, has_sides: bool) -> t.Dict[str, np.ndarray]:
+    """
+    Разбирает линейные выражения lp-файла: строки ограничений
+    (`has_sides=True`) или целевую функцию с константой
+    """
+    tokens, kinds, values = _tokenize_lp_expressions(text)
+    is_var = kinds == _LP_TOKEN_VAR
+    is_number = kinds == _LP_TOKEN_NUMBER
+    is_sense = kinds == _LP_TOKEN_SENSE
+
+    # Правая часть -- число сразу после знака отношения
+    prev_is_sense = np.insert(is_sense[:-1], 0, False)
+    is_side = is_number & prev_is_sense
+    if is_side.sum() != is_sense.sum():
+        raise ValueError("lp-file contains a constraint without a constant side")
+    # Коэффициент -- число перед переменной
+    prev_is_coef = np.insert(is_number[:-1] & ~is_side[:-1], 0, False)
+    is_coef = np.append(prev_is_coef[1:] & is_var[1:], False)
+    coefs = np.where(prev_is_coef, np.insert(values[:-1], 0, 1.0), 1.0)[is_var]
+    is_constant = is_number & ~is_side & ~is_coef
+
+    var_tokens = tokens[is_var]
+
+    if not has_sides:
+        if is_sense.any():
+            raise ValueError("lp objective contains a relation sign")
+        return {
+            "var_tokens": var_tokens,
+            "coefs": coefs,
+            "offset": float(values[is_constant].sum()),
+        }
+
+    if is_constant.any():
+        raise ValueError("lp constraints contain constant terms")
+    # Строки разделяются правыми частями
+    row_ids = np.cumsum(is_side) - is_side
+    n_rows = int(is_side.sum())
+    if (row_ids[is_var] >= n_rows).any() or (
+        row_ids[is_sense] != np.arange(n_rows)
+    ).any():
+        raise ValueError("lp-file contains a constraint with a wrong number of senses")
+
+    is_name = kinds == _LP_TOKEN_NAME
+    name_rows = row_ids[is_name]
+    # Номера строк имен не убывают, повтор -- несколько имен у строки
+    if (np.diff(name_rows) == 0).any():
+        raise ValueError("lp-file contains a constraint with several names")
+    if name_rows.size == n_rows:
+        row_names = tokens[is_name]
+    else:
+        row_names = np.array([f"R{row + 1}" for row in range(n_rows)], dtype=object)
+        row_names[name_rows] = tokens[is_name]
+
+    senses = values[is_sense].astype(np.int64)
+    sides = values[is_side]
+    is_le = np.isin(senses, [3, 4, 5])
+    is_ge = np.isin(senses, [6, 7, 8])
+
+    return {
+        "var_tokens": var_tokens,
+        "coefs": coefs,
+        "row_ids": row_ids[is_var],
+        "row_names": row_names,
+        "lhs": np.where(is_le, -np.inf, sides),
+        "rhs": np.where(is_ge, np.inf, sides),
+    }
+
+
+def _parse_lp_bounds(text: str) -> t.Tuple[pd.Series, pd.Series]:
+    """
+    Разбирает секцию границ lp-файла (по строке на границу) как таблицу;
+    возвращает нижние и верхние границы, индексированные именами
+    переменных (при повторном задании действует последнее)
+    """
+    if _LP_GLUED_OPERATOR_PATTERN.search(
+        text
+    ) or _LP_REVERSED_GLUED_OPERATOR_PATTERN.search(text[::-1]):
+        text = " ".join(_LP_SENSE_PATTERN.split(text))
+        # Знак, отделенный пробелом, сливается с числом
+        text = re.sub(r"([+-])\s+", r"\1", text)
+    bounds = _read_whitespace_table(text, {pos: object for pos in range(5)})
+    n_tokens = bounds.notna().sum(axis=1).to_numpy()
+    relations = [bounds[pos].map(_LP_RELATIONS).to_numpy() for pos in (1, 3)]
+    first_values = pd.to_numeric(bounds[0], errors="coerce").to_numpy()
+    third_values = pd.to_numeric(bounds[2], errors="coerce").to_numpy()
+    fifth_values = pd.to_numeric(bounds[4], errors="coerce").to_numpy()
+
+    is_free = (n_tokens == 2) & (bounds[1].str.lower() == "free").to_numpy()
+    is_single = (n_tokens == 3) & pd.notna(relations[0])
+    # Значение слева (5 <= x): смысл отношения для переменной обратный
+    is_value_first = is_single & ~np.isnan(first_values)
+    is_value_last = is_single & np.isnan(first_values) & ~np.isnan(third_values)
+    is_double = (
+        (n_tokens == 5)
+        & (relations[0] == "<")
+        & (relations[1] == "<")
+        & ~np.isnan(first_values)
+        & ~np.isnan(fifth_values)
+    )
+    if not (is_free | is_value_first | is_value_last | is_double).all():
+        raise ValueError("lp-file contains unsupported bounds")
+
+    names = np.where(is_value_last | is_free, bounds[0], bounds[2])
+    values = np.where(is_value_first, first_values, third_values)
+    relation = relations[0]
+    sets_lower = is_free | is_double | (is_value_last & (relation == ">"))
+    sets_lower |= is_value_first & (relation == "<")
+    sets_upper = is_free | is_double | (is_value_last & (relation == "<"))
+    sets_upper |= is_value_first & (relation == ">")
+    is_fixed = is_single & (relation == "=")
+    sets_lower |= is_fixed
+    sets_upper |= is_fixed
+
+    lower_values = np.select(
+        [is_free, is_double], [-np.inf, first_values], default=values
+    )
+    upper_values = np.select(
+        [is_free, is_double], [np.inf, fifth_values], default=values
+    )
+    lower = pd.Series(lower_values[sets_lower], index=names[sets_lower])
+    upper = pd.Series(upper_values[sets_upper], index=names[sets_upper])
+
+    return (
+        lower[~lower.index.duplicated(keep="last")],
+        upper[~upper.index.duplicated(keep="last")],
+    )
+
+
+def _read_lp_file(path_to_lp_file: PosixPath) -> ProblemArrays:
+    """
+    Разбирает lp-файл (формат CPLEX LP) в массивы задачи: текст делится
+    на лексемы, которые классифицируются векторно; порядок переменных --
+    порядок их первого появления в файле
+    """
+    sections = _split_lp_sections(path_to_lp_file)
+
+    obj_sense = "maximize" if "maximize" in sections else "minimize"
+    objective = _parse_lp_rows(sections.get(obj_sense, ""), has_sides=False)
+    constraints = _parse_lp_rows(sections.get("constraints", ""), has_sides=True)
+    lower_bounds, upper_bounds = _parse_lp_bounds(sections.get("bounds", ""))
+    general_names = sections.get("generals", "").split()
+    binary_names = sections.get("binaries", "").split()
+
+    var_ids, var_names = pd.factorize(
+        np.concatenate(
+            [
+                objective["var_tokens"],
+                constraints["var_tokens"],
+                lower_bounds.index.to_numpy(dtype=object),
+                upper_bounds.index.to_numpy(dtype=object),
+                np.array(general_names + binary_names, dtype=object),
+            ]
+        )
+    )
+    var_index = pd.Index(var_names, dtype=object)
+    n_vars = var_names.size
+    n_obj_terms = objective["var_tokens"].size
+    n_matrix_terms = constraints["var_tokens"].size
+    obj_ids = var_ids[:n_obj_terms]
+    col_ids = var_ids[n_obj_terms : n_obj_terms + n_matrix_terms]
+
+    # Повторные слагаемые суммируются
+    obj = np.bincount(obj_ids, weights=objective["coefs"], minlength=n_vars)
+    n_conss = constraints["row_names"].size
+    matrix = sp.csr_matrix(
+        (constraints["coefs"], (constraints["row_ids"], col_ids)),
+        shape=(n_conss, n_vars),
+    )
+
+    lbs = np.zeros(n_vars)
+    ubs = np.full(n_vars, np.inf)
+    lbs[var_index.get_indexer(lower_bounds.index)] = lower_bounds.to_numpy()
+    ubs[var_index.get_indexer(upper_bounds.index)] = upper_bounds.to_numpy()
+
+    vtypes = np.full(n_vars, "CONTINUOUS", dtype="<U10")
+    vtypes[var_index.get_indexer(general_names)] = "INTEGER"
+    binary_ids = var_index.get_indexer(binary_names)
+    vtypes[binary_ids] = "BINARY"
+    lbs[binary_ids] = np.maximum(lbs[binary_ids], 0.0)
+    ubs[binary_ids] = np.minimum(ubs[binary_ids], 1.0)
+
+    return ProblemArrays(
+        var_names=np.asarray(var_names, dtype=str),
+        cons_names=constraints["row_names"].astype(str),
+        matrix=matrix,
+        lhs=_to_inf(constraints["lhs"], _LP_INFINITY),
+        rhs=_to_inf(constraints["rhs"], _LP_INFINITY),
+        obj=obj,
+        lbs=_to_inf(lbs, _LP_INFINITY),
+        ubs=_to_inf(ubs, _LP_INFINITY),
+        vtypes=vtypes,
+        obj_sense=obj_sense,
+        obj_offset=objective["offset"],
+    )
@@ -0,0 +1,120 @@
+import logging
+import os
+import typing as t
+
+import pyscipopt
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.auxiliary_functions import get_file_hash
+
+
+class ProblemCache:
+    """
+    Кэш прочитанных задач в родном формате решателя SCIP (cip-файлы)
+
+    Ключом служит хэш содержимого lp-файла, поэтому при изменении
+    постановки задачи кэш автоматически становится неактуальным.
+    Суммарный размер кэша ограничен, при превышении лимита
+    вытесняются давно не использовавшиеся записи (LRU)
+    """
+
+    _CACHE_FILE_EXTENSION = ".cip"
+    _TMP_FILE_PREFIX = ".tmp_"
+
+    def __init__(
+        self,
+        *,
+        path_to_cache_dir: PosixPath,
+        max_size_mb: float,
+    ):
+        self.path_to_cache_dir = Path(path_to_cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024**2)
+
+        self.path_to_cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_path_to_cached_problem(self, path_to_lp_file: PosixPath) -> PosixPath:
+        """
+        Возвращает путь до кэшированной копии задачи
+        """
+        key: str = get_file_hash(path_to_lp_file)
+
+        return self.path_to_cache_dir.joinpath(f"{key}{self._CACHE_FILE_EXTENSION}")
+
+    def load(
+        self,
+        model: pyscipopt.scip.Model,
+        path_to_cached_problem: PosixPath,
+        logger: logging.Logger,
+    ) -> bool:
+        """
+        Читает задачу из кэша в переданную модель;
+        возвращает False, если записи в кэше нет
+        """
+        if not path_to_cached_problem.exists():
+            return False
+
+        try:
+            model.readProblem(str(path_to_cached_problem))
+        except OSError as err:
+            logger.warning(
+                f"Cached problem `{path_to_cached_problem.name}` is broken: {err}"
+            )
+            path_to_cached_problem.unlink()
+            return False
+
+        # Отметить запись как недавно использованную
+        os.utime(path_to_cached_problem)
+
+        return True
+
+    def store(
+        self,
+        model: pyscipopt.scip.Model,
+        path_to_cached_problem: PosixPath,
+        logger: logging.Logger,
+    ) -> t.NoReturn:
+        """
+        Записывает исходную (не преобразованную) задачу в кэш
+        и вытесняет старые записи при превышении лимита
+        """
+        # Запись через временный файл, чтобы параллельные запуски
+        # не прочитали недописанный cip-файл
+        path_to_tmp_file = self.path_to_cache_dir.joinpath(
+            f"{self._TMP_FILE_PREFIX}{os.getpid()}_{path_to_cached_problem.name}"
+        )
+        try:
+            model.writeProblem(str(path_to_tmp_file), trans=False)
+            os.replace(path_to_tmp_file, path_to_cached_problem)
+        except OSError as err:
+            logger.warning(f"Problem was not cached: {err}")
+            return
+
+        logger.info(f"Problem has been cached to `{path_to_cached_problem}`")
+        self._evict(logger=logger)
+
+    def _evict(self, logger: logging.Logger) -> t.NoReturn:
+        """
+        Удаляет наиболее давно использованные записи,
+        пока суммарный размер кэша превышает лимит
+        (записи, уже удаленные другим процессом, пропускаются)
+        """
+        cached_problems: t.List[t.Tuple[PosixPath, os.stat_result]] = []
+        for path in self.path_to_cache_dir.glob(f"*{self._CACHE_FILE_EXTENSION}"):
+            if path.name.startswith(self._TMP_FILE_PREFIX):
+                continue
+            try:
+                cached_problems.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        cached_problems.sort(key=lambda cached_problem: cached_problem[1].st_mtime)
+        total_size: int = sum(stat.st_size for _, stat in cached_problems)
+
+        for path, stat in cached_problems:
+            if total_size <= self.max_size_bytes:
+                break
+            total_size -= stat.st_size
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            logger.info(f"Cached problem `{path.name}` has been evicted")
@@ -0,0 +1,260 @@
+import http.server
+import json
+import logging
+import math
+import threading
+import time
+import typing as t
+
+import pyscipopt
+from pathlib2 import Path, PosixPath
+
+# Поля образца хода решения (в порядке записи)
+_SAMPLE_FIELDS = (
+    "time",
+    "primal_bound",
+    "dual_bound",
+    "gap",
+    "n_nodes",
+    "n_open_nodes",
+    "n_lp_iterations",
+)
+_METRICS_PATH = "/metrics"
+_METRICS_PREFIX = "scip_"
+_METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Допустимая доля накладных расходов на сбор образцов
+_MAX_OVERHEAD_RATIO = 0.01
+
+
+def _format_metric_value(value: float) -> str:
+    """
+    Значение метрики в текстовом формате Prometheus
+    """
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(value)
+
+
+class _ProgressEventhdlr(pyscipopt.Eventhdlr):
+    """
+    Обработчик событий решателя (решение узла, решение LP, новое лучшее
+    решение), передающий образцы хода решения в `SolveProgress`
+
+    Образец по решению узла или LP снимается не чаще одного раза
+    в `min_interval` секунд; новое лучшее решение фиксируется всегда
+    """
+
+    _EVENT_TYPES = (
+        pyscipopt.SCIP_EVENTTYPE.NODESOLVED,
+        pyscipopt.SCIP_EVENTTYPE.LPSOLVED,
+        pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND,
+    )
+
+    def __init__(self, *, progress: "SolveProgress", min_interval: float):
+        self.progress = progress
+        self.min_interval = min_interval
+        self.last_sample_time = -float("inf")
+
+    def eventinit(self):
+        for event_type in self._EVENT_TYPES:
+            self.model.catchEvent(event_type, self)
+
+    def eventexit(self):
+        for event_type in self._EVENT_TYPES:
+            self.model.dropEvent(event_type, self)
+
+    def eventexec(self, event):
+        start = time.perf_counter()
+        is_best_sol = event.getType() == pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND
+        if is_best_sol or start - self.last_sample_time >= self.min_interval:
+            self.last_sample_time = start
+            self.progress.record(self.model, is_best_sol=is_best_sol)
+        self.progress.handler_time += time.perf_counter() - start
+
+
+class _MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Отдает последний образец хода решения в текстовом формате Prometheus
+    """
+
+    progress: "SolveProgress"
+
+    def do_GET(self):
+        if self.path != _METRICS_PATH:
+            self.send_error(404)
+            return
+
+        body: bytes = self.progress.format_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", _METRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Запросы сборщика метрик не засоряют журнал
+        pass
+
+
+class SolveProgress:
+    """
+    Поток образцов хода решения SCIP: границы целевой функции, зазор,
+    число узлов (всего и открытых) и итераций LP
+
+    Образцы дописываются в jsonl-файл (строка -- образец) и, если задан
+    `metrics_port`, отдаются локальным HTTP-сервером в формате Prometheus
+    (`http://127.0.0.1:<metrics_port>/metrics`). Время работы обработчика
+    событий учитывается и сравнивается со временем решения
+    """
+
+    def __init__(
+        self,
+        *,
+        problem_name: str,
+        path_to_jsonl_file: PosixPath,
+        logger: logging.Logger,
+        min_interval: float = 1.0,
+        metrics_port: t.Optional[int] = None,
+    ):
+        self.problem_name = problem_name
+        self.path_to_jsonl_file = Path(path_to_jsonl_file)
+        self.logger = logger
+        self.min_interval = min_interval
+        self.metrics_port = metrics_port
+
+        self.n_samples = 0
+        self.handler_time = 0.0
+        self.last_sample: t.Dict[str, t.Any] = {}
+        self._lock = threading.Lock()
+        self._fo: t.Optional[t.IO] = None
+        self._server: t.Optional[http.server.ThreadingHTTPServer] = None
+
+    def attach(self, model: pyscipopt.scip.Model) -> t.NoReturn:
+        """
+        Подключает обработчик событий к модели (до запуска решения),
+        открывает jsonl-файл и запускает сервер метрик
+        """
+        self.path_to_jsonl_file.parent.mkdir(parents=True, exist_ok=True)
+        self._fo = open(self.path_to_jsonl_file, mode="a", encoding="utf-8")
+        model.includeEventhdlr(
+            _ProgressEventhdlr(progress=self, min_interval=self.min_interval),
+            "solve_progress",
+            "Samples bounds, gap, nodes and LP iterations during solving",
+        )
+
+        if self.metrics_port is not None:
+            request_handler = type(
+                "MetricsRequestHandler", (_MetricsRequestHandler,), {"progress": self}
+            )
+            self._server = http.server.ThreadingHTTPServer(
+                ("127.0.0.1", self.metrics_port), request_handler
+            )
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            self.logger.info(
+                f"Solve progress metrics are served at "
+                f"`http://127.0.0.1:{self.metrics_port}{_METRICS_PATH}`"
+            )
+
+    def record(self, model: pyscipopt.scip.Model, is_best_sol: bool) -> t.NoReturn:
+        """
+        Снимает образец хода решения и дописывает его в jsonl-файл
+        """
+        # Открытые узлы есть только на этапе решения (не в предобработке)
+        is_solving = model.getStage() == pyscipopt.SCIP_STAGE.SOLVING
+        infinity: float = model.infinity()
+        sample: t.Dict[str, t.Any] = {
+            field: (
+                math.copysign(math.inf, value)
+                if isinstance(value, float) and abs(value) >= infinity
+                else value
+            )
+            for field, value in zip(
+                _SAMPLE_FIELDS,
+                (
+                    model.getSolvingTime(),
+                    # Внутри события BESTSOLFOUND граница может быть еще не обновлена
+                    (
+                        model.getSolObjVal(model.getBestSol())
+                        if is_best_sol
+                        else model.getPrimalbound()
+                    ),
+                    model.getDualbound(),
+                    model.getGap(),
+                    model.getNNodes(),
+                    (
+                        model.getNLeaves() + model.getNChildren() + model.getNSiblings()
+                        if is_solving
+                        else 0
+                    ),
+                    model.getNLPIterations(),
+                ),
+            )
+        }
+        sample["is_best_sol"] = is_best_sol
+        with self._lock:
+            self.last_sample = sample
+            self.n_samples += 1
+        # Бесконечные значения (нет решения, нет границы) в JSON -- null
+        self._fo.write(
+            json.dumps(
+                {
+                    key: (
+                        None
+                        if isinstance(value, float) and not math.isfinite(value)
+                        else value
+                    )
+                    for key, value in sample.items()
+                }
+            )
+            + "\n"
+        )
+        self._fo.flush()
+
+    def format_metrics(self) -> str:
+        """
+        Последний образец в текстовом формате Prometheus
+        """
+        with self._lock:
+            sample = dict(self.last_sample)
+            n_samples = self.n_samples
+
+        labels = f'{{problem="{self.problem_name}"}}'
+        lines = [f"{_METRICS_PREFIX}progress_samples_total{labels} {n_samples}"]
+        for field in _SAMPLE_FIELDS:
+            if field in sample:
+                lines.append(f"# TYPE {_METRICS_PREFIX}{field} gauge")
+                lines.append(
+                    f"{_METRICS_PREFIX}{field}{labels} "
+                    f"{_format_metric_value(sample[field])}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+    def close(self, model: pyscipopt.scip.Model) -> float:
+        """
+        Останавливает сервер метрик, закрывает jsonl-файл и записывает
+        в журнал долю накладных расходов; возвращает эту долю
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._fo is not None:
+            self._fo.close()
+
+        solving_time: float = model.getSolvingTime()
+        overhead_ratio = self.handler_time / solving_time if solving_time > 0 else 0.0
+        message = (
+            f"{self.n_samples} progress samples have been written to "
+            f"`{self.path_to_jsonl_file}` (overhead: {self.handler_time:.3f} s, "
+            f"{overhead_ratio * 100:.2g}% of solving time)"
+        )
+        if overhead_ratio > _MAX_OVERHEAD_RATIO:
+            self.logger.warning(f"{message}; consider a larger `min_interval`")
+        else:
+            self.logger.info(message)
+
+        return overhead_ratio
@@ -0,0 +1,446 @@
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+import typing as t
+from dataclasses import dataclass
+
+import pyscipopt
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.auxiliary_functions import (
+    get_results_filename_stem,
+    get_stats_before_solving,
+    read_scip_solver_settings_file,
+    write_results_and_stats,
+)
+from scip_ecole_model.model_loader import load_problem
+from scip_ecole_model.optimize import scip_optimize
+from scip_ecole_model.scip_elems import SCIPAttributes
+from scip_ecole_model.sol_io import (
+    read_sol_file,
+    read_sol_file_objective_value,
+    write_sol_file,
+)
+from scip_ecole_model.variable_index import VariableIndex
+
+# Статусы, при которых участник гонки достиг цели
+_WINNING_STATUSES = ("optimal", "gaplimit", "infeasible")
+_RANDOM_SEED_SHIFT_PARAM = "randomization/randomseedshift"
+_GAP_LIMIT_PARAM = "limits/gap"
+
+
+@dataclass(frozen=True)
+class Racer:
+    """
+    Класс участника гонки: set-файл настроек и сдвиг начального
+    значения генератора случайных чисел решателя
+    """
+
+    label: str
+    path_to_settings_file: PosixPath
+    seed: t.Optional[int] = None
+
+
+@dataclass(frozen=True)
+class _RaceControl:
+    """
+    Общие для участников гонки объекты (прокси менеджера процессов)
+    """
+
+    stop_event: t.Any
+    winner_id: t.Any
+    lock: t.Any
+
+
+def build_racers(
+    paths_to_settings_files: t.Sequence[PosixPath],
+    seeds: t.Optional[t.Sequence[int]] = None,
+) -> t.List[Racer]:
+    """
+    Строит участников гонки -- все сочетания set-файлов и сдвигов
+    начального значения генератора
+    """
+    return [
+        Racer(
+            label=Path(path_to_settings_file).stem
+            + ("" if seed is None else f"__seed={seed}"),
+            path_to_settings_file=Path(path_to_settings_file),
+            seed=seed,
+        )
+        for path_to_settings_file, seed in itertools.product(
+            paths_to_settings_files, seeds or [None]
+        )
+    ]
+
+
+class _IncumbentExchangeEventhdlr(pyscipopt.Eventhdlr):
+    """
+    Обработчик событий решателя, публикующий найденные участником
+    решения в общей директории и подхватывающий решения других участников
+    (через trySol; лучшее решение становится отсечением по целевой функции)
+
+    Общая директория и сигнал остановки проверяются не чаще
+    одного раза в `poll_interval` секунд
+    """
+
+    _SOL_FILE_EXTENSION = ".sol"
+    _TMP_FILE_PREFIX = ".tmp_"
+
+    def __init__(
+        self,
+        *,
+        label: str,
+        path_to_incumbents_dir: PosixPath,
+        stop_event: t.Any,
+        poll_interval: float,
+    ):
+        self.label = label
+        self.path_to_incumbents_dir = path_to_incumbents_dir
+        self.stop_event = stop_event
+        self.poll_interval = poll_interval
+        self.var_index: t.Optional[VariableIndex] = None
+        self.last_poll_time = time.perf_counter()
+        self.last_stop_check_time = self.last_poll_time
+        self.seen_mtimes: t.Dict[str, float] = {}
+        self.imported_objective_value: t.Optional[float] = None
+        self.n_imported = 0
+
+    # Сигнал остановки проверяется и в предобработке, и при решении LP
+    # корня, чтобы проигравший участник не дорешивал первый узел
+    _EVENT_TYPES = (
+        pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND,
+        pyscipopt.SCIP_EVENTTYPE.NODESOLVED,
+        pyscipopt.SCIP_EVENTTYPE.PRESOLVEROUND,
+        pyscipopt.SCIP_EVENTTYPE.LPSOLVED,
+    )
+
+    def eventinit(self):
+        self.var_index = VariableIndex.from_model(self.model)
+        self.sense = -1.0 if self.model.getObjectiveSense() == "maximize" else 1.0
+        for event_type in self._EVENT_TYPES:
+            self.model.catchEvent(event_type, self)
+
+    def eventexit(self):
+        for event_type in self._EVENT_TYPES:
+            self.model.dropEvent(event_type, self)
+
+    def eventexec(self, event):
+        event_type = event.getType()
+        if event_type == pyscipopt.SCIP_EVENTTYPE.BESTSOLFOUND:
+            self._publish()
+            return
+
+        now = time.perf_counter()
+        if now - self.last_stop_check_time >= self.poll_interval:
+            self.last_stop_check_time = now
+            if self.stop_event.is_set():
+                self.model.interruptSolve()
+                return
+
+        # Решения других участников передаются решателю только между узлами
+        if (
+            event_type == pyscipopt.SCIP_EVENTTYPE.NODESOLVED
+            and now - self.last_poll_time >= self.poll_interval
+        ):
+            self.last_poll_time = now
+            self._import_incumbents()
+
+    def _publish(self) -> t.NoReturn:
+        """
+        Записывает лучшее решение участника в общую директорию
+        (решение, полученное от другого участника, повторно не публикуется)
+        """
+        objective_value: float = self.model.getPrimalbound()
+        if objective_value == self.imported_objective_value:
+            return
+
+        path_to_incumbent = self.path_to_incumbents_dir.joinpath(
+            f"{self.label}{self._SOL_FILE_EXTENSION}"
+        )
+        path_to_tmp_file = self.path_to_incumbents_dir.joinpath(
+            f"{self._TMP_FILE_PREFIX}{os.getpid()}_{path_to_incumbent.name}"
+        )
+        write_sol_file(
+            path_to_tmp_file,
+            names=self.var_index.names,
+            values=self.var_index.all_values(self.model, self.model.getBestSol()),
+            objs=self.var_index.objs,
+            objective_value=objective_value,
+        )
+        os.replace(path_to_tmp_file, path_to_incumbent)
+
+    def _import_incumbents(self) -> t.NoReturn:
+        """
+        Передает решателю опубликованные решения лучше текущего
+        """
+        for path_to_incumbent in self.path_to_incumbents_dir.glob(
+            f"*{self._SOL_FILE_EXTENSION}"
+        ):
+            if (
+                path_to_incumbent.stem == self.label
+                or path_to_incumbent.name.startswith(self._TMP_FILE_PREFIX)
+            ):
+                continue
+            mtime = path_to_incumbent.stat().st_mtime
+            if self.seen_mtimes.get(path_to_incumbent.name) == mtime:
+                continue
+            self.seen_mtimes[path_to_incumbent.name] = mtime
+
+            objective_value = read_sol_file_objective_value(path_to_incumbent)
+            if objective_value is None or self.sense * objective_value >= (
+                self.sense * self.model.getPrimalbound()
+            ):
+                continue
+
+            incumbent = read_sol_file(path_to_incumbent)
+            positions = self.var_index.positions_of(incumbent.names, allow_missing=True)
+            found_mask = positions >= 0
+            sol = self.model.createSol()
+            for position, value in zip(
+                positions[found_mask].tolist(), incumbent.values[found_mask].tolist()
+            ):
+                self.model.setSolVal(sol, self.var_index.vars_[position], value)
+            self.imported_objective_value = objective_value
+            self.n_imported += bool(self.model.trySol(sol, free=True))
+
+
+def _run_racer(
+    racer_id: int,
+    racer: Racer,
+    *,
+    path_to_lp_file: PosixPath,
+    problem_name: str,
+    path_to_race_dir: PosixPath,
+    time_limit: t.Optional[float],
+    target_gap: float,
+    path_to_warm_start_file: t.Optional[PosixPath],
+    poll_interval: float,
+    race_control: _RaceControl,
+    logger: logging.Logger,
+) -> t.Optional[dict]:
+    """
+    Решает задачу одним участником гонки (выполняется в дочернем процессе);
+    возвращает None, если победитель определился до старта участника
+    """
+    if race_control.stop_event.is_set():
+        return None
+
+    scip_params: dict = read_scip_solver_settings_file(racer.path_to_settings_file)
+    if racer.seed is not None:
+        scip_params[_RANDOM_SEED_SHIFT_PARAM] = racer.seed
+    if time_limit is not None:
+        scip_params[SCIPAttributes.LIMITS_TIME] = time_limit
+    scip_params[_GAP_LIMIT_PARAM] = target_gap
+
+    model: pyscipopt.scip.Model = load_problem(
+        path_to_lp_file=path_to_lp_file, logger=logger
+    )
+    # Журналы параллельно работающих решателей не должны перемешиваться
+    model.hideOutput()
+    stats_before_solving: t.NamedTuple = get_stats_before_solving(
+        model=model, logger=logger
+    )
+    exchange_eventhdlr = _IncumbentExchangeEventhdlr(
+        label=racer.label,
+        path_to_incumbents_dir=path_to_race_dir.joinpath("incumbents"),
+        stop_event=race_control.stop_event,
+        poll_interval=poll_interval,
+    )
+    model.includeEventhdlr(
+        exchange_eventhdlr,
+        "incumbent_exchange",
+        "Shares incumbents between racers and stops the losing racers",
+    )
+
+    model = scip_optimize(
+        model_scip=model,
+        scip_params=scip_params,
+        path_to_warm_start_file=path_to_warm_start_file,
+        logger=logger,
+        use_warm_start=path_to_warm_start_file is not None,
+    )
+
+    status: str = model.getStatus()
+    is_winner = False
+    if status in _WINNING_STATUSES:
+        with race_control.lock:
+            if race_control.winner_id.value < 0:
+                race_control.winner_id.value = racer_id
+                race_control.stop_event.set()
+                is_winner = True
+
+    n_sols: int = model.getNSols()
+    path_to_racer_dir = path_to_race_dir.joinpath(racer.label)
+    path_to_racer_dir.mkdir(parents=True, exist_ok=True)
+    if n_sols > 0:
+        write_results_and_stats(
+            problem_name=problem_name,
+            model=model,
+            stats_before_solving=stats_before_solving,
+            path_to_output_dir=path_to_racer_dir,
+            logger=logger,
+        )
+
+    return {
+        "racer_id": racer_id,
+        "label": racer.label,
+        "status": status,
+        "is_winner": is_winner,
+        "obj_sense": model.getObjectiveSense(),
+        "objective": model.getObjVal() if n_sols > 0 else float("nan"),
+        "gap": model.getGap(),
+        "time": model.getSolvingTime(),
+        "n_sols": n_sols,
+        "n_imported": exchange_eventhdlr.n_imported,
+        "path_to_racer_dir": path_to_racer_dir,
+        "filename_stem": get_results_filename_stem(problem_name, stats_before_solving),
+    }
+
+
+def _select_winner(racer_results: t.Sequence[dict]) -> t.Optional[dict]:
+    """
+    Победитель -- первый достигший цели участник, иначе -- участник
+    с лучшим значением целевой функции
+    """
+    for racer_result in racer_results:
+        if racer_result["is_winner"]:
+            return racer_result
+
+    solved = [racer_result for racer_result in racer_results if racer_result["n_sols"]]
+    if not solved:
+        return None
+    sense = -1.0 if solved[0]["obj_sense"] == "maximize" else 1.0
+
+    return min(solved, key=lambda racer_result: sense * racer_result["objective"])
+
+
+def run_race(
+    *,
+    racers: t.Sequence[Racer],
+    path_to_lp_file: PosixPath,
+    problem_name: str,
+    path_to_output_dir: PosixPath,
+    logger: logging.Logger,
+    time_limit: t.Optional[float] = None,
+    target_gap: float = 0.0,
+    path_to_warm_start_file: t.Optional[PosixPath] = None,
+    use_warm_start: bool = False,
+    poll_interval: float = 1.0,
+    n_workers: t.Optional[int] = None,
+) -> t.Optional[PosixPath]:
+    """
+    Запускает гонку конфигураций решателя SCIP на одной задаче:
+    участники решают задачу одновременно, обмениваются решениями,
+    первый достигший зазора `target_gap` (или доказавший оптимальность)
+    побеждает, остальные прерываются
+
+    Результаты победителя (sol- и stats-файлы `write_results_and_stats`)
+    копируются в `path_to_output_dir`; возвращает путь до sol-файла
+    или None, если решение не найдено
+    """
+    # Решатель SCIP однопоточный, поэтому один участник -- одно ядро
+    n_workers = min(n_workers or os.cpu_count() or 1, len(racers))
+    if n_workers < len(racers):
+        logger.warning(
+            f"Only {n_workers} of {len(racers)} racers run at once, "
+            f"the rest start after the first ones finish"
+        )
+
+    path_to_race_dir = Path(path_to_output_dir).joinpath(f"{problem_name}_race")
+    path_to_incumbents_dir = path_to_race_dir.joinpath("incumbents")
+    # Решения прошлой гонки не должны попасть в текущую
+    shutil.rmtree(path_to_incumbents_dir, ignore_errors=True)
+    path_to_incumbents_dir.mkdir(parents=True)
+
+    logger.info(f"Race of {len(racers)} racers has been started on {n_workers} workers")
+    racer_results: t.List[dict] = []
+    with multiprocessing.Manager() as manager:
+        race_control = _RaceControl(
+            stop_event=manager.Event(),
+            winner_id=manager.Value("i", -1),
+            lock=manager.Lock(),
+        )
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = {
+                executor.submit(
+                    _run_racer,
+                    racer_id,
+                    racer,
+                    path_to_lp_file=path_to_lp_file,
+                    problem_name=problem_name,
+                    path_to_race_dir=path_to_race_dir,
+                    time_limit=time_limit,
+                    target_gap=target_gap,
+                    path_to_warm_start_file=(
+                        path_to_warm_start_file if use_warm_start else None
+                    ),
+                    poll_interval=poll_interval,
+                    race_control=race_control,
+                    logger=logger,
+                ): racer
+                for racer_id, racer in enumerate(racers)
+            }
+            for future in concurrent.futures.as_completed(futures):
+                if future.cancelled():
+                    continue
+                # Ошибка одного участника (например, неизвестный решателю
+                # параметр в set-файле) не должна останавливать гонку
+                try:
+                    racer_result: t.Optional[dict] = future.result()
+                except Exception as err:
+                    logger.warning(
+                        f"Racer `{futures[future].label}` has failed: {err!r}"
+                    )
+                    continue
+                if racer_result is None:
+                    logger.info(
+                        f"Racer `{futures[future].label}` has not been started, "
+                        f"the race is already won"
+                    )
+                    continue
+                racer_results.append(racer_result)
+                # Участники в очереди пула не запускаются после победы
+                if racer_result["is_winner"]:
+                    for pending_future in futures:
+                        pending_future.cancel()
+                logger.info(
+                    f"Racer `{racer_result['label']}` [{racer_result['status']}]: "
+                    f"objective {racer_result['objective']:.8g}, "
+                    f"gap {racer_result['gap'] * 100:.3g}%, "
+                    f"time {racer_result['time']:.2f} s, "
+                    f"imported incumbents: {racer_result['n_imported']}"
+                )
+
+    winner = _select_winner(racer_results)
+    if winner is None:
+        logger.warning("No racer has found a solution")
+        return None
+    # Победитель мог доказать недопустимость задачи, не найдя решения
+    if not winner["n_sols"]:
+        logger.info(
+            f"Racer `{winner['label']}` has won the race "
+            f"with status `{winner['status']}`, no solution to write"
+        )
+        return None
+
+    path_to_best_sol_file = Path(path_to_output_dir).joinpath(
+        f"{winner['filename_stem']}.sol"
+    )
+    for extension in (".sol", ".stats"):
+        shutil.copyfile(
+            winner["path_to_racer_dir"].joinpath(
+                f"{winner['filename_stem']}{extension}"
+            ),
+            Path(path_to_output_dir).joinpath(f"{winner['filename_stem']}{extension}"),
+        )
+    logger.info(
+        f"Racer `{winner['label']}` has won the race "
+        f"({'target reached' if winner['is_winner'] else 'best objective'}), "
+        f"results have been written to `{path_to_output_dir}`"
+    )
+
+    return path_to_best_sol_file
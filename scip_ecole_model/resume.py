@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import typing as t
+from dataclasses import asdict, dataclass
+
+import pyscipopt
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.auxiliary_functions import compute_gap
+from scip_ecole_model.sol_io import read_sol_file_objective_value
+
+_TMP_FILE_PREFIX = ".tmp_"
+
+
+@dataclass
+class SolveSegment:
+    """
+    Класс итогов одного отрезка возобновляемого решения
+    """
+
+    status: str
+    solving_time: float
+    n_nodes: int
+    primal_bound: float
+    dual_bound: float
+    path_to_sol_file: t.Optional[str] = None
+
+
+class ResumeState:
+    """
+    Состояние возобновляемого решения (json-файл рядом с результатами):
+    настройки решателя первого отрезка и итоги всех отрезков
+
+    Следующий отрезок продолжает решение с лучшего известного решения
+    (контрольной точки или sol-файла прошлого отрезка) на тех же
+    настройках, но с новым ограничением времени
+    """
+
+    def __init__(self, path_to_state_file: PosixPath):
+        self.path_to_state_file = Path(path_to_state_file)
+        self.obj_sense: t.Optional[str] = None
+        self.scip_params: t.Dict[str, t.Any] = {}
+        self.segments: t.List[SolveSegment] = []
+        if self.path_to_state_file.exists():
+            with open(self.path_to_state_file, encoding="utf-8") as fo:
+                state: dict = json.load(fo)
+            self.obj_sense = state["obj_sense"]
+            self.scip_params = state["scip_params"]
+            self.segments = [SolveSegment(**segment) for segment in state["segments"]]
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    @property
+    def total_solving_time(self) -> float:
+        return sum(segment.solving_time for segment in self.segments)
+
+    @property
+    def total_n_nodes(self) -> int:
+        return sum(segment.n_nodes for segment in self.segments)
+
+    def best_bounds(self) -> t.Tuple[float, float]:
+        """
+        Лучшие границы целевой функции по всем отрезкам
+        (границы каждого отрезка верны для исходной задачи)
+        """
+        best = max if self.obj_sense == "maximize" else min
+        worst = min if self.obj_sense == "maximize" else max
+
+        return (
+            best(segment.primal_bound for segment in self.segments),
+            worst(segment.dual_bound for segment in self.segments),
+        )
+
+    def reset(self, scip_params: t.Dict[str, t.Any], obj_sense: str) -> t.NoReturn:
+        """
+        Начинает новое решение: запоминает настройки решателя
+        и удаляет итоги прошлых отрезков
+        """
+        self.obj_sense = obj_sense
+        self.scip_params = dict(scip_params)
+        self.segments = []
+        self._save()
+
+    def find_incumbent(
+        self, paths_to_sol_files: t.Sequence[PosixPath]
+    ) -> t.Optional[PosixPath]:
+        """
+        Возвращает лучший из sol-файлов (кандидаты -- контрольная точка
+        и sol-файл последнего отрезка); None, если ни одного файла нет
+        """
+        sense = -1.0 if self.obj_sense == "maximize" else 1.0
+        candidates: t.List[t.Tuple[float, PosixPath]] = []
+        for path_to_sol_file in paths_to_sol_files:
+            if path_to_sol_file is None or not Path(path_to_sol_file).is_file():
+                continue
+            objective_value = read_sol_file_objective_value(path_to_sol_file)
+            if objective_value is not None:
+                candidates.append((sense * objective_value, Path(path_to_sol_file)))
+
+        return (
+            min(candidates, key=lambda candidate: candidate[0])[1]
+            if candidates
+            else None
+        )
+
+    def add_segment(
+        self,
+        model: pyscipopt.scip.Model,
+        path_to_sol_file: t.Optional[PosixPath],
+        status: t.Optional[str] = None,
+    ) -> SolveSegment:
+        """
+        Записывает итоги отрезка по решенной модели
+        (`status` заменяет статус решателя)
+        """
+        segment = SolveSegment(
+            status=model.getStatus() if status is None else status,
+            solving_time=model.getSolvingTime(),
+            n_nodes=model.getNTotalNodes(),
+            primal_bound=model.getPrimalbound(),
+            dual_bound=model.getDualbound(),
+            path_to_sol_file=None if path_to_sol_file is None else str(path_to_sol_file),
+        )
+        self.segments.append(segment)
+        self._save()
+
+        return segment
+
+    def log_summary(self, logger: logging.Logger) -> t.NoReturn:
+        """
+        Записывает в журнал сводку по всем отрезкам решения
+        """
+        primal_bound, dual_bound = self.best_bounds()
+        segments_info = "".join(
+            f"\t\t{idx + 1}: [{segment.status}] time {segment.solving_time:.2f} s, "
+            f"nodes {segment.n_nodes}, primal bound {segment.primal_bound:.8g}, "
+            f"dual bound {segment.dual_bound:.8g}\n"
+            for idx, segment in enumerate(self.segments)
+        )
+        logger.info(
+            f"\n\tResumed solving summary ({len(self)} segments):\n"
+            f"{segments_info}"
+            f"\t- Primal bound / Dual bound: {primal_bound:.8g} / {dual_bound:.8g}\n"
+            f"\t- Gap: {compute_gap(primal_bound, dual_bound) * 100:.3g}%\n"
+            f"\t- Total solving time: {self.total_solving_time / 60:.2g} min\n"
+            f"\t- Total nodes: {self.total_n_nodes}"
+        )
+
+    def _save(self) -> t.NoReturn:
+        """
+        Атомарно перезаписывает json-файл состояния
+        """
+        self.path_to_state_file.parent.mkdir(parents=True, exist_ok=True)
+        path_to_tmp_file = self.path_to_state_file.with_name(
+            f"{_TMP_FILE_PREFIX}{os.getpid()}_{self.path_to_state_file.name}"
+        )
+        with open(path_to_tmp_file, mode="w", encoding="utf-8") as fo:
+            json.dump(
+                {
+                    "obj_sense": self.obj_sense,
+                    "scip_params": self.scip_params,
+                    "segments": [asdict(segment) for segment in self.segments],
+                },
+                fo,
+                indent=2,
+            )
+        os.replace(path_to_tmp_file, self.path_to_state_file)
@@ -1,5 +1,7 @@
 import collections
+import os
 import sys
+import tempfile
 import typing as t
 
 import matplotlib.pyplot as plt
@@ -12,9 +14,86 @@ from scip_ecole_model.scip_elems import SCIPAttributes
 from scip_ecole_model.utils.scip_ecole_logger import logger
 
 
+class _StatisticsSnapshotWriter:
+    """
+    Записывает статистику решателя в файл в оперативной памяти
+    (memfd в Linux) и разбирает ее без создания файлов на диске;
+    на других платформах используется один переиспользуемый
+    временный файл
+    """
+
+    def __init__(self):
+        if hasattr(os, "memfd_create"):
+            self._fd = os.memfd_create("scip_statistics")
+            self.path_to_stat_file = pathlib2.Path(f"/proc/self/fd/{self._fd}")
+        else:
+            self._fd, path_to_stat_file = tempfile.mkstemp(suffix=".stats")
+            self.path_to_stat_file = pathlib2.Path(path_to_stat_file)
+
+    def take_snapshot(self, model: pyscipopt.Model) -> StatFileParser:
+        """
+        Снимает текущую статистику решателя
+        """
+        model.writeStatistics(str(self.path_to_stat_file))
+
+        return StatFileParser(path_to_stat_file=self.path_to_stat_file)
+
+    def close(self) -> t.NoReturn:
+        os.close(self._fd)
+        if not hasattr(os, "memfd_create"):
+            self.path_to_stat_file.unlink()
+
+
+class _StatisticsSnapshotEventhdlr(pyscipopt.Eventhdlr):
+    """
+    Обработчик событий решателя, запрашивающий снимок статистики
+    каждый раз, когда время решения пересекает очередную границу кадра
+
+    Снимки делаются по событию решения узла, поэтому кадр,
+    граница которого пришлась на обработку одного долгого узла,
+    фиксируется по завершении этого узла
+    """
+
+    def __init__(
+        self,
+        *,
+        time_step: float,
+        count_of_frames: int,
+        take_snapshot: t.Callable[[int], t.NoReturn],
+    ):
+        self.time_step = time_step
+        self.count_of_frames = count_of_frames
+        self.take_snapshot = take_snapshot
+        self.next_frame_number = 0
+
+    def eventinit(self):
+        self.model.catchEvent(pyscipopt.SCIP_EVENTTYPE.NODESOLVED, self)
+
+    def eventexit(self):
+        self.model.dropEvent(pyscipopt.SCIP_EVENTTYPE.NODESOLVED, self)
+
+    def eventexec(self, event):
+        # Последний кадр снимается после остановки решателя по времени
+        if self.next_frame_number >= self.count_of_frames - 1:
+            return
+
+        solving_time: float = self.model.getSolvingTime()
+        passed_frame_number = int(solving_time / self.time_step) - 1
+        if passed_frame_number >= self.next_frame_number:
+            # Если за время обработки узла пройдено несколько границ,
+            # фиксируется только последняя из них
+            frame_number = min(passed_frame_number, self.count_of_frames - 2)
+            self.take_snapshot(frame_number)
+            self.next_frame_number = frame_number + 1
+
+
 class SCIPActivitiesInTime:
     """
     Класс развертывания активностей элементов stat-файла во времени
+
+    В режиме `single_pass=True` задача решается один раз, а снимки
+    статистики снимаются по ходу решения и сразу попадают в хранилище
+    (без записи stat-файлов на диск)
     """
 
     def __init__(
@@ -26,6 +105,7 @@ class SCIPActivitiesInTime:
         time_limit: float,
         time_step: float,
         section_names: t.Tuple[str, ...],
+        single_pass: bool = False,
     ):
         self.path_to_lp_file = path_to_lp_file
         self.path_to_set_file = path_to_set_file
@@ -35,6 +115,7 @@ class SCIPActivitiesInTime:
         self.section_names = section_names
 
         self._sections_and_section_names_to_list_rows = collections.defaultdict(list)
+        self._frame_numbers: t.List[int] = []
 
         model = pyscipopt.Model()
         try:
@@ -50,9 +131,19 @@ class SCIPActivitiesInTime:
 
         self.count_of_frames = int(time_limit / time_step)
 
+        if single_pass:
+            self._run_single_pass(model)
+        else:
+            self._run_frame_by_frame(model)
+
+    def _run_frame_by_frame(self, model: pyscipopt.Model) -> t.NoReturn:
+        """
+        Перезапускает решение задачи с увеличивающимся ограничением по времени
+        и после каждого кадра записывает и разбирает stat-файл
+        """
         for frame_number in range(0, self.count_of_frames):
             model.setParam(
-                f"{SCIPAttributes.LIMITS_TIME}", (1 + frame_number) * time_step
+                f"{SCIPAttributes.LIMITS_TIME}", (1 + frame_number) * self.time_step
             )
 
             logger.info(
@@ -80,12 +171,63 @@ class SCIPActivitiesInTime:
                 else:
                     logger.info(f"File '{path_to_stat_file}' was read successfully!")
 
-                for section_name in section_names:
-                    self._preprocessing_to_rolling_elem_activities_in_time(
-                        stat_file=stat_file,
-                        section_name=section_name,
-                        frame_number=frame_number,
-                    )
+                self._store_frame(stat_file=stat_file, frame_number=frame_number)
+
+    def _run_single_pass(self, model: pyscipopt.Model) -> t.NoReturn:
+        """
+        Решает задачу один раз и снимает статистику
+        с шагом `time_step` прямо во время решения
+        """
+        snapshot_writer = _StatisticsSnapshotWriter()
+        snapshot_eventhdlr = _StatisticsSnapshotEventhdlr(
+            time_step=self.time_step,
+            count_of_frames=self.count_of_frames,
+            take_snapshot=lambda frame_number: self._store_frame(
+                stat_file=snapshot_writer.take_snapshot(model),
+                frame_number=frame_number,
+            ),
+        )
+        model.includeEventhdlr(
+            snapshot_eventhdlr,
+            "statistics_snapshot",
+            "Takes statistics snapshots at fixed solving time intervals",
+        )
+        model.setParam(f"{SCIPAttributes.LIMITS_TIME}", self.time_limit)
+
+        logger.info("Problem was launched for calculation (single pass)")
+        try:
+            model.optimize()
+
+            # Последний кадр совпадает с моментом остановки по времени
+            last_frame_number: int = self.count_of_frames - 1
+            if (
+                model.getStatus() == SCIPAttributes.STATUS_TIMELIMIT
+                and snapshot_eventhdlr.next_frame_number <= last_frame_number
+            ):
+                self._store_frame(
+                    stat_file=snapshot_writer.take_snapshot(model),
+                    frame_number=last_frame_number,
+                )
+        finally:
+            snapshot_writer.close()
+
+        logger.info(
+            f"{len(self._frame_numbers)} statistics snapshots were taken in one pass"
+        )
+
+    def _store_frame(
+        self, *, stat_file: StatFileParser, frame_number: int
+    ) -> t.NoReturn:
+        """
+        Помещает секции stat-файла очередного кадра в хранилище
+        """
+        self._frame_numbers.append(frame_number)
+        for section_name in self.section_names:
+            self._preprocessing_to_rolling_elem_activities_in_time(
+                stat_file=stat_file,
+                section_name=section_name,
+                frame_number=frame_number,
+            )
 
     def _preprocessing_to_rolling_elem_activities_in_time(
         self,
@@ -180,6 +322,7 @@ if __name__ == "__main__":
         time_limit=40 * 60,
         time_step=60,
         section_names=SECTION_NAMES,
+        single_pass=True,
     )
 
     activities_in_time.plot(
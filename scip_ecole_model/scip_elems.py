@@ -11,4 +11,8 @@ class SCIPAttributes:
 
     STATUS_TIMELIMIT = "timelimit"
     STATUS_USERINTERRUPT = "userinterrupt"
+    # Досрочная остановка политикой GapStallTermination (решатель
+    # при этом сообщает статус userinterrupt)
+    STATUS_GAPSTALL = "gapstall"
+    STATUS_TREESIZELIMIT = "treesizelimit"
     STATUS_GAPLIMIT = "gaplimit"
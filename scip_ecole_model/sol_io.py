@@ -0,0 +1,222 @@
+import gzip
+import itertools
+import typing as t
+from dataclasses import dataclass
+
+import numpy as np
+import pathlib2
+
+# Строки заголовка sol-файла, не содержащие значений переменных
+_SOL_FILE_HEADER_PREFIXES = (
+    "objective value:",
+    "solution status:",
+    "no solution available",
+    "#",
+)
+_OBJECTIVE_VALUE_PREFIX = "objective value:"
+_OBJ_PREFIX = "(obj:"
+_OBJ_PREFIX_LEN = len(_OBJ_PREFIX)
+_N_TOKENS_IN_LINE = 3
+
+_CHUNK_SIZE = 2**16
+_WRITE_BUFFER_SIZE = 2**20
+
+
+@dataclass
+class SolData:
+    """
+    Класс содержимого sol-файла в виде параллельных массивов
+    """
+
+    names: np.ndarray
+    values: np.ndarray
+    objs: np.ndarray
+    objective_value: t.Optional[float] = None
+
+    def __len__(self) -> int:
+        return self.names.size
+
+    def to_dict(self) -> t.Dict[str, float]:
+        """
+        Преобразует решение в словарь пар "имя_переменной-значение"
+        """
+        return dict(zip(self.names.tolist(), self.values.tolist()))
+
+
+def _open_sol_file(
+    path_to_sol_file: t.Union[str, pathlib2.Path], mode: str = "rt"
+) -> t.IO:
+    """
+    Открывает sol-файл (сжатые gzip файлы открываются прозрачно)
+    """
+    if str(path_to_sol_file).endswith(".gz"):
+        return gzip.open(path_to_sol_file, mode=mode, encoding="utf-8", compresslevel=1)
+
+    return open(
+        path_to_sol_file,
+        mode=mode,
+        encoding="utf-8",
+        buffering=_WRITE_BUFFER_SIZE if "w" in mode else -1,
+    )
+
+
+def _read_sol_file_header(
+    path_to_sol_file: t.Union[str, pathlib2.Path],
+) -> t.Tuple[int, t.Optional[float]]:
+    """
+    Возвращает число строк заголовка и значение целевой функции
+    """
+    n_header_lines = 0
+    objective_value: t.Optional[float] = None
+    with _open_sol_file(path_to_sol_file) as sol_file:
+        for line in sol_file:
+            if not line.startswith(_SOL_FILE_HEADER_PREFIXES):
+                break
+            if line.startswith(_OBJECTIVE_VALUE_PREFIX):
+                objective_value = float(line[len(_OBJECTIVE_VALUE_PREFIX) :])
+            n_header_lines += 1
+
+    return n_header_lines, objective_value
+
+
+def read_sol_file_objective_value(
+    path_to_sol_file: t.Union[str, pathlib2.Path],
+) -> t.Optional[float]:
+    """
+    Читает только значение целевой функции (из заголовка sol-файла)
+    """
+    _, objective_value = _read_sol_file_header(path_to_sol_file)
+
+    return objective_value
+
+
+def _parse_sol_lines(lines: t.List[str], objective_value: t.Optional[float]) -> SolData:
+    """
+    Разбирает блок строк sol-файла вида 'имя значение (obj:коэффициент)'
+    """
+    tokens: t.List[str] = " ".join(lines).split()
+    objs: t.List[str] = tokens[2::_N_TOKENS_IN_LINE]
+
+    # Число токенов может совпасть и при смешении строк разной длины,
+    # поэтому проверяется, что каждый третий токен -- коэффициент
+    if (
+        len(tokens) == _N_TOKENS_IN_LINE * len(lines)
+        and np.char.startswith(np.array(objs, dtype=str), _OBJ_PREFIX).all()
+    ):
+        names, values = (
+            tokens[0::_N_TOKENS_IN_LINE],
+            tokens[1::_N_TOKENS_IN_LINE],
+        )
+    else:
+        # Строки без коэффициентов целевой функции (файлы, подготовленные вручную)
+        names, values, objs = [], [], []
+        for line in lines:
+            line_tokens = line.split()
+            if not line_tokens:
+                continue
+            names.append(line_tokens[0])
+            values.append(line_tokens[1])
+            objs.append(line_tokens[2] if len(line_tokens) > 2 else f"{_OBJ_PREFIX}nan)")
+
+    return SolData(
+        names=np.array(names, dtype=object),
+        values=np.array(values, dtype=np.float64),
+        # Коэффициент целевой функции записан в виде '(obj:<число>)'
+        objs=np.array([obj[_OBJ_PREFIX_LEN:-1] for obj in objs], dtype=np.float64),
+        objective_value=objective_value,
+    )
+
+
+def iter_sol_file_chunks(
+    path_to_sol_file: t.Union[str, pathlib2.Path],
+    chunk_size: int = _CHUNK_SIZE,
+) -> t.Iterator[SolData]:
+    """
+    Читает sol-файл блоками по `chunk_size` строк;
+    объем памяти ограничен размером блока
+    """
+    n_header_lines, objective_value = _read_sol_file_header(path_to_sol_file)
+
+    with _open_sol_file(path_to_sol_file) as sol_file:
+        for _ in range(n_header_lines):
+            next(sol_file)
+
+        while True:
+            lines: t.List[str] = list(itertools.islice(sol_file, chunk_size))
+            if not lines:
+                break
+            yield _parse_sol_lines(lines, objective_value)
+
+
+def read_sol_file(
+    path_to_sol_file: t.Union[str, pathlib2.Path],
+    chunk_size: int = _CHUNK_SIZE,
+) -> SolData:
+    """
+    Читает sol-файл (в том числе sol.gz) в параллельные массивы
+    имен, значений и коэффициентов целевой функции
+    """
+    chunks: t.List[SolData] = list(iter_sol_file_chunks(path_to_sol_file, chunk_size))
+    if not chunks:
+        _, objective_value = _read_sol_file_header(path_to_sol_file)
+        return SolData(
+            names=np.empty(0, dtype=object),
+            values=np.empty(0, dtype=np.float64),
+            objs=np.empty(0, dtype=np.float64),
+            objective_value=objective_value,
+        )
+
+    return SolData(
+        names=np.concatenate([chunk.names for chunk in chunks]),
+        values=np.concatenate([chunk.values for chunk in chunks]),
+        objs=np.concatenate([chunk.objs for chunk in chunks]),
+        objective_value=chunks[0].objective_value,
+    )
+
+
+def write_sol_file(
+    path_to_sol_file: t.Union[str, pathlib2.Path],
+    names: t.Sequence[str],
+    values: np.ndarray,
+    objs: t.Optional[np.ndarray] = None,
+    objective_value: t.Optional[float] = None,
+    write_zeros: bool = False,
+    chunk_size: int = _CHUNK_SIZE,
+) -> t.NoReturn:
+    """
+    Записывает решение в sol-файл в формате решателя SCIP
+    (файлы с расширением .gz сжимаются); строки формируются
+    блоками и записываются одним вызовом на блок
+    """
+    names = np.asarray(names, dtype=object)
+    values = np.asarray(values, dtype=np.float64)
+    objs = (
+        np.zeros(values.size, dtype=np.float64)
+        if objs is None
+        else np.asarray(objs, dtype=np.float64)
+    )
+
+    if not write_zeros:
+        nonzero_mask = values != 0.0
+        names, values, objs = (
+            names[nonzero_mask],
+            values[nonzero_mask],
+            objs[nonzero_mask],
+        )
+
+    with _open_sol_file(path_to_sol_file, mode="wt") as sol_file:
+        if objective_value is not None:
+            sol_file.write(f"{_OBJECTIVE_VALUE_PREFIX:<32}{objective_value:>20.15g}\n")
+
+        for start in range(0, names.size, chunk_size):
+            stop = start + chunk_size
+            sol_file.write(
+                "".join(
+                    f"{name:<32}{value:>20.15g} \t(obj:{obj:.15g})\n"
+                    for name, value, obj in zip(
+                        names[start:stop].tolist(),
+                        values[start:stop].tolist(),
+                        objs[start:stop].tolist(),
+                    )
+                )
+            )
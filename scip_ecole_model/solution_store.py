@@ -0,0 +1,302 @@
+import itertools
+import logging
+import os
+import typing as t
+
+import numpy as np
+import pyscipopt
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.auxiliary_functions import get_file_hash
+from scip_ecole_model.instance_features import InstanceFeatures
+from scip_ecole_model.sol_io import SolData, read_sol_file, write_sol_file
+from scip_ecole_model.variable_index import VariableIndex
+
+
+class SolutionStore:
+    """
+    Локальное хранилище лучших решений прошлых запусков вместе
+    с признаками задач (для 'теплого' старта похожих задач)
+
+    Запись -- сжатый npz-файл: ненулевые значения решения, имена
+    соответствующих переменных и вектор признаков задачи; ключом
+    служит хэш lp-файла, для каждой задачи хранится только лучшее
+    решение. Суммарный размер хранилища ограничен, при превышении
+    лимита вытесняются давно не использовавшиеся записи (LRU)
+    """
+
+    _ENTRY_FILE_EXTENSION = ".npz"
+    _TMP_FILE_PREFIX = ".tmp_"
+    _NAMES_SEPARATOR = "\n"
+
+    def __init__(
+        self,
+        *,
+        path_to_store_dir: PosixPath,
+        max_size_mb: float,
+    ):
+        self.path_to_store_dir = Path(path_to_store_dir)
+        self.max_size_bytes = int(max_size_mb * 1024**2)
+
+        self.path_to_store_dir.mkdir(parents=True, exist_ok=True)
+        # Признаки задач кэшируются рядом с записями
+        self.instance_features = InstanceFeatures(
+            self.path_to_store_dir.joinpath("features")
+        )
+
+    def _get_path_to_entry(self, path_to_lp_file: PosixPath) -> PosixPath:
+        key: str = get_file_hash(path_to_lp_file)
+
+        return self.path_to_store_dir.joinpath(f"{key}{self._ENTRY_FILE_EXTENSION}")
+
+    def _iter_entries(self) -> t.Iterator[PosixPath]:
+        return (
+            path
+            for path in self.path_to_store_dir.glob(f"*{self._ENTRY_FILE_EXTENSION}")
+            if not path.name.startswith(self._TMP_FILE_PREFIX)
+        )
+
+    def extract_features(
+        self, path_to_lp_file: PosixPath, logger: logging.Logger
+    ) -> t.Dict[str, float]:
+        """
+        Возвращает признаки задачи (из кэша хранилища, если они есть)
+        """
+        return self.instance_features.extract(path_to_lp_file, logger)
+
+    def add(
+        self,
+        path_to_lp_file: PosixPath,
+        path_to_sol_file: PosixPath,
+        features: t.Dict[str, float],
+        logger: logging.Logger,
+    ) -> bool:
+        """
+        Добавляет решение из sol-файла (результат `write_results_and_stats`),
+        если для задачи еще нет решения лучше; возвращает True, если
+        решение записано
+        """
+        try:
+            sol: SolData = read_sol_file(path_to_sol_file)
+        except OSError as err:
+            logger.warning(f"Solution was not stored: {err}")
+            return False
+        if sol.objective_value is None:
+            logger.warning(f"Solution file `{path_to_sol_file.name}` has no objective")
+            return False
+
+        path_to_entry = self._get_path_to_entry(path_to_lp_file)
+        if path_to_entry.exists():
+            with np.load(path_to_entry) as entry:
+                stored_objective_value = float(entry["objective_value"])
+            sense = -1.0 if features.get("is_maximize", 0.0) else 1.0
+            if sense * stored_objective_value <= sense * sol.objective_value:
+                os.utime(path_to_entry)
+                logger.info(
+                    f"Stored solution of `{Path(path_to_lp_file).name}` "
+                    f"({stored_objective_value:.8g}) is not worse, store is unchanged"
+                )
+                return False
+
+        nonzero_mask = sol.values != 0.0
+        feature_names = sorted(features)
+        path_to_tmp_file = self.path_to_store_dir.joinpath(
+            f"{self._TMP_FILE_PREFIX}{os.getpid()}_{path_to_entry.name}"
+        )
+        try:
+            # Имена хранятся одним байтовым блоком, что заметно компактнее
+            # массива строк фиксированной ширины
+            with open(path_to_tmp_file, mode="wb") as fo:
+                np.savez_compressed(
+                    fo,
+                    names=np.frombuffer(
+                        self._NAMES_SEPARATOR.join(
+                            sol.names[nonzero_mask].tolist()
+                        ).encode("utf-8"),
+                        dtype=np.uint8,
+                    ),
+                    values=sol.values[nonzero_mask],
+                    objective_value=np.float64(sol.objective_value),
+                    problem_name=np.str_(Path(path_to_lp_file).stem),
+                    feature_names=np.array(feature_names, dtype=np.str_),
+                    feature_values=np.array(
+                        [features[name] for name in feature_names], dtype=np.float64
+                    ),
+                )
+            os.replace(path_to_tmp_file, path_to_entry)
+        except OSError as err:
+            logger.warning(f"Solution was not stored: {err}")
+            return False
+
+        logger.info(
+            f"Solution of `{Path(path_to_lp_file).name}` "
+            f"({sol.objective_value:.8g}) has been stored to `{path_to_entry}`"
+        )
+        self._evict(logger=logger)
+
+        return True
+
+    def load(self, path_to_entry: PosixPath) -> SolData:
+        """
+        Читает решение записи хранилища (только ненулевые значения)
+        """
+        with np.load(path_to_entry) as entry:
+            names_blob: bytes = entry["names"].tobytes()
+            values: np.ndarray = entry["values"]
+            objective_value = float(entry["objective_value"])
+        os.utime(path_to_entry)
+
+        names = np.array(
+            (
+                names_blob.decode("utf-8").split(self._NAMES_SEPARATOR)
+                if names_blob
+                else []
+            ),
+            dtype=object,
+        )
+
+        return SolData(
+            names=names,
+            values=values,
+            objs=np.zeros(values.size, dtype=np.float64),
+            objective_value=objective_value,
+        )
+
+    def find_similar(
+        self, features: t.Dict[str, float], n_neighbors: int
+    ) -> t.List[PosixPath]:
+        """
+        Возвращает записи задач, ближайших по признакам (евклидово
+        расстояние по стандартизованным логарифмам признаков)
+        """
+        paths_to_entries: t.List[PosixPath] = list(self._iter_entries())
+        if not paths_to_entries or n_neighbors <= 0:
+            return []
+
+        feature_names = sorted(features)
+        feature_matrix = np.empty(
+            (len(paths_to_entries) + 1, len(feature_names)), dtype=np.float64
+        )
+        feature_matrix[0] = [features[name] for name in feature_names]
+        for row, path_to_entry in enumerate(paths_to_entries, start=1):
+            with np.load(path_to_entry) as entry:
+                stored = dict(
+                    zip(entry["feature_names"].tolist(), entry["feature_values"])
+                )
+            feature_matrix[row] = [stored.get(name, np.nan) for name in feature_names]
+
+        # Признаки сильно различаются масштабом, поэтому сравниваются логарифмы
+        feature_matrix = np.sign(feature_matrix) * np.log1p(np.abs(feature_matrix))
+        stds = np.nanstd(feature_matrix, axis=0)
+        feature_matrix = (feature_matrix - feature_matrix[0]) / np.where(
+            stds > 0.0, stds, 1.0
+        )
+        distances = np.sqrt(np.nansum(feature_matrix[1:] ** 2, axis=1))
+        nearest = np.argsort(distances, kind="stable")[:n_neighbors]
+
+        return [paths_to_entries[position] for position in nearest.tolist()]
+
+    def find_warm_starts(
+        self,
+        var_index: VariableIndex,
+        features: t.Dict[str, float],
+        n_warm_starts: int,
+        logger: logging.Logger,
+    ) -> t.List[np.ndarray]:
+        """
+        Отображает решения ближайших задач на переменные модели по именам
+        (в порядке индекса); значения приводятся к границам и типам
+        переменных, решения без общих переменных пропускаются
+        """
+        is_integer = var_index.vtypes != "CONTINUOUS"
+        warm_starts: t.List[np.ndarray] = []
+        for path_to_entry in self.find_similar(features, n_warm_starts):
+            sol = self.load(path_to_entry)
+            positions = var_index.positions_of(sol.names, allow_missing=True)
+            found_mask = positions >= 0
+            if sol.names.size and not found_mask.any():
+                continue
+
+            x = np.zeros(len(var_index), dtype=np.float64)
+            x[positions[found_mask]] = sol.values[found_mask]
+            x = np.where(is_integer, np.round(x), x)
+            warm_starts.append(np.clip(x, var_index.lbs, var_index.ubs))
+            logger.info(
+                f"Warm start from `{path_to_entry.name}` "
+                f"(objective value: {sol.objective_value:.8g}): "
+                f"{int(found_mask.sum())} of {sol.names.size} nonzero values mapped"
+            )
+
+        return warm_starts
+
+    def _iter_cached_features(self) -> t.Iterator[PosixPath]:
+        return (
+            path
+            for path in self.instance_features.path_to_cache_dir.glob(
+                f"*{self.instance_features._CACHE_FILE_EXTENSION}"
+            )
+            if not path.name.startswith(self._TMP_FILE_PREFIX)
+        )
+
+    def _evict(self, logger: logging.Logger) -> t.NoReturn:
+        """
+        Удаляет наиболее давно использованные записи и кэшированные
+        признаки задач, пока суммарный размер хранилища превышает лимит
+        (файлы, уже удаленные другим процессом, пропускаются)
+        """
+        files: t.List[t.Tuple[PosixPath, os.stat_result]] = []
+        for path in itertools.chain(self._iter_entries(), self._iter_cached_features()):
+            try:
+                files.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        files.sort(key=lambda file: file[1].st_mtime)
+        total_size: int = sum(stat.st_size for _, stat in files)
+
+        for path, stat in files:
+            if total_size <= self.max_size_bytes:
+                break
+            total_size -= stat.st_size
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            logger.info(f"Stored file `{path.name}` has been evicted")
+
+
+def write_warm_start_file(
+    path_to_sol_file: PosixPath, var_index: VariableIndex, x: np.ndarray
+) -> t.NoReturn:
+    """
+    Записывает 'теплый' старт хранилища в sol-файл (для сценариев,
+    которые читают задачу заново и принимают только sol-файл)
+    """
+    write_sol_file(
+        path_to_sol_file,
+        names=var_index.names,
+        values=x,
+        objs=var_index.objs,
+        objective_value=float(var_index.objs @ x),
+    )
+
+
+def add_warm_starts(
+    model: pyscipopt.scip.Model,
+    var_index: VariableIndex,
+    warm_starts: t.Sequence[np.ndarray],
+    logger: logging.Logger,
+) -> int:
+    """
+    Передает решателю несколько решений для 'теплого' старта (addSol);
+    задаются только ненулевые значения; возвращает число принятых решений
+    """
+    n_accepted = 0
+    for x in warm_starts:
+        sol: pyscipopt.scip.Solution = model.createSol()
+        for position in np.flatnonzero(x).tolist():
+            model.setSolVal(sol, var_index.vars_[position], x[position])
+        n_accepted += bool(model.addSol(sol))
+
+    logger.info(f"{n_accepted} of {len(warm_starts)} warm starts have been added")
+
+    return n_accepted
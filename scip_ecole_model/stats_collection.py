@@ -0,0 +1,230 @@
+import concurrent.futures
+import os
+import typing as t
+
+import pandas as pd
+import pathlib2
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.parser import ServiceAttributes, StatFileParser
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+_LONG_TABLE_COLUMNS = ("run", "section", "element", "column", "value")
+_INDEX_COLUMNS = ["section", "element"]
+_CATEGORY_COLUMNS = ("run", "section", "element", "column")
+
+
+def _to_first_seen_category(values: pd.Series) -> pd.Series:
+    """
+    Приводит столбец к категориальному типу с категориями
+    в порядке первого появления (а не в алфавитном)
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Категории уже упорядочены (например, при чтении сохраненной коллекции)
+        return values
+
+    return pd.Series(
+        pd.Categorical(values, categories=pd.unique(values)), index=values.index
+    )
+
+
+def _stat_file_to_long_table(path_to_stat_file: PosixPath) -> pd.DataFrame:
+    """
+    Разбирает stat-файл и приводит все его табличные секции
+    к длинному формату (run, section, element, column, value)
+    """
+    stat_file = StatFileParser(path_to_stat_file=path_to_stat_file)
+
+    section_names: t.List[str] = [
+        key
+        for key, value in stat_file._structure_of_doc.items()
+        if "." not in key
+        and isinstance(value, list)
+        and key not in ServiceAttributes._INVALID_SECTIONS
+    ]
+
+    long_tables: t.List[pd.DataFrame] = []
+    for section_name in section_names:
+        try:
+            section: pd.DataFrame = stat_file.get_section(section_name)
+        except (ValueError, TypeError) as err:
+            # Строки секции не согласуются с ее заголовком
+            # (например, в stat-файлах других версий SCIP)
+            logger.debug(
+                f"Section `{section_name}` of `{Path(path_to_stat_file).name}` "
+                f"was skipped: {err}"
+            )
+            continue
+
+        long_table = section.stack().reset_index()
+        long_table.columns = ["element", "column", "value"]
+        long_table.insert(0, "section", section_name)
+        long_tables.append(long_table)
+
+    if not long_tables:
+        return pd.DataFrame(columns=_LONG_TABLE_COLUMNS)
+
+    long_table = pd.concat(long_tables, ignore_index=True)
+    long_table.insert(0, "run", Path(path_to_stat_file).stem)
+
+    return long_table
+
+
+class _StatsCollectionRun:
+    """
+    Представление одного запуска из коллекции с интерфейсом StatFileParser.get_section,
+    поэтому его можно передавать во все функции отрисовки модуля parser
+    """
+
+    def __init__(self, collection: "StatsCollection", run: str):
+        self._collection = collection
+        self.run = run
+
+    def get_section(self, section_name: str) -> pd.DataFrame:
+        return self._collection.get_section(self.run, section_name)
+
+
+class StatsCollection:
+    """
+    Колоночное хранилище статистики множества stat-файлов
+
+    Все табличные секции всех запусков приводятся к одной таблице
+    длинного формата (run, section, element, column, value)
+    с индексом (section, element); сравнения запусков и срезы
+    для графиков выполняются запросами к этой таблице без повторного
+    разбора stat-файлов
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        table = table.reset_index() if table.index.names == _INDEX_COLUMNS else table
+        table = table.loc[:, list(_LONG_TABLE_COLUMNS)].astype({"value": "float64"})
+        for column in _CATEGORY_COLUMNS:
+            table[column] = _to_first_seen_category(table[column])
+        # Сортируются только секции (в порядке первого появления); устойчивая
+        # сортировка сохраняет порядок элементов и столбцов stat-файла
+        self._table: pd.DataFrame = table.set_index(_INDEX_COLUMNS).sort_index(
+            level="section", sort_remaining=False, kind="stable"
+        )
+
+    @classmethod
+    def from_dir(
+        cls,
+        path_to_stats_dir: t.Union[str, pathlib2.Path],
+        *,
+        pattern: str = "*.stats",
+        n_workers: t.Optional[int] = None,
+    ) -> "StatsCollection":
+        """
+        Параллельно разбирает все stat-файлы директории
+        """
+        paths_to_stat_files: t.List[PosixPath] = sorted(
+            Path(path_to_stats_dir).glob(pattern)
+        )
+        if not paths_to_stat_files:
+            raise FileNotFoundError(
+                f"No files matching `{pattern}` in `{path_to_stats_dir}`"
+            )
+
+        n_workers = min(n_workers or os.cpu_count() or 1, len(paths_to_stat_files))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+            long_tables: t.List[pd.DataFrame] = list(
+                executor.map(_stat_file_to_long_table, paths_to_stat_files)
+            )
+
+        logger.info(
+            f"{len(paths_to_stat_files)} stats files from `{path_to_stats_dir}` "
+            f"have been loaded into the collection"
+        )
+
+        return cls(pd.concat(long_tables, ignore_index=True))
+
+    @classmethod
+    def load(cls, path_to_file: t.Union[str, pathlib2.Path]) -> "StatsCollection":
+        """
+        Читает коллекцию из parquet- или feather-файла
+        """
+        path_to_file = Path(path_to_file)
+        if path_to_file.suffix == ".feather":
+            table = pd.read_feather(path_to_file)
+        else:
+            table = pd.read_parquet(path_to_file)
+
+        return cls(table)
+
+    def save(self, path_to_file: t.Union[str, pathlib2.Path]) -> t.NoReturn:
+        """
+        Записывает коллекцию в parquet- или feather-файл
+        (формат определяется по расширению)
+        """
+        path_to_file = Path(path_to_file)
+        table = self._table.reset_index()
+        if path_to_file.suffix == ".feather":
+            table.to_feather(path_to_file)
+        else:
+            table.to_parquet(path_to_file, index=False)
+
+    @property
+    def table(self) -> pd.DataFrame:
+        return self._table
+
+    @property
+    def runs(self) -> t.List[str]:
+        return self._table["run"].cat.categories.to_list()
+
+    @property
+    def sections(self) -> t.List[str]:
+        return self._table.index.get_level_values("section").unique().to_list()
+
+    def get_run(self, run: str) -> _StatsCollectionRun:
+        """
+        Возвращает представление запуска, совместимое
+        с функциями отрисовки модуля parser
+        """
+        if run not in self.runs:
+            raise KeyError(f"Run `{run}` is not in the collection")
+
+        return _StatsCollectionRun(self, run)
+
+    def _get_section_rows(self, section_name: str) -> pd.DataFrame:
+        if section_name in ServiceAttributes._INVALID_SECTIONS:
+            raise KeyError(f"Section `{section_name}` cannot be read as a table")
+
+        return self._table.xs(section_name, level="section")
+
+    def get_section(self, run: str, section_name: str) -> pd.DataFrame:
+        """
+        Возвращает секцию запуска в том же виде,
+        что и StatFileParser.get_section
+        """
+        rows = self._get_section_rows(section_name)
+        rows = rows.loc[rows["run"] == run]
+
+        section = rows.pivot_table(
+            index="element", columns="column", values="value", observed=True
+        )
+        section = section.loc[rows.index.unique(), list(rows["column"].unique())]
+        section.index = section.index.astype(str)
+        section.index.name = section_name
+        section.columns = section.columns.astype(str)
+        section.columns.name = None
+
+        return section
+
+    def cross_section(self, section_name: str, column: str) -> pd.DataFrame:
+        """
+        Возвращает срез секции по одному столбцу
+        для всех запусков (строки -- элементы секции, столбцы -- запуски)
+        """
+        rows = self._get_section_rows(section_name)
+        rows = rows.loc[rows["column"] == column]
+
+        cross_section = rows.pivot_table(
+            index="element", columns="run", values="value", observed=True
+        )
+        cross_section = cross_section.loc[rows.index.unique()]
+        cross_section.index = cross_section.index.astype(str)
+        cross_section.index.name = section_name
+        cross_section.columns = cross_section.columns.astype(str)
+        cross_section.columns.name = None
+
+        return cross_section
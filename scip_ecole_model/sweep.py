@@ -0,0 +1,349 @@
+import concurrent.futures
+import itertools
+import logging
+import os
+import typing as t
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import pyscipopt
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.anytime_metrics import (
+    DEFAULT_TARGET_GAPS,
+    BoundTrajectory,
+    compute_primal_integral,
+    get_time_to_gap_key,
+)
+from scip_ecole_model.auxiliary_functions import (
+    get_stats_before_solving,
+    read_scip_solver_settings_file,
+    write_results_and_stats,
+)
+from scip_ecole_model.model_loader import load_problem
+from scip_ecole_model.optimize import scip_optimize
+from scip_ecole_model.problem_cache import ProblemCache
+from scip_ecole_model.scip_elems import SCIPAttributes
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+_RESULTS_COLUMNS = (
+    "instance",
+    "settings",
+    "params",
+    "status",
+    "objective",
+    "gap",
+    "time",
+    "nodes",
+    "n_sols",
+    "primal_integral",
+    "primal_dual_integral",
+    "time_to_first_sol",
+    "output_dir",
+)
+
+
+@dataclass(frozen=True)
+class SweepJob:
+    """
+    Класс задания перебора: одна задача с одним вариантом настроек
+    """
+
+    path_to_lp_file: PosixPath
+    path_to_settings_file: PosixPath
+    path_to_job_output_dir: PosixPath
+    label: str
+    instance_label: str
+    param_overrides: dict = field(default_factory=dict)
+    time_limit: t.Optional[float] = None
+    path_to_problem_cache_dir: t.Optional[PosixPath] = None
+    problem_cache_max_size_mb: float = 4096
+    target_gaps: t.Tuple[float, ...] = DEFAULT_TARGET_GAPS
+
+
+def build_param_grid(param_grid: t.Optional[dict] = None) -> t.List[dict]:
+    """
+    Разворачивает сетку параметров {параметр: [значения]}
+    в список словарей-комбинаций
+    """
+    if not param_grid:
+        return [{}]
+
+    param_names = list(param_grid.keys())
+
+    return [
+        dict(zip(param_names, values))
+        for values in itertools.product(*(param_grid[name] for name in param_names))
+    ]
+
+
+def _make_unique_labels(paths: t.Sequence[PosixPath]) -> t.Dict[PosixPath, str]:
+    """
+    Формирует метки файлов (задач или set-файлов): имя файла без расширения,
+    а для файлов с одинаковыми именами в разных директориях -- путь
+    относительно общей директории (с точками вместо разделителей)
+    """
+    paths = [Path(path) for path in paths]
+    stem_counts = Counter(path.stem for path in paths)
+    common_dir = (
+        os.path.commonpath([str(path.resolve().parent) for path in paths])
+        if paths
+        else ""
+    )
+
+    labels: t.Dict[PosixPath, str] = {}
+    for path in paths:
+        if stem_counts[path.stem] == 1:
+            labels[path] = path.stem
+            continue
+        relative_path = Path(os.path.relpath(path.resolve(), common_dir))
+        # Расширение сохраняется только у файлов одной директории,
+        # различающихся лишь расширением (`a.lp` и `a.mps`)
+        if not any(
+            other_path.resolve() != path.resolve()
+            and other_path.resolve().parent == path.resolve().parent
+            and other_path.stem == path.stem
+            for other_path in paths
+        ):
+            relative_path = relative_path.with_suffix("")
+        labels[path] = ".".join(relative_path.parts)
+
+    return labels
+
+
+def _make_job_label(settings_label: str, param_overrides: dict) -> str:
+    """
+    Формирует уникальную метку задания по метке set-файла
+    и переопределенным параметрам
+    """
+    label_parts = [settings_label]
+    label_parts.extend(
+        f"{param_name.replace('/', '.')}={value}"
+        for param_name, value in param_overrides.items()
+    )
+
+    return "__".join(label_parts)
+
+
+def build_sweep_jobs(
+    *,
+    paths_to_lp_files: t.Sequence[PosixPath],
+    paths_to_settings_files: t.Sequence[PosixPath],
+    path_to_output_dir: PosixPath,
+    param_grid: t.Optional[dict] = None,
+    time_limit: t.Optional[float] = None,
+    path_to_problem_cache_dir: t.Optional[PosixPath] = None,
+    target_gaps: t.Sequence[float] = DEFAULT_TARGET_GAPS,
+) -> t.List[SweepJob]:
+    """
+    Строит декартово произведение задач, set-файлов и сетки параметров;
+    каждое задание получает собственную директорию результатов
+    """
+    instance_labels = _make_unique_labels(paths_to_lp_files)
+    settings_labels = _make_unique_labels(paths_to_settings_files)
+    jobs: t.List[SweepJob] = []
+    for path_to_lp_file in paths_to_lp_files:
+        instance_label: str = instance_labels[Path(path_to_lp_file)]
+        for path_to_settings_file in paths_to_settings_files:
+            for param_overrides in build_param_grid(param_grid):
+                label = _make_job_label(
+                    settings_labels[Path(path_to_settings_file)], param_overrides
+                )
+                jobs.append(
+                    SweepJob(
+                        path_to_lp_file=Path(path_to_lp_file),
+                        path_to_settings_file=Path(path_to_settings_file),
+                        path_to_job_output_dir=Path(path_to_output_dir).joinpath(
+                            instance_label, label
+                        ),
+                        label=label,
+                        instance_label=instance_label,
+                        param_overrides=param_overrides,
+                        time_limit=time_limit,
+                        path_to_problem_cache_dir=path_to_problem_cache_dir,
+                        target_gaps=tuple(target_gaps),
+                    )
+                )
+
+    return jobs
+
+
+def _run_sweep_job(job: SweepJob) -> dict:
+    """
+    Решает задачу одного задания (выполняется в дочернем процессе)
+    """
+    scip_params: dict = read_scip_solver_settings_file(job.path_to_settings_file)
+    scip_params.update(job.param_overrides)
+    if job.time_limit is not None:
+        scip_params[SCIPAttributes.LIMITS_TIME] = job.time_limit
+
+    problem_cache: t.Optional[ProblemCache] = (
+        ProblemCache(
+            path_to_cache_dir=job.path_to_problem_cache_dir,
+            max_size_mb=job.problem_cache_max_size_mb,
+        )
+        if job.path_to_problem_cache_dir is not None
+        else None
+    )
+
+    model: pyscipopt.scip.Model = load_problem(
+        path_to_lp_file=job.path_to_lp_file,
+        logger=logger,
+        problem_cache=problem_cache,
+    )
+    # Журналы параллельно работающих решателей не должны перемешиваться
+    model.hideOutput()
+    stats_before_solving: t.NamedTuple = get_stats_before_solving(
+        model=model, logger=logger
+    )
+    bound_trajectory = BoundTrajectory()
+    bound_trajectory.attach(model)
+
+    model = scip_optimize(
+        model_scip=model,
+        scip_params=scip_params,
+        path_to_warm_start_file=None,
+        logger=logger,
+        use_warm_start=False,
+    )
+
+    job.path_to_job_output_dir.mkdir(parents=True, exist_ok=True)
+    n_sols: int = model.getNSols()
+    if n_sols > 0:
+        write_results_and_stats(
+            problem_name=job.label,
+            model=model,
+            stats_before_solving=stats_before_solving,
+            path_to_output_dir=job.path_to_job_output_dir,
+            logger=logger,
+            bound_trajectory=bound_trajectory,
+            target_gaps=job.target_gaps,
+        )
+    else:
+        model.writeStatistics(
+            str(job.path_to_job_output_dir.joinpath(f"{job.label}.stats"))
+        )
+
+    return {
+        "instance": job.instance_label,
+        "settings": job.path_to_settings_file.name,
+        "params": job.param_overrides,
+        "status": model.getStatus(),
+        "objective": model.getObjVal() if n_sols > 0 else float("nan"),
+        "gap": model.getGap(),
+        "time": model.getSolvingTime(),
+        "nodes": model.getNTotalNodes(),
+        "n_sols": n_sols,
+        "output_dir": str(job.path_to_job_output_dir),
+        **bound_trajectory.compute_metrics(model, job.target_gaps),
+        "trajectory": bound_trajectory.to_dict(model),
+    }
+
+
+def _recompute_primal_integrals(rows: t.Sequence[dict]) -> t.NoReturn:
+    """
+    Пересчитывает примальный интеграл каждого запуска относительно
+    лучшего решения задачи по всем запускам (эталоном в самом запуске
+    служит его собственное решение, и такие интегралы несравнимы)
+    """
+    trajectory_rows: t.Dict[str, t.List[dict]] = {}
+    for row in rows:
+        if row.get("trajectory") is not None:
+            trajectory_rows.setdefault(row["instance"], []).append(row)
+
+    for instance_rows in trajectory_rows.values():
+        objectives = [
+            row["objective"] for row in instance_rows if np.isfinite(row["objective"])
+        ]
+        if not objectives:
+            continue
+        is_maximize: bool = (
+            instance_rows[0]["trajectory"]["objective_sense"] == "maximize"
+        )
+        best_objective: float = max(objectives) if is_maximize else min(objectives)
+        for row in instance_rows:
+            trajectory: dict = row["trajectory"]
+            primal_bounds = np.array(
+                [
+                    np.inf if value is None else value
+                    for value in trajectory["primal_bounds"]
+                ],
+                dtype=np.float64,
+            )
+            row["primal_integral"] = compute_primal_integral(
+                np.array(trajectory["times"], dtype=np.float64),
+                primal_bounds,
+                row["time"],
+                best_objective,
+            )
+
+
+def run_sweep(
+    *,
+    jobs: t.Sequence[SweepJob],
+    path_to_results_file: PosixPath,
+    logger: logging.Logger,
+    n_workers: t.Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Запускает задания перебора параллельно в пуле процессов
+    и записывает сводную таблицу результатов
+    """
+    if not jobs:
+        logger.warning("Sweep has no jobs, nothing to run")
+        return pd.DataFrame(columns=_RESULTS_COLUMNS)
+
+    # Решатель SCIP однопоточный, поэтому одно задание -- одно ядро
+    n_workers = min(n_workers or os.cpu_count() or 1, len(jobs))
+    logger.info(f"Sweep of {len(jobs)} jobs has been started on {n_workers} workers")
+
+    rows: t.List[dict] = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        future_to_job = {executor.submit(_run_sweep_job, job): job for job in jobs}
+        for future in concurrent.futures.as_completed(future_to_job):
+            job = future_to_job[future]
+            try:
+                row = future.result()
+            except (Exception, SystemExit) as err:
+                logger.error(f"Job `{job.label}` ({job.path_to_lp_file.name}): {err}")
+                row = {
+                    "instance": job.instance_label,
+                    "settings": job.path_to_settings_file.name,
+                    "params": job.param_overrides,
+                    "status": "error",
+                    "output_dir": str(job.path_to_job_output_dir),
+                }
+            else:
+                logger.info(
+                    f"Job `{row['settings']}` {row['params']} ({row['instance']}) "
+                    f"has been finished [{row['status']}]"
+                )
+            rows.append(row)
+
+    _recompute_primal_integrals(rows)
+
+    # Время до целевых зазоров -- отдельный столбец на каждый зазор
+    time_to_gap_columns = list(
+        dict.fromkeys(
+            get_time_to_gap_key(target_gap)
+            for job in jobs
+            for target_gap in job.target_gaps
+        )
+    )
+    results = pd.DataFrame.from_records(
+        rows,
+        columns=[*_RESULTS_COLUMNS[:-1], *time_to_gap_columns, _RESULTS_COLUMNS[-1]],
+    ).sort_values(by=["instance", "gap", "primal_integral", "time"], na_position="last")
+    results["params"] = results["params"].astype(str)
+
+    path_to_results_file = Path(path_to_results_file)
+    path_to_results_file.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(path_to_results_file, index=False)
+    logger.info(
+        f"Sweep results have been written to `{path_to_results_file}`:\n"
+        f"{results.drop(columns=['output_dir']).to_string(index=False)}"
+    )
+
+    return results
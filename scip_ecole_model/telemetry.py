@@ -0,0 +1,106 @@
+import logging
+import time
+import typing as t
+
+import numpy as np
+import pandas as pd
+import pathlib2
+
+_TRACE_FIELDS = ("step", "reward", "nb_nodes", "time", "action_set_size")
+
+
+class StepTelemetry:
+    """
+    Телеметрия шагов цикла ветвления Ecole
+
+    Значения шагов записываются в заранее выделенные кольцевые буферы
+    (хранятся последние `capacity` шагов), а журнал ведется выборочно:
+    раз в `log_every_n_steps` шагов или раз в `log_every_seconds` секунд
+    """
+
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        capacity: int = 2**16,
+        log_every_n_steps: int = 1000,
+        log_every_seconds: float = 30.0,
+    ):
+        self.logger = logger
+        self.capacity = capacity
+        self.log_every_n_steps = log_every_n_steps
+        self.log_every_seconds = log_every_seconds
+
+        self._step = np.zeros(capacity, dtype=np.int64)
+        self._reward = np.zeros(capacity, dtype=np.float64)
+        self._nb_nodes = np.zeros(capacity, dtype=np.float64)
+        self._time = np.zeros(capacity, dtype=np.float64)
+        self._action_set_size = np.zeros(capacity, dtype=np.int32)
+
+        self.n_steps = 0
+        self._last_log_time = time.monotonic()
+
+    def record(
+        self,
+        *,
+        reward: float,
+        nb_nodes: float,
+        time_: float,
+        action_set_size: int,
+    ) -> t.NoReturn:
+        """
+        Записывает очередной шаг в буферы
+        """
+        pos = self.n_steps % self.capacity
+        self._step[pos] = self.n_steps
+        self._reward[pos] = reward
+        self._nb_nodes[pos] = nb_nodes
+        self._time[pos] = time_
+        self._action_set_size[pos] = action_set_size
+        self.n_steps += 1
+
+        if self.n_steps % self.log_every_n_steps == 0:
+            self._log(pos)
+        else:
+            now = time.monotonic()
+            if now - self._last_log_time >= self.log_every_seconds:
+                self._log(pos)
+
+    def _log(self, pos: int) -> t.NoReturn:
+        self._last_log_time = time.monotonic()
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
+        self.logger.info(
+            f"\n\tStep in environment [iter={self._step[pos]}]\n"
+            f"\taction_set size: {self._action_set_size[pos]}\n"
+            f"\treward: {self._reward[pos]}\n"
+            f"\tnb_nodes: {self._nb_nodes[pos]}\n"
+            f"\ttime: {self._time[pos]:.2f}\n"
+        )
+
+    def as_dict(self) -> t.Dict[str, np.ndarray]:
+        """
+        Возвращает трассу шагов в хронологическом порядке
+        """
+        n_stored = min(self.n_steps, self.capacity)
+        order = (np.arange(n_stored) + max(self.n_steps - self.capacity, 0)) % (
+            self.capacity
+        )
+
+        return {
+            "step": self._step[order],
+            "reward": self._reward[order],
+            "nb_nodes": self._nb_nodes[order],
+            "time": self._time[order],
+            "action_set_size": self._action_set_size[order],
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.as_dict(), columns=_TRACE_FIELDS).set_index("step")
+
+    def save(self, path_to_trace_file: t.Union[str, pathlib2.Path]) -> t.NoReturn:
+        """
+        Записывает трассу шагов в npz-файл
+        """
+        np.savez_compressed(str(path_to_trace_file), **self.as_dict())
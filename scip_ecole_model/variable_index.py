@@ -0,0 +1,156 @@
+import typing as t
+
+import numpy as np
+import pandas as pd
+import pyscipopt
+
+
+class VariableIndex:
+    """
+    Индекс переменных модели, строится один раз на модель
+
+    Хранит отображение "имя переменной -> позиция" (хэш-таблица)
+    и массивы коэффициентов целевой функции, границ и типов переменных,
+    что позволяет выполнять пакетные запросы по списку имен без
+    перебора всех переменных модели
+    """
+
+    def __init__(
+        self,
+        vars_: t.Sequence[pyscipopt.scip.Variable],
+        *,
+        transformed: bool = False,
+    ):
+        self.vars_: t.List[pyscipopt.scip.Variable] = list(vars_)
+        n_vars = len(self.vars_)
+
+        self.names: np.ndarray = np.array([var.name for var in self.vars_], dtype=object)
+        self._positions = pd.Index(self.names)
+        if not self._positions.is_unique:
+            raise ValueError("Variable names must be unique to build the index")
+
+        self.objs: np.ndarray = np.fromiter(
+            (var.getObj() for var in self.vars_), dtype=np.float64, count=n_vars
+        )
+        if transformed:
+            self.lbs: np.ndarray = np.fromiter(
+                (var.getLbGlobal() for var in self.vars_),
+                dtype=np.float64,
+                count=n_vars,
+            )
+            self.ubs: np.ndarray = np.fromiter(
+                (var.getUbGlobal() for var in self.vars_),
+                dtype=np.float64,
+                count=n_vars,
+            )
+        else:
+            self.lbs = np.fromiter(
+                (var.getLbOriginal() for var in self.vars_),
+                dtype=np.float64,
+                count=n_vars,
+            )
+            self.ubs = np.fromiter(
+                (var.getUbOriginal() for var in self.vars_),
+                dtype=np.float64,
+                count=n_vars,
+            )
+        self.vtypes: np.ndarray = np.array([var.vtype() for var in self.vars_])
+
+    @classmethod
+    def from_model(
+        cls, model: pyscipopt.scip.Model, *, transformed: bool = False
+    ) -> "VariableIndex":
+        """
+        Строит индекс по всем переменным модели
+        """
+        return cls(model.getVars(transformed=transformed), transformed=transformed)
+
+    def __len__(self) -> int:
+        return len(self.vars_)
+
+    def __contains__(self, var_name: str) -> bool:
+        return var_name in self._positions
+
+    def position_of(self, var_name: str) -> int:
+        """
+        Возвращает позицию переменной по ее имени
+        """
+        return self._positions.get_loc(var_name)
+
+    def positions_of(
+        self, var_names: t.Iterable[str], *, allow_missing: bool = False
+    ) -> np.ndarray:
+        """
+        Возвращает позиции переменных по списку имен (пакетно);
+        для отсутствующих в модели имен -- -1, если `allow_missing=True`
+        """
+        positions: np.ndarray = self._positions.get_indexer(
+            np.asarray(list(var_names), dtype=object)
+        )
+        if not allow_missing and (positions < 0).any():
+            missing_names = np.asarray(list(var_names), dtype=object)[positions < 0]
+            raise KeyError(
+                f"{missing_names.size} variables are not in the model "
+                f"(e.g. `{missing_names[0]}`)"
+            )
+
+        return positions
+
+    def var_by_name(self, var_name: str) -> pyscipopt.scip.Variable:
+        return self.vars_[self.position_of(var_name)]
+
+    def objs_for(self, var_names: t.Iterable[str]) -> np.ndarray:
+        """
+        Возвращает коэффициенты целевой функции при переменных
+        """
+        return self.objs[self.positions_of(var_names)]
+
+    def bounds_for(self, var_names: t.Iterable[str]) -> t.Tuple[np.ndarray, np.ndarray]:
+        """
+        Возвращает нижние и верхние границы переменных
+        """
+        positions = self.positions_of(var_names)
+
+        return self.lbs[positions], self.ubs[positions]
+
+    def vtypes_for(self, var_names: t.Iterable[str]) -> np.ndarray:
+        """
+        Возвращает типы переменных
+        """
+        return self.vtypes[self.positions_of(var_names)]
+
+    def values_for(
+        self,
+        var_names: t.Iterable[str],
+        model: pyscipopt.scip.Model,
+        sol: t.Optional[pyscipopt.scip.Solution] = None,
+    ) -> np.ndarray:
+        """
+        Возвращает значения переменных в решении
+        (в лучшем решении, если решение не передано)
+        """
+        positions = self.positions_of(var_names)
+        sol = model.getBestSol() if sol is None else sol
+
+        return np.fromiter(
+            (model.getSolVal(sol, self.vars_[position]) for position in positions),
+            dtype=np.float64,
+            count=positions.size,
+        )
+
+    def all_values(
+        self,
+        model: pyscipopt.scip.Model,
+        sol: t.Optional[pyscipopt.scip.Solution] = None,
+    ) -> np.ndarray:
+        """
+        Возвращает значения всех переменных индекса в решении
+        (в порядке индекса)
+        """
+        sol = model.getBestSol() if sol is None else sol
+
+        return np.fromiter(
+            (model.getSolVal(sol, var) for var in self.vars_),
+            dtype=np.float64,
+            count=len(self.vars_),
+        )
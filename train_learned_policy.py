@@ -0,0 +1,65 @@
+import typing as t
+
+import click
+import pathlib2
+from pathlib2 import Path, PosixPath
+
+from scip_ecole_model.learned_policy import train_mlp_branching_model
+from scip_ecole_model.utils.scip_ecole_logger import logger
+
+
+@click.command()
+@click.option(
+    "--path-to-dataset-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=pathlib2.Path),
+    default=Path("./imitation_data"),
+    help="Путь до директории набора данных (collect_imitation_data.py)",
+)
+@click.option(
+    "--path-to-policy-weights",
+    type=click.Path(dir_okay=False, path_type=pathlib2.Path),
+    default=Path("./policy_weights/mlp_policy.npz"),
+    help="Путь до npz-файла весов обученной политики",
+)
+@click.option("--hidden-size", type=int, default=32, help="Размер скрытого слоя")
+@click.option("--n-epochs", type=int, default=20, help="Число эпох обучения")
+@click.option("--batch-size", type=int, default=64, help="Число образцов в пакете")
+@click.option("--learning-rate", type=float, default=1e-3, help="Шаг обучения (Adam)")
+@click.option(
+    "--validation-fraction",
+    type=float,
+    default=0.1,
+    help="Доля образцов для проверки",
+)
+@click.option("--seed", type=int, default=0, help="Начальное значение генератора")
+def main(
+    path_to_dataset_dir: PosixPath,
+    path_to_policy_weights: PosixPath,
+    hidden_size: int,
+    n_epochs: int,
+    batch_size: int,
+    learning_rate: float,
+    validation_fraction: float,
+    seed: int,
+) -> t.NoReturn:
+    """
+    Обучает политику ветвления имитации решений эксперта
+    """
+    model = train_mlp_branching_model(
+        path_to_dataset_dir=path_to_dataset_dir,
+        logger=logger,
+        hidden_size=hidden_size,
+        n_epochs=n_epochs,
+        batch_size=batch_size,
+        learning_rate=learning_rate,
+        validation_fraction=validation_fraction,
+        seed=seed,
+    )
+
+    path_to_policy_weights.parent.mkdir(parents=True, exist_ok=True)
+    model.save(path_to_policy_weights)
+    logger.info(f"Policy weights have been written to `{path_to_policy_weights}`")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import dataclasses
 import os
 import sys
 import typing as t
@@ -5,27 +6,23 @@ import typing as t
 import click
 import dotenv
 import numpy as np
+import pandas as pd
 import pathlib2
-import pyscipopt
 from pathlib2 import Path, PosixPath
 
+from scip_ecole_model import sol_io
 from scip_ecole_model.auxiliary_functions import *
-from scip_ecole_model.scip_ecole_logger import logger
+from scip_ecole_model.feasibility import DEFAULT_FEASIBILITY_TOL
+from scip_ecole_model.problem_arrays import ProblemArrays
+from scip_ecole_model.utils.scip_ecole_logger import logger
 
 
 def read_sol_file(path_to_sol_file: PosixPath) -> dict:
     """
     Преобразует sol-файл в словарь пар "имя_переменной-значение"
     """
-    sol_file_parsed = {}
-
     try:
-        with open(path_to_sol_file) as sol_file:
-            for line in sol_file:
-                if line.startswith("#") or "objective" in line:
-                    continue
-                key, value = line.split()[:2]
-                sol_file_parsed[key] = float(value)
+        sol_file_parsed: dict = sol_io.read_sol_file(path_to_sol_file).to_dict()
     except FileNotFoundError as err:
         logger.error(f"{err}")
         sys.exit(-1)
@@ -35,6 +32,45 @@ def read_sol_file(path_to_sol_file: PosixPath) -> dict:
     return sol_file_parsed
 
 
+def get_sol_values(var_names: np.ndarray, sol_data: sol_io.SolData) -> np.ndarray:
+    """
+    Раскладывает значения переменных из sol-файла по позициям переменных
+    задачи; переменные, отсутствующие в sol-файле, считаются нулевыми
+    """
+    values = np.zeros(var_names.size, dtype=np.float64)
+    positions: np.ndarray = pd.Index(var_names).get_indexer(sol_data.names)
+    found_mask = positions >= 0
+    values[positions[found_mask]] = sol_data.values[found_mask]
+
+    return values
+
+
+def _count_vars_by_type(problem: ProblemArrays) -> t.Tuple[int, int, int]:
+    """
+    Число переменных: всего, целочисленных (без бинарных) и бинарных
+    """
+    return (
+        problem.n_vars,
+        int(np.count_nonzero(problem.vtypes == "INTEGER")),
+        int(np.count_nonzero(problem.vtypes == "BINARY")),
+    )
+
+
+def _find_violated_empty_rows(
+    problem: ProblemArrays, tolerance: float = DEFAULT_FEASIBILITY_TOL
+) -> np.ndarray:
+    """
+    Позиции ограничений без переменных, которые не выполняются при нулевой
+    левой части (`lhs > 0` или `rhs < 0`); при записи lp-файла пустые
+    строки опускаются, и такая задача молча становится допустимой
+    """
+    is_empty = np.diff(problem.matrix.indptr) == 0
+
+    return np.flatnonzero(
+        is_empty & ((problem.lhs > tolerance) | (problem.rhs < -tolerance))
+    )
+
+
 @click.command()
 @click.option(
     "--path-to-lp-file",
@@ -63,10 +99,29 @@ def read_sol_file(path_to_sol_file: PosixPath) -> dict:
     default=Path("./input_for_model"),
     help="Путь до директории входнных модели",
 )
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.5,
+    show_default=True,
+    help=(
+        "Переменная считается нулевой, если |значение| <= tolerance "
+        "(0.5 соответствует прежнему правилу np.round(value) == 0)"
+    ),
+)
+@click.option(
+    "--reduction",
+    type=click.Choice(["delete", "fix"]),
+    default="delete",
+    show_default=True,
+    help="Способ исключения нулевых переменных: удаление или фиксация границ в 0",
+)
 def gen_warm_start_wo_zeros_vals(
     path_to_lp_file: PosixPath,
     path_to_sol_file: PosixPath,
     path_to_input_dir: PosixPath,
+    tolerance: float,
+    reduction: str,
 ) -> t.NoReturn:
     """
     Удаляет переменные, которые в "теплом" старте
@@ -75,40 +130,69 @@ def gen_warm_start_wo_zeros_vals(
     """
     dotenv.load_dotenv(".env")
 
-    model = pyscipopt.Model()
+    # Задача читается в массивы (lp-файл разбирается векторно), поэтому
+    # переменные исключаются одной операцией над массивами, а не вызовом
+    # API решателя на каждую переменную
     try:
-        model.readProblem(str(path_to_lp_file))
-        n_vars_before = model.getNVars()
-        n_bin_vars_before = model.getNBinVars()
-        n_int_vars_before = model.getNIntVars()
-        warm_start: pyscipopt.scip.Solution = model.readSolFile(str(path_to_sol_file))
+        problem = ProblemArrays.from_problem_file(path_to_lp_file, logger)
     except OSError as err:
         logger.error(f"{err}")
         sys.exit(-1)
     else:
         logger.info(f"File `{path_to_lp_file.name}` has been read successfully!")
-        model.addSol(warm_start)
 
-        sol: pyscipopt.scip.Solution = model.getSols()[0]
+    n_vars_before, n_int_vars_before, n_bin_vars_before = _count_vars_by_type(problem)
 
-    for var in model.getVars():
-        value = model.getSolVal(sol, var)
-        if np.round(value) == 0.0:
-            print(f"{var.name} ({var.vtype()}) = {value}...")
-            model.delVar(var)
-
-    n_vars_after = model.getNVars()
-    n_bin_vars_after = model.getNBinVars()
-    n_int_vars_after = model.getNIntVars()
+    values: np.ndarray = get_sol_values(
+        problem.var_names, sol_io.read_sol_file(path_to_sol_file)
+    )
+    is_zero: np.ndarray = np.abs(values) <= tolerance
+    zero_positions: np.ndarray = np.flatnonzero(is_zero)
+
+    if reduction == "delete":
+        # Столбцы нулевых переменных удаляются из матрицы ограничений
+        reduced_problem = dataclasses.replace(
+            problem.subproblem(
+                np.flatnonzero(~is_zero), np.arange(problem.n_conss, dtype=np.int64)
+            ),
+            obj_offset=problem.obj_offset,
+        )
+    else:
+        reduced_problem = dataclasses.replace(
+            problem,
+            lbs=np.where(is_zero, 0.0, problem.lbs),
+            ubs=np.where(is_zero, 0.0, problem.ubs),
+        )
+    n_vars_after, n_int_vars_after, n_bin_vars_after = _count_vars_by_type(
+        reduced_problem
+    )
 
-    print(
-        f"Was -> n_vars: {n_vars_before}, n_int_vars: {n_int_vars_before}, n_bin_vars: {n_bin_vars_before}"
+    zero_vtypes, zero_vtype_counts = np.unique(
+        problem.vtypes[zero_positions], return_counts=True
     )
-    print(
-        f"Now -> n_vars: {n_vars_after}, n_int_vars: {n_int_vars_after}, n_bin_vars: {n_bin_vars_after}"
+    logger.info(
+        f"\n\t{zero_positions.size} zero vars (|value| <= {tolerance}) "
+        f"were {'deleted' if reduction == 'delete' else 'fixed to 0'}: "
+        + ", ".join(
+            f"{vtype}: {count}"
+            for vtype, count in zip(zero_vtypes.tolist(), zero_vtype_counts.tolist())
+        )
+        + f"\n\tWas -> n_vars: {n_vars_before}, n_int_vars: {n_int_vars_before}, "
+        f"n_bin_vars: {n_bin_vars_before}"
+        f"\n\tNow -> n_vars: {n_vars_after}, n_int_vars: {n_int_vars_after}, "
+        f"n_bin_vars: {n_bin_vars_after}"
     )
 
-    model.writeProblem(
+    violated_rows: np.ndarray = _find_violated_empty_rows(reduced_problem)
+    if violated_rows.size > 0:
+        logger.error(
+            f"{violated_rows.size} constraints have no variables left and are "
+            f"violated by zero activity (the reduced problem is infeasible): "
+            + ", ".join(reduced_problem.cons_names[violated_rows[:10]].tolist())
+        )
+        sys.exit(-1)
+
+    reduced_problem.write_lp_file(
         path_to_input_dir.joinpath(
             Path(f"{path_to_lp_file.name.split('.')[0]}_wo_zeros_vals.lp")
         )